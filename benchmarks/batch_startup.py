@@ -0,0 +1,95 @@
+# -*- coding: UTF-8 -*-
+__author__ = "Jaime Rivera <jaime.rvq@gmail.com>"
+__copyright__ = "Copyright 2022, Jaime Rivera"
+__credits__ = []
+__license__ = "MIT License"
+
+
+# Measure the start-up cost of all_nodes in batch mode.
+#
+# For each run, a fresh interpreter is launched and its wall time and peak resident memory (RSS) are collected:
+#   - Importing the logic layer (LogicScene), also reporting whether Qt got imported along the way
+#   - Running a whole scene in batch mode, as 'all-nodes -f' does
+#
+# Usage: python benchmarks/batch_startup.py [-f SCENE] [-r RUNS]
+
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SRC_DIR = os.path.join(ROOT_DIR, "src")
+
+IMPORT_SNIPPET = (
+    "import sys; "
+    "from all_nodes.logic.logic_scene import LogicScene; "
+    "print('PySide2' in sys.modules)"
+)
+
+
+# -------------------------------- MEASURING -------------------------------- #
+def run_measured(args: list) -> tuple:
+    """
+    Run a command in a new process and measure it.
+
+    Args:
+        args (list): command line to run
+
+    Returns:
+        tuple: wall time in seconds, peak RSS in MB and stdout of the process
+    """
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [SRC_DIR, env.get("PYTHONPATH")]))
+
+    t1 = time.perf_counter()
+    process = subprocess.Popen(
+        args, env=env, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True
+    )
+    out = process.stdout.read()
+    _, status, rusage = os.wait4(process.pid, 0)
+    elapsed = time.perf_counter() - t1
+    returncode = os.waitstatus_to_exitcode(status)
+    if returncode:
+        raise RuntimeError(f"Command failed ({returncode}): {args}")
+
+    return elapsed, rusage.ru_maxrss / 1024, out.strip()  # ru_maxrss is in KB
+
+
+def report(title: str, samples: list):
+    times = [s[0] for s in samples]
+    rss = [s[1] for s in samples]
+    print(
+        f"{title:<28} time: median {statistics.median(times):.3f}s "
+        f"(min {min(times):.3f}s)   peak RSS: {max(rss):.1f} MB"
+    )
+
+
+# -------------------------------- MAIN -------------------------------- #
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "-f", "--scene_file", default="environ_to_yaml", help="scene to run"
+    )
+    parser.add_argument("-r", "--runs", default=5, type=int, help="runs per case")
+    args = parser.parse_args()
+
+    import_samples = [
+        run_measured([sys.executable, "-c", IMPORT_SNIPPET]) for _ in range(args.runs)
+    ]
+    report("import LogicScene", import_samples)
+    print(f"{'':<28} Qt imported: {import_samples[0][2]}")
+
+    batch_samples = [
+        run_measured([sys.executable, "-m", "all_nodes.main", "-f", args.scene_file])
+        for _ in range(args.runs)
+    ]
+    report(f"batch '{args.scene_file}'", batch_samples)
+
+
+if __name__ == "__main__":
+    main()
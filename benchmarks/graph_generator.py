@@ -0,0 +1,216 @@
+# -*- coding: UTF-8 -*-
+__author__ = "Jaime Rivera <jaime.rvq@gmail.com>"
+__copyright__ = "Copyright 2022, Jaime Rivera"
+__credits__ = []
+__license__ = "MIT License"
+
+
+# Synthetic scenes for benchmarking, built with the nodes of debug.py.
+#
+# Every generator takes the approximate amount of nodes wanted and returns a scene dict, as read from a .yml scene
+# file. Nested contexts need their context classes on disk, written with write_context_library.
+
+
+import os
+import textwrap
+
+import yaml
+
+
+SEGMENT_LENGTH = (
+    10  # Nodes per chained segment, in the shapes that are not a single chain
+)
+CONTEXT_DEPTH = 5
+FOREACH_ITERATIONS = 10
+
+CONTEXT_LIBRARY_NAME = "bench_contexts"
+
+
+# -------------------------------- UTILITY -------------------------------- #
+class SceneBuilder:
+    """
+    Accumulate nodes and connections, named the same way as in a saved scene.
+    """
+
+    def __init__(self):
+        self.nodes = []
+        self.connections = []
+        self.class_counter = {}
+
+    def add(self, class_name: str, **node_attributes) -> str:
+        self.class_counter[class_name] = self.class_counter.get(class_name, 0) + 1
+        node_name = "{}_{}".format(class_name, self.class_counter[class_name])
+        node_dict = {"class_name": class_name, "x_pos": 0, "y_pos": 0}
+        if node_attributes:
+            node_dict["node_attributes"] = node_attributes
+        self.nodes.append({node_name: node_dict})
+        return node_name
+
+    def connect(self, source: str, source_attr: str, target: str, target_attr: str):
+        self.connections.append(
+            "{}.{} -> {}.{}".format(source, source_attr, target, target_attr)
+        )
+
+    def add_segment(self, length: int, after: str = None) -> tuple:
+        """
+        Add a chain of EmptyNodes.
+
+        Returns:
+            tuple: names of first and last nodes of the segment
+        """
+        first = previous = None
+        for _ in range(length):
+            node_name = self.add("EmptyNode")
+            if previous:
+                self.connect(previous, "COMPLETED", node_name, "START")
+            else:
+                first = node_name
+            previous = node_name
+        if after and first:
+            self.connect(after, "COMPLETED", first, "START")
+        return first, previous
+
+    def add_segments(self, nodes_count: int, after: str = None) -> list:
+        """
+        Add chained segments of EmptyNodes, all of them starting at the same time.
+
+        Returns:
+            list: tuples with the first and last nodes of each segment
+        """
+        segments = []
+        while nodes_count > 0:
+            length = min(SEGMENT_LENGTH, nodes_count)
+            segments.append(self.add_segment(length, after))
+            nodes_count -= length
+        return segments
+
+    def to_dict(self) -> dict:
+        return {"nodes": self.nodes, "connections": self.connections}
+
+
+# -------------------------------- SHAPES -------------------------------- #
+def chain(nodes_count: int) -> dict:
+    """A single chain of EmptyNodes, each one started by the previous one"""
+    builder = SceneBuilder()
+    builder.add_segment(nodes_count)
+    return builder.to_dict()
+
+
+def fan_out(nodes_count: int) -> dict:
+    """One IntAddition feeding all the others"""
+    builder = SceneBuilder()
+    root = builder.add("IntAddition", in_int_0=0, in_int_1=0)
+    for _ in range(nodes_count - 1):
+        node_name = builder.add("IntAddition", in_int_1=1)
+        builder.connect(root, "out_total", node_name, "in_int_0")
+    return builder.to_dict()
+
+
+def diamonds(nodes_count: int) -> dict:
+    """Columns of stacked diamonds of IntAddition, each one splitting in two and merging back"""
+    builder = SceneBuilder()
+    stages_per_column = SEGMENT_LENGTH
+    remaining = nodes_count
+    while remaining > 0:
+        top = builder.add("IntAddition", in_int_0=0, in_int_1=0)
+        remaining -= 1
+        for _ in range(stages_per_column):
+            if remaining < 3:
+                break
+            left = builder.add("IntAddition", in_int_1=0)
+            right = builder.add("IntAddition", in_int_1=0)
+            bottom = builder.add("IntAddition")
+            builder.connect(top, "out_total", left, "in_int_0")
+            builder.connect(top, "out_total", right, "in_int_0")
+            builder.connect(left, "out_total", bottom, "in_int_0")
+            builder.connect(right, "out_total", bottom, "in_int_1")
+            top = bottom
+            remaining -= 3
+    return builder.to_dict()
+
+
+def foreach_body(nodes_count: int) -> dict:
+    """A ForEach loop whose body is made of segments of EmptyNodes, with a TimedNode closing the iteration"""
+    builder = SceneBuilder()
+    list_input = builder.add("ListInput", internal_list=list(range(FOREACH_ITERATIONS)))
+    foreach_begin = builder.add("ForEachBegin")
+    foreach_end = builder.add("ForEachEnd")
+    builder.connect(list_input, "out_list", foreach_begin, "iterable")
+    builder.connect(foreach_begin, "foreach_end", foreach_end, "foreach_end")
+
+    segments = builder.add_segments(max(nodes_count - 4, 1), after=foreach_begin)
+    timed_node = builder.add("TimedNode", sleep_time=1e-6)  # 0 would sleep the default
+    builder.connect(segments[-1][1], "COMPLETED", timed_node, "START")
+    builder.connect(timed_node, "COMPLETED", foreach_end, "START")
+    return builder.to_dict()
+
+
+def get_context_class_name(nodes_count: int, level: int) -> str:
+    return "BenchCtx{}Level{}".format(nodes_count, level)
+
+
+def nested_contexts(nodes_count: int) -> dict:
+    """A context holding another one, CONTEXT_DEPTH levels deep, the nodes spread across levels in segments"""
+    builder = SceneBuilder()
+    builder.add(get_context_class_name(nodes_count, CONTEXT_DEPTH))
+    return builder.to_dict()
+
+
+def nested_context_definition(nodes_count: int, level: int) -> dict:
+    builder = SceneBuilder()
+    builder.add_segments(max(nodes_count // CONTEXT_DEPTH - 1, 1))
+    if level > 1:
+        builder.add(get_context_class_name(nodes_count, level - 1))
+    return builder.to_dict()
+
+
+SHAPES = {
+    "chain": chain,
+    "fan_out": fan_out,
+    "diamonds": diamonds,
+    "foreach_body": foreach_body,
+    "nested_contexts": nested_contexts,
+}
+
+
+# -------------------------------- FILES -------------------------------- #
+def write_scene(scene_dict: dict, filepath: str):
+    with open(filepath, "w") as file:
+        yaml.safe_dump(scene_dict, file, sort_keys=False)
+
+
+def write_context_library(folder: str, sizes: list) -> str:
+    """
+    Write a node library with the context classes needed by nested_contexts, for every size.
+
+    Args:
+        folder (str): folder to create the library in
+        sizes (list): amounts of nodes the nested contexts scenes will be generated for
+
+    Returns:
+        str: path of the library, to be added to ALL_NODES_LIB_PATH before scanning classes
+    """
+    library_path = os.path.join(folder, CONTEXT_LIBRARY_NAME)
+    os.makedirs(library_path, exist_ok=True)
+
+    module_lines = ["from all_nodes.logic.logic_node import GeneralLogicNode", ""]
+    for nodes_count in sizes:
+        for level in range(1, CONTEXT_DEPTH + 1):
+            class_name = get_context_class_name(nodes_count, level)
+            module_lines.append(
+                textwrap.dedent(
+                    f"""
+                    class {class_name}(GeneralLogicNode):
+                        IS_CONTEXT = True
+                    """
+                )
+            )
+            write_scene(
+                nested_context_definition(nodes_count, level),
+                os.path.join(library_path, class_name + ".ctx"),
+            )
+
+    with open(os.path.join(library_path, CONTEXT_LIBRARY_NAME + ".py"), "w") as file:
+        file.write("\n".join(module_lines))
+
+    return folder
@@ -0,0 +1,132 @@
+# -*- coding: UTF-8 -*-
+__author__ = "Jaime Rivera <jaime.rvq@gmail.com>"
+__copyright__ = "Copyright 2022, Jaime Rivera"
+__credits__ = []
+__license__ = "MIT License"
+
+
+# Measure the overhead logging adds to the execution of nodes.
+#
+# A chain of nodes is run with the loggers at DEBUG, INFO and WARNING (quiet mode) levels, with their output sent
+# to os.devnull so only the cost of logging itself is measured. Then, the cost of setting a large value in an
+# attribute is measured, compared to the eager formatting that used to be done on every set.
+#
+# Usage: python benchmarks/logging_overhead.py [-n NODES] [-r RUNS]
+
+
+import argparse
+import logging
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+)
+
+from all_nodes import utils  # noqa: E402
+from all_nodes.logic.logic_scene import LogicScene  # noqa: E402
+
+
+LEVELS = [logging.DEBUG, logging.INFO, logging.WARNING]
+LARGE_VALUE = list(range(1_000_000))
+
+
+# -------------------------------- UTILITY -------------------------------- #
+def silence_output(devnull):
+    for logger in utils.LOGGERS.values():
+        for handler in logger.handlers:
+            handler.setStream(devnull)
+
+
+def build_chain(nodes_count: int) -> LogicScene:
+    scene = LogicScene()
+    previous = None
+    for _ in range(nodes_count):
+        node = scene.add_node_by_name("EmptyNode")
+        if previous:
+            previous["COMPLETED"].connect_to_other(node["START"])
+        previous = node
+    return scene
+
+
+# -------------------------------- MEASURING -------------------------------- #
+def measure_chain(scene: LogicScene, nodes_count: int, runs: int) -> float:
+    """
+    Returns:
+        float: median time per node executed, in microseconds
+    """
+    samples = []
+    for _ in range(runs):
+        scene.reset_all_nodes()
+        t1 = time.perf_counter()
+        scene.run_all_nodes_batch()
+        samples.append((time.perf_counter() - t1) / nodes_count * 1e6)
+    return statistics.median(samples)
+
+
+def measure_set_value(scene: LogicScene, calls: int = 1000) -> float:
+    """
+    Returns:
+        float: time per set_value call with a large value, in microseconds
+    """
+    attr = next(iter(scene.all_logic_nodes))["START"]
+    t1 = time.perf_counter()
+    for _ in range(calls):
+        attr.set_value(LARGE_VALUE)
+    elapsed = (time.perf_counter() - t1) / calls * 1e6
+    attr.clear()
+    return elapsed
+
+
+def measure_eager_format(calls: int = 10) -> float:
+    """
+    Cost of formatting the whole value, as done before on every set_value.
+
+    Returns:
+        float: time per formatting, in microseconds
+    """
+    t1 = time.perf_counter()
+    for _ in range(calls):
+        "Setting {} to new value {}".format("/Node.attr", LARGE_VALUE)
+    return (time.perf_counter() - t1) / calls * 1e6
+
+
+# -------------------------------- MAIN -------------------------------- #
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", "--nodes", default=300, type=int, help="nodes in chain")
+    parser.add_argument("-r", "--runs", default=5, type=int, help="runs per level")
+    args = parser.parse_args()
+
+    with open(os.devnull, "w") as devnull:
+        silence_output(devnull)
+        scene = build_chain(args.nodes)
+        silence_output(devnull)  # Loggers of the node libraries, created while scanning
+
+        results = []
+        for level in LEVELS:
+            utils.set_logging_level(level)
+            results.append(
+                (
+                    logging.getLevelName(level),
+                    measure_chain(scene, args.nodes, args.runs),
+                    measure_set_value(scene),
+                )
+            )
+        utils.set_logging_level(logging.INFO)
+
+    print(f"Chain of {args.nodes} EmptyNode, median of {args.runs} runs")
+    for level_name, per_node, per_set in results:
+        print(
+            f"  {level_name:<8} {per_node:8.1f} us/node   "
+            f"{per_set:8.2f} us/set_value (1M-item list)"
+        )
+    print(
+        f"  Eager formatting of the same list: {measure_eager_format():.0f} us/set_value"
+    )
+
+
+if __name__ == "__main__":
+    main()
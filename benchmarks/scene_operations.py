@@ -0,0 +1,243 @@
+# -*- coding: UTF-8 -*-
+__author__ = "Jaime Rivera <jaime.rvq@gmail.com>"
+__copyright__ = "Copyright 2022, Jaime Rivera"
+__credits__ = []
+__license__ = "MIT License"
+
+
+# Measure the main operations of LogicScene on synthetic scenes of growing size.
+#
+# For every shape of graph_generator.py and every size, the scene is written to disk and then timed through
+# load_from_file, connect_attrs_by_name (all its connections, resolved through an index as loading does),
+# run_all_nodes, reset_all_nodes and save_to_file. Results are written as JSON, and can be compared against the JSON
+# of another commit to flag the operations that got slower than a threshold, or that fail now.
+#
+# Sizes go from 10 to 100k nodes. Every shape can be loaded, connected, reset and saved at all of them, but
+# run_all_nodes goes one call deeper for every node of a chain, so it can only run chains shorter than the recursion
+# limit of Python (about 1000 nodes). For the chain shape above that it is reported as FAILED, with the error, and the
+# nodes that ran. The other shapes chain at most SEGMENT_LENGTH nodes of graph_generator.py, and run at every size.
+# At 100k nodes every run of all the shapes takes about 10 minutes, pass smaller --sizes for a quick check.
+#
+# Usage: python benchmarks/scene_operations.py [-s SIZES...] [--shapes SHAPES...] [-r RUNS] [-o OUT_JSON]
+#                                              [--compare BASELINE_JSON] [--threshold 0.2]
+
+
+import argparse
+import datetime
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(BENCHMARKS_DIR), "src"))
+
+import graph_generator  # noqa: E402
+
+from all_nodes import constants  # noqa: E402
+from all_nodes import utils  # noqa: E402
+from all_nodes.logic import class_registry  # noqa: E402
+from all_nodes.logic.class_registry import CLASS_REGISTRY as CR  # noqa: E402
+from all_nodes.logic.logic_scene import LogicScene  # noqa: E402
+
+
+DEFAULT_SIZES = [10, 100, 1000, 10000, 100000]
+OPERATIONS = [
+    "load_from_file",
+    "connect_attrs_by_name",
+    "run_all_nodes",
+    "reset_all_nodes",
+    "save_to_file",
+]
+
+
+# -------------------------------- UTILITY -------------------------------- #
+def get_commit() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=BENCHMARKS_DIR,
+            stderr=subprocess.DEVNULL,
+            text=True,
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def timed(function, *args, **kwargs) -> float:
+    t1 = time.perf_counter()
+    function(*args, **kwargs)
+    return time.perf_counter() - t1
+
+
+def connect_all(scene: LogicScene, connections: list):
+    attrs_index = scene.get_attrs_by_dot_name()
+    for connection in connections:
+        source, target = connection.split(" -> ")
+        scene.connect_attrs_by_name(source, target, attrs_index, check_cycles=False)
+
+
+# -------------------------------- MEASURING -------------------------------- #
+def measure_scene(scene_dict: dict, folder: str, runs: int) -> dict:
+    """
+    Returns:
+        dict: median time of every operation, in seconds or None if it failed, plus the nodes that ran successfully
+            and the errors of the failed operations
+    """
+    scene_file = os.path.join(folder, "scene.yml")
+    unconnected_file = os.path.join(folder, "unconnected.yml")
+    saved_file = os.path.join(folder, "saved.yml")
+    graph_generator.write_scene(scene_dict, scene_file)
+    graph_generator.write_scene({"nodes": scene_dict["nodes"]}, unconnected_file)
+
+    samples = {operation: [] for operation in OPERATIONS}
+    errors = {}
+    successful = 0
+    for _ in range(runs):
+        scene = LogicScene()
+        samples["load_from_file"].append(timed(scene.load_from_file, scene_file))
+
+        unconnected_scene = LogicScene()
+        unconnected_scene.load_from_file(unconnected_file)
+        samples["connect_attrs_by_name"].append(
+            timed(connect_all, unconnected_scene, scene_dict["connections"])
+        )
+
+        try:
+            samples["run_all_nodes"].append(
+                timed(scene.run_all_nodes, spawn_thread=False)
+            )
+        except RecursionError as e:
+            samples["run_all_nodes"].append(None)
+            errors["run_all_nodes"] = f"RecursionError: {e}"
+        successful = sum(
+            node.success == constants.SUCCESSFUL for node in scene.all_logic_nodes
+        )
+
+        samples["reset_all_nodes"].append(timed(scene.reset_all_nodes))
+        samples["save_to_file"].append(timed(scene.save_to_file, saved_file))
+
+    results = {
+        operation: statistics.median(values) if None not in values else None
+        for operation, values in samples.items()
+    }
+    results["successful_nodes"] = successful
+    results["errors"] = errors
+    return results
+
+
+def run_benchmarks(shapes: list, sizes: list, runs: int) -> dict:
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="all_nodes_bench_") as folder:
+        libraries = class_registry.get_all_node_libs()
+        libraries.append(
+            graph_generator.write_context_library(os.path.join(folder, "libs"), sizes)
+        )
+        os.environ["ALL_NODES_LIB_PATH"] = os.pathsep.join(libraries)
+        CR.get_all_classes()  # Scan before measuring
+
+        for shape in shapes:
+            for size in sizes:
+                scene_dict = graph_generator.SHAPES[shape](size)
+                key = "{}/{}".format(shape, size)
+                results[key] = measure_scene(scene_dict, folder, runs)
+                print_results(key, results[key])
+
+    return results
+
+
+# -------------------------------- REPORTING -------------------------------- #
+def print_results(key: str, results: dict):
+    timings = "  ".join(
+        "{} {}".format(operation, format_time(results[operation]))
+        for operation in OPERATIONS
+    )
+    print(f"{key:<24} {timings}  ({results['successful_nodes']} ran)", flush=True)
+    for operation, error in results.get("errors", {}).items():
+        print(f"{'':<24} {operation} FAILED with {error}", flush=True)
+
+
+def format_time(seconds: float) -> str:
+    return "FAILED" if seconds is None else f"{seconds:.4f}s"
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """
+    Args:
+        results (dict): results of this run
+        baseline (dict): results to compare against
+        threshold (float): relative slowdown allowed, 0.2 meaning 20% slower
+
+    Returns:
+        list: regressions found, as (key, operation, baseline time, new time), the new time being None if the
+            operation failed
+    """
+    regressions = []
+    for key, key_results in results.items():
+        for operation in OPERATIONS:
+            old = baseline.get(key, {}).get(operation)
+            new = key_results.get(operation)
+            if old is None:
+                continue  # Not measured before, or failing already
+            if new is None or new > old * (1 + threshold):
+                regressions.append((key, operation, old, new))
+    return regressions
+
+
+# -------------------------------- MAIN -------------------------------- #
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "-s", "--sizes", default=DEFAULT_SIZES, type=int, nargs="+", help="nodes"
+    )
+    parser.add_argument(
+        "--shapes",
+        default=list(graph_generator.SHAPES),
+        choices=list(graph_generator.SHAPES),
+        nargs="+",
+    )
+    parser.add_argument("-r", "--runs", default=3, type=int, help="runs per scene")
+    parser.add_argument("-o", "--output", type=str, help="JSON file to write to")
+    parser.add_argument("--compare", type=str, help="JSON file of a previous run")
+    parser.add_argument(
+        "--threshold", default=0.2, type=float, help="allowed relative slowdown"
+    )
+    args = parser.parse_args()
+
+    utils.set_logging_level(logging.CRITICAL + 1)
+
+    results = run_benchmarks(args.shapes, args.sizes, args.runs)
+    output = {
+        "metadata": {
+            "commit": get_commit(),
+            "date": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "runs": args.runs,
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(output, file, indent=2)
+
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)
+        regressions = compare(results, baseline["results"], args.threshold)
+        for key, operation, old, new in regressions:
+            print(
+                f"REGRESSION {key} {operation}: {format_time(old)} -> {format_time(new)}"
+            )
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions over {args.threshold:.0%} against {args.compare}")
+
+
+if __name__ == "__main__":
+    main()
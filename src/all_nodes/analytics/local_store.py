@@ -0,0 +1,347 @@
+__author__ = "Jaime Rivera <jaime.rvq@gmail.com>"
+__copyright__ = "Copyright 2022, Jaime Rivera"
+__credits__ = []
+__license__ = "MIT License"
+
+
+import atexit
+import contextlib
+import glob
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+from all_nodes import constants
+from all_nodes import utils
+from all_nodes.analytics import rollups
+
+
+LOGGER = utils.get_logger(__name__)
+
+NO_DATE_PARTITION = "none"  # Partition of the records of nodes that never ran
+
+
+def get_schema() -> dict:
+    """
+    Returns:
+        dict: polars type by column of the records stored
+    """
+    import polars as pl
+
+    return {
+        "class_name": pl.Utf8,
+        "node_name": pl.Utf8,
+        "full_name": pl.Utf8,
+        "uuid": pl.Utf8,
+        "origin_file": pl.Utf8,
+        "context": pl.Utf8,
+        "IS_CONTEXT": pl.Boolean,
+        "success": pl.Utf8,
+        "execution_counter": pl.Int64,
+        "run_date": pl.Utf8,
+        "run_time": pl.Utf8,
+        "execution_time": pl.Float64,
+        "user": pl.Utf8,
+        "attributes": pl.Utf8,  # As JSON, its keys are different for every class
+        "attributes_size": pl.Int64,
+        "fail_log": pl.List(pl.Utf8),
+        "error_log": pl.List(pl.Utf8),
+    }
+
+
+# -------------------------------- STORE -------------------------------- #
+class LocalAnalyticsStore:
+    """
+    Analytics kept on the local disk, for machines that cannot reach the DB.
+
+    Records are buffered and written by a background thread as Parquet files, one folder per day
+    ("run_date=YYYY-MM-DD"), once BATCH_SIZE of them are waiting or the oldest one has waited FLUSH_INTERVAL seconds,
+    and on exit. The daily rollups of the records are updated in a SQLite file next to them as they are written, and
+    are what the reports query. The records themselves can be scanned lazily, so only the columns and days needed are
+    read.
+    """
+
+    BATCH_SIZE = 5000
+    FLUSH_INTERVAL = 60.0
+
+    def __init__(self, root_dir: str):
+        """
+        Args:
+            root_dir (str): folder to store the records in. If empty, the store is disabled.
+        """
+        self.root_dir = root_dir
+        self.enabled = bool(root_dir)
+
+        self._buffer = []
+        self._buffered_since = None
+        self._lock = threading.Lock()
+        self._wake = threading.Condition(self._lock)
+        self._write_lock = threading.Lock()  # One write at a time
+
+        self._writer = None
+        self._stopping = False
+
+    # WRITING ----------------------
+    def submit(self, records: list):
+        """
+        Buffer records to be written by the writer thread, without waiting for it.
+
+        Args:
+            records (list): compact analytics records, as built by records.build_record
+        """
+        if not self.enabled or not records:
+            return
+        self.start()
+        with self._lock:
+            if self._buffered_since is None:
+                self._buffered_since = time.monotonic()
+                self._wake.notify()
+            self._buffer.extend(records)
+            if len(self._buffer) >= self.BATCH_SIZE:
+                self._wake.notify()
+
+    def flush(self):
+        """
+        Write all the records buffered so far, in the calling thread.
+        """
+        with self._write_lock:
+            with self._lock:
+                records, self._buffer = self._buffer, []
+                self._buffered_since = None
+            if records:
+                self.write_records(records)
+
+    def write_records(self, records: list):
+        import polars as pl
+
+        schema = get_schema()
+        rows_by_date = {}
+        for record in records:
+            row = {column: record.get(column) for column in schema}
+            row["attributes"] = json.dumps(record.get("attributes"), default=str)
+            rows_by_date.setdefault(row["run_date"], []).append(row)
+
+        for run_date, rows in rows_by_date.items():
+            partition_dir = os.path.join(
+                self.root_dir, "run_date={}".format(run_date or NO_DATE_PARTITION)
+            )
+            os.makedirs(partition_dir, exist_ok=True)
+            pl.DataFrame(rows, schema=schema).write_parquet(
+                os.path.join(partition_dir, uuid.uuid4().hex + ".parquet")
+            )
+        self.update_rollups(records)
+        LOGGER.debug("Stored %d analytics records in %s", len(records), self.root_dir)
+
+    # WRITER ----------------------
+    def start(self):
+        """
+        Start the writer thread, if it is not running yet.
+        """
+        with self._lock:
+            if self._writer is not None and self._writer.is_alive():
+                return
+            self._stopping = False
+            self._writer = threading.Thread(
+                target=self._write_loop, name="all_nodes_local_analytics", daemon=True
+            )
+            self._writer.start()
+        atexit.register(self.close)
+
+    def _get_wait_time(self) -> float:
+        """
+        Returns:
+            float: seconds until the records buffered are due to be written, None if there are none
+        """
+        if self._buffered_since is None:
+            return None
+        if len(self._buffer) >= self.BATCH_SIZE:
+            return 0
+        return self.FLUSH_INTERVAL - (time.monotonic() - self._buffered_since)
+
+    def _write_loop(self):
+        stopping = False
+        while not stopping:
+            with self._lock:
+                wait_time = self._get_wait_time()
+                while not self._stopping and (wait_time is None or wait_time > 0):
+                    self._wake.wait(wait_time)
+                    wait_time = self._get_wait_time()
+                stopping = self._stopping
+            try:
+                self.flush()
+            except Exception as e:
+                LOGGER.exception(e)
+
+    def close(self, timeout: float = 30):
+        """
+        Stop the writer, once it has written the records buffered.
+
+        Args:
+            timeout (float, optional): seconds to wait for the writer. Defaults to 30.
+        """
+        with self._lock:
+            writer = self._writer
+            self._writer = None
+            self._stopping = True
+            self._wake.notify()
+        if writer is not None and writer.is_alive():
+            writer.join(timeout)
+
+    # QUERYING ----------------------
+    def scan(self):
+        """
+        Returns:
+            polars.LazyFrame: all the records stored, None if there are none
+        """
+        import polars as pl
+
+        files = glob.glob(os.path.join(self.root_dir, "run_date=*", "*.parquet"))
+        if not files:
+            return None
+        # The date is read from the files, so records that never ran keep a null one
+        return pl.scan_parquet(files, hive_partitioning=False)
+
+    # ROLLUPS ----------------------
+    def connect_rollups(self) -> sqlite3.Connection:
+        os.makedirs(self.root_dir, exist_ok=True)
+        connection = sqlite3.connect(
+            os.path.join(self.root_dir, "rollups.sqlite"), timeout=30
+        )
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS rollups ("
+            "run_date TEXT, class_name TEXT, success TEXT, is_context INTEGER, count INTEGER, total_time REAL, "
+            "PRIMARY KEY (run_date, class_name, success, is_context))"
+        )
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS latencies ("
+            "run_date TEXT, class_name TEXT, success TEXT, is_context INTEGER, bucket INTEGER, count INTEGER, "
+            "PRIMARY KEY (run_date, class_name, success, is_context, bucket))"
+        )
+        return connection
+
+    def update_rollups(self, records: list):
+        """
+        Add records to the daily rollups.
+
+        Args:
+            records (list): analytics records just stored
+        """
+        increments = rollups.build_increments(records)
+        if not increments:
+            return
+        with contextlib.closing(self.connect_rollups()) as connection, connection:
+            connection.executemany(
+                "INSERT INTO rollups VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT DO UPDATE SET count = count + excluded.count, "
+                "total_time = total_time + excluded.total_time",
+                [
+                    key + (increment["count"], increment["total_time"])
+                    for key, increment in increments.items()
+                ],
+            )
+            connection.executemany(
+                "INSERT INTO latencies VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT DO UPDATE SET count = count + excluded.count",
+                [
+                    key + (bucket, amount)
+                    for key, increment in increments.items()
+                    for bucket, amount in increment["buckets"].items()
+                ],
+            )
+
+    def rebuild_rollups(self):
+        """
+        Compute the daily rollups again from all the records stored.
+        """
+        with contextlib.closing(self.connect_rollups()) as connection, connection:
+            connection.execute("DELETE FROM rollups")
+            connection.execute("DELETE FROM latencies")
+        records = self.scan()
+        if records is None:
+            return
+        self.update_rollups(
+            records.select(
+                ["run_date", "class_name", "success", "IS_CONTEXT", "execution_time"]
+            )
+            .collect()
+            .to_dicts()
+        )
+        LOGGER.info("Rebuilt analytics rollups in %s", self.root_dir)
+
+    def query_rollups(self, query: str, parameters: tuple = ()) -> list:
+        with contextlib.closing(self.connect_rollups()) as connection:
+            return connection.execute(query, parameters).fetchall()
+
+    # QUERYING ----------------------
+    def query_recent_usage(self, limit: int = 35):
+        """
+        Returns:
+            polars.DataFrame: "run_date" and "count" of nodes run that day, for the last days
+        """
+        import polars as pl
+
+        rows = self.query_rollups(
+            "SELECT run_date, SUM(count) FROM rollups GROUP BY run_date ORDER BY run_date DESC LIMIT ?",
+            (limit,),
+        )
+        return pl.DataFrame(rows[::-1], schema=["run_date", "count"], orient="row")
+
+    def query_most_used(self, limit: int = 30):
+        """
+        Returns:
+            polars.DataFrame: "class_name" and "count" of the most used classes, that are not inputs or contexts
+        """
+        import polars as pl
+
+        rows = self.query_rollups(
+            "SELECT class_name, SUM(count) AS total FROM rollups "
+            "WHERE class_name NOT GLOB '*Input*' AND class_name NOT GLOB '*Ctx*' AND NOT is_context "
+            "GROUP BY class_name ORDER BY total DESC LIMIT ?",
+            (limit,),
+        )
+        return pl.DataFrame(rows, schema=["class_name", "count"], orient="row")
+
+    def query_last_with_status(self, status: str, limit: int = 50):
+        """
+        Args:
+            status (str): such as constants.ERROR or constants.FAILED
+
+        Returns:
+            polars.DataFrame: "class_name", "run_date" and "count" of nodes that ended with the status, for the last
+                days, oldest first
+        """
+        import polars as pl
+
+        rows = self.query_rollups(
+            "SELECT class_name, run_date, SUM(count) FROM rollups WHERE success = ? "
+            "GROUP BY class_name, run_date ORDER BY run_date DESC LIMIT ?",
+            (status, limit),
+        )
+        return pl.DataFrame(
+            rows[::-1], schema=["class_name", "run_date", "count"], orient="row"
+        )
+
+    def query_latencies(self, limit: int = 30):
+        """
+        Returns:
+            polars.DataFrame: "class_name", "count" and percentiles of the execution times of the most run classes,
+                over the last days
+        """
+        rows = self.query_rollups(
+            "SELECT class_name, bucket, SUM(count) FROM latencies "
+            "WHERE run_date >= ? AND NOT is_context GROUP BY class_name, bucket",
+            (rollups.get_latency_cutoff(),),
+        )
+        return rollups.summarize_latencies(
+            (
+                (class_name, amount, {bucket: amount})
+                for class_name, bucket, amount in rows
+            ),
+            limit,
+        )
+
+
+LOCAL_ANALYTICS = LocalAnalyticsStore(constants.LOCAL_ANALYTICS_DIR)  # Singleton to use
@@ -0,0 +1,208 @@
+__author__ = "Jaime Rivera <jaime.rvq@gmail.com>"
+__copyright__ = "Copyright 2022, Jaime Rivera"
+__credits__ = []
+__license__ = "MIT License"
+
+
+import hashlib
+import threading
+from pathlib import Path
+
+from all_nodes import constants
+from all_nodes import utils
+from all_nodes.logic.spill_store import SpilledValue, estimate_size
+
+
+LOGGER = utils.get_logger(__name__)
+
+MAX_VALUE_LENGTH = 64  # Longer strings are truncated and hashed
+MAX_LOG_LINES = 5
+MAX_LOG_LINE_LENGTH = 200
+
+RECORDED_STATUSES = [
+    constants.SUCCESSFUL,
+    constants.FAILED,
+    constants.ERROR,
+    constants.TIMEOUT,
+]
+
+
+# -------------------------------- RECORDS -------------------------------- #
+def summarize_value(value) -> dict:
+    """
+    Describe the value of an attribute for analytics, without turning it into a string.
+
+    Small scalars are kept as they are, strings are truncated and hashed, anything else is only described by its type
+    and approximate size.
+
+    Args:
+        value (object)
+
+    Returns:
+        dict: type, and value, size, length or hash when they apply
+    """
+    if value is None or isinstance(value, (bool, int, float)):
+        return {"type": type(value).__name__, "value": value}
+
+    if isinstance(value, str):
+        summary = {"type": "str", "size": len(value)}
+        if len(value) <= MAX_VALUE_LENGTH:
+            summary["value"] = value
+        else:
+            summary["value"] = value[:MAX_VALUE_LENGTH]
+            summary["hash"] = hashlib.blake2b(
+                value.encode(errors="replace"), digest_size=8
+            ).hexdigest()
+        return summary
+
+    if isinstance(value, SpilledValue):
+        return {"type": value.type_name, "size": value.size, "spilled": True}
+
+    summary = {"type": type(value).__name__, "size": estimate_size(value)}
+    if isinstance(value, (list, tuple, dict, set)):
+        summary["length"] = len(value)
+    return summary
+
+
+def truncate_log(log: list) -> list:
+    return [line[:MAX_LOG_LINE_LENGTH] for line in log[:MAX_LOG_LINES]]
+
+
+def build_record(node) -> dict:
+    """
+    Get the compact analytics record of a node run.
+
+    Keeps the fields analytics are queried by ("class_name", "success", "run_date", "IS_CONTEXT") as in the full
+    dict of the node, but attribute values are summarized and logs truncated.
+
+    Args:
+        node (GeneralLogicNode): node that has run
+
+    Returns:
+        dict: JSON-serializable record
+    """
+    attributes = {}
+    total_size = 0
+    for attr in node.all_attributes:
+        if attr.attribute_name in [constants.START, constants.COMPLETED]:
+            continue
+        if node.INTERNALS_DICT.get(attr.attribute_name, {}).get("gui_type") in set(
+            constants.PreviewsGUI
+        ):
+            continue  # No need to register preview attrs
+        summary = summarize_value(attr.value)
+        total_size += summary.get("size", 0)
+        attributes[attr.dot_name] = summary
+
+    return {
+        "class_name": node.class_name,
+        "node_name": node.node_name,
+        "full_name": node.full_name,
+        "uuid": node.uuid,
+        "origin_file": Path(node.FILEPATH).name,
+        "context": node.context.full_name if node.context else None,
+        "IS_CONTEXT": node.IS_CONTEXT,
+        "success": node.success,
+        "execution_counter": node.execution_counter,
+        "run_date": node.run_date.strftime("%Y-%m-%d") if node.run_date else None,
+        "run_time": node.run_date.isoformat() if node.run_date else None,
+        "execution_time": node.execution_time,
+        "user": node.user,
+        "attributes": attributes,
+        "attributes_size": total_size,
+        "fail_log": truncate_log(node.fail_log),
+        "error_log": truncate_log(node.error_log),
+    }
+
+
+# -------------------------------- RECORDER -------------------------------- #
+class AnalyticsRecorder:
+    """
+    Submit the analytics record of every node run of a scene as soon as each node finishes, including the nodes
+    inside contexts, at any depth.
+
+    Nodes call it themselves from the thread they run in, not through their signals, so records are never built in
+    the GUI thread. Nodes inside loops get one record per iteration. Nodes that never ran are recorded when the
+    recorder is closed.
+    """
+
+    def __init__(self, submit, flush=None):
+        """
+        Args:
+            submit (callable): called with a list of records, such as AnalyticsSpool.submit
+            flush (callable, optional): called once closed, such as LocalAnalyticsStore.flush. Defaults to None.
+        """
+        self.submit = submit
+        self.flush = flush
+
+        self.scene = None
+        self.records_count = 0
+
+        self._recorded_runs = {}
+        self._lock = threading.Lock()
+
+    # NODES ----------------------
+    @staticmethod
+    def walk_nodes(scene):
+        """
+        Args:
+            scene (LogicScene)
+
+        Yields:
+            GeneralLogicNode: every node of the scene and of the internal scenes of its contexts
+        """
+        for node in scene.all_logic_nodes:
+            yield node
+            if node.IS_CONTEXT and node.internal_scene is not None:
+                yield from AnalyticsRecorder.walk_nodes(node.internal_scene)
+
+    def record(self, node):
+        with self._lock:
+            self._recorded_runs[node.uuid] = node.execution_counter
+            self.records_count += 1
+        try:
+            self.submit([build_record(node)])
+        except Exception as e:
+            LOGGER.exception(e)
+
+    def node_finished(self, node):
+        """
+        Record a node, if it has run since the last time it was recorded.
+
+        Args:
+            node (GeneralLogicNode): node that has just stopped running
+        """
+        if node.success not in RECORDED_STATUSES:
+            return  # Could not run yet, or still in a loop
+        if self._recorded_runs.get(node.uuid) == node.execution_counter:
+            return  # Asked to run again after having run
+        self.record(node)
+
+    # SCENE ----------------------
+    def attach(self, scene):
+        """
+        Start recording the nodes of a scene as they finish.
+
+        Args:
+            scene (LogicScene): scene about to be run
+        """
+        self.scene = scene
+        for node in self.walk_nodes(scene):
+            node.analytics_recorders.append(self)
+
+    def close(self):
+        """
+        Record the nodes that never ran and stop recording.
+        """
+        if self.scene:
+            for node in self.walk_nodes(self.scene):
+                if self in node.analytics_recorders:
+                    node.analytics_recorders.remove(self)
+                if node.uuid not in self._recorded_runs:
+                    self.record(node)
+        if self.flush is not None:
+            try:
+                self.flush()
+            except Exception as e:
+                LOGGER.exception(e)
+        LOGGER.debug("Submitted %d analytics records", self.records_count)
@@ -0,0 +1,144 @@
+__author__ = "Jaime Rivera <jaime.rvq@gmail.com>"
+__copyright__ = "Copyright 2022, Jaime Rivera"
+__credits__ = []
+__license__ = "MIT License"
+
+
+import bisect
+import datetime
+
+from all_nodes import utils
+
+
+LOGGER = utils.get_logger(__name__)
+
+# Upper bounds of the execution time buckets, in seconds. Times above the last one go to an extra bucket.
+LATENCY_BUCKETS = [0.001 * 2**i for i in range(25)]
+PERCENTILES = [50, 90, 99]
+LATENCY_DAYS = 30  # Days the latency chart covers
+
+
+# -------------------------------- ROLLUPS -------------------------------- #
+# Daily rollups of the analytics records, one per day, class, status and whether the node is a context, with:
+# - count: amount of node runs
+# - total_time: sum of their execution times
+# - latency buckets: amount of runs whose execution time falls in each of LATENCY_BUCKETS, to estimate percentiles
+# They are updated as records are inserted, so reports do not need to go through all the records.
+
+
+def get_bucket(seconds: float) -> int:
+    """
+    Args:
+        seconds (float): execution time
+
+    Returns:
+        int: index of the latency bucket the time falls in
+    """
+    return bisect.bisect_left(LATENCY_BUCKETS, seconds)
+
+
+def get_rollup_key(record: dict) -> tuple:
+    return (
+        record["run_date"],
+        record["class_name"],
+        record.get("success"),
+        bool(record.get("IS_CONTEXT")),
+    )
+
+
+def build_increments(records) -> dict:
+    """
+    Add up records into the increments of the rollups they belong to.
+
+    Args:
+        records (iterable): analytics records, only records of nodes that have run are counted
+
+    Returns:
+        dict: "count", "total_time" and "buckets" (amount by bucket index) by rollup key
+    """
+    increments = {}
+    for record in records:
+        if not record.get("run_date"):
+            continue  # Never ran
+        increment = increments.setdefault(
+            get_rollup_key(record), {"count": 0, "total_time": 0.0, "buckets": {}}
+        )
+        increment["count"] += 1
+        execution_time = record.get("execution_time")
+        if execution_time is not None:
+            increment["total_time"] += execution_time
+            bucket = get_bucket(execution_time)
+            increment["buckets"][bucket] = increment["buckets"].get(bucket, 0) + 1
+    return increments
+
+
+def get_latency_cutoff() -> str:
+    """
+    Returns:
+        str: first run date the latency chart covers, as "%Y-%m-%d"
+    """
+    cutoff = datetime.date.today() - datetime.timedelta(days=LATENCY_DAYS)
+    return cutoff.strftime("%Y-%m-%d")
+
+
+# -------------------------------- PERCENTILES -------------------------------- #
+def get_percentile(buckets: dict, percentile: float) -> float:
+    """
+    Estimate a percentile of the execution times counted in some latency buckets.
+
+    Args:
+        buckets (dict): amount of runs by bucket index
+        percentile (float): from 0 to 100
+
+    Returns:
+        float: upper bound of the bucket the percentile falls in, in seconds. None if there are no runs.
+    """
+    total = sum(buckets.values())
+    if not total:
+        return None
+    target = total * percentile / 100
+    cumulative = 0
+    for bucket in sorted(buckets):
+        cumulative += buckets[bucket]
+        if cumulative >= target:
+            break
+    if bucket < len(LATENCY_BUCKETS):
+        return LATENCY_BUCKETS[bucket]
+    return LATENCY_BUCKETS[-1] * 2
+
+
+def summarize_latencies(rows, limit: int = 30):
+    """
+    Get the percentiles of the execution times of every class.
+
+    Args:
+        rows (iterable): (class_name, count, buckets) of rollups, buckets being an amount by bucket index
+        limit (int, optional): amount of classes, the most run ones. Defaults to 30.
+
+    Returns:
+        polars.DataFrame: "class_name", "count" and "p50", "p90"... in seconds
+    """
+    import polars as pl
+
+    counts = {}
+    buckets_by_class = {}
+    for class_name, count, buckets in rows:
+        counts[class_name] = counts.get(class_name, 0) + count
+        class_buckets = buckets_by_class.setdefault(class_name, {})
+        for bucket, amount in buckets.items():
+            bucket = int(bucket)
+            class_buckets[bucket] = class_buckets.get(bucket, 0) + amount
+
+    class_names = sorted(counts, key=lambda c: counts[c], reverse=True)[:limit]
+    data = {
+        "class_name": class_names,
+        "count": [counts[c] for c in class_names],
+    }
+    for percentile in PERCENTILES:
+        data[f"p{percentile}"] = [
+            get_percentile(buckets_by_class[c], percentile) for c in class_names
+        ]
+    return pl.DataFrame(
+        data,
+        schema_overrides={f"p{percentile}": pl.Float64 for percentile in PERCENTILES},
+    )
@@ -0,0 +1,250 @@
+__author__ = "Jaime Rivera <jaime.rvq@gmail.com>"
+__copyright__ = "Copyright 2022, Jaime Rivera"
+__credits__ = []
+__license__ = "MIT License"
+
+
+import atexit
+import contextlib
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+
+from all_nodes import constants
+from all_nodes import utils
+from all_nodes.analytics import analytics
+
+
+LOGGER = utils.get_logger(__name__)
+
+_STOP = object()  # Queued to stop the writer
+
+
+# -------------------------------- SPOOL -------------------------------- #
+class AnalyticsSpool:
+    """
+    Background pipeline that takes analytics records off the hands of the scenes and gets them to the DB.
+
+    Records are put in a bounded in-memory queue and returned from right away. A single long-lived writer thread
+    appends them to a local SQLite spool as soon as they arrive, and uploads the spool in batches, either once
+    BATCH_SIZE records are waiting or when the oldest one has waited FLUSH_INTERVAL seconds.
+
+    If the DB cannot be reached, records stay in the spool (surviving restarts) and are retried every RETRY_INTERVAL
+    seconds. Each record gets an "_id" when spooled, so a batch retried after a partial upload is not duplicated.
+    When the queue is full, submitters wait up to BACKPRESSURE_TIMEOUT and then spool their records themselves.
+    The queue is flushed to the spool on exit.
+    """
+
+    BATCH_SIZE = 500
+    FLUSH_INTERVAL = 5.0
+    RETRY_INTERVAL = 30.0
+    MAX_QUEUED = 10000
+    BACKPRESSURE_TIMEOUT = 0.5
+
+    def __init__(self, spool_file: str, upload=None, enabled: bool = True):
+        """
+        Args:
+            spool_file (str): SQLite file to spool records to
+            upload (callable, optional): called with a list of records, returns True once they are stored.
+                Defaults to analytics.insert_records.
+            enabled (bool, optional): Whether to accept records. Defaults to True.
+        """
+        self.spool_file = spool_file
+        self.upload = upload or analytics.insert_records
+        self.enabled = enabled
+
+        self._queue = queue.Queue(maxsize=self.MAX_QUEUED)
+        self._writer = None
+        self._writer_lock = threading.Lock()
+        self._connection = None  # Only used from the writer thread
+
+        self._pending_since = None
+        self._retry_at = 0
+
+    # SUBMITTING ----------------------
+    def submit(self, records: list):
+        """
+        Queue records to be spooled and uploaded, without waiting for any of it.
+
+        Args:
+            records (list): dicts, JSON-serializable
+        """
+        if not self.enabled or not records:
+            return
+        self.start()
+
+        for i, record in enumerate(records):
+            try:
+                self._queue.put(record, timeout=self.BACKPRESSURE_TIMEOUT)
+            except queue.Full:
+                LOGGER.warning(
+                    "Analytics queue is full, spooling %d records directly",
+                    len(records) - i,
+                )
+                with contextlib.closing(self.connect()) as connection:
+                    self.write_records(connection, records[i:])
+                return
+
+    # SPOOL FILE ----------------------
+    def connect(self) -> sqlite3.Connection:
+        os.makedirs(os.path.dirname(os.path.abspath(self.spool_file)), exist_ok=True)
+        connection = sqlite3.connect(self.spool_file, timeout=30)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS records (id INTEGER PRIMARY KEY, record TEXT NOT NULL)"
+        )
+        return connection
+
+    @staticmethod
+    def write_records(connection: sqlite3.Connection, records: list):
+        rows = []
+        for record in records:
+            record = dict(record)
+            record.setdefault("_id", uuid.uuid4().hex)
+            rows.append((json.dumps(record, default=str),))
+        with connection:
+            connection.executemany("INSERT INTO records (record) VALUES (?)", rows)
+
+    def count_spooled(self) -> int:
+        with contextlib.closing(self.connect()) as connection:
+            return connection.execute("SELECT COUNT(*) FROM records").fetchone()[0]
+
+    # WRITER ----------------------
+    def start(self):
+        """
+        Start the writer thread, if it is not running yet.
+        """
+        with self._writer_lock:
+            if self._writer is not None and self._writer.is_alive():
+                return
+            self._writer = threading.Thread(
+                target=self._write_loop, name="all_nodes_analytics", daemon=True
+            )
+            self._writer.start()
+            atexit.register(self.close)
+
+    def _write_loop(self):
+        self._connection = self.connect()
+        if self.count_spooled():
+            self._pending_since = time.monotonic()  # Left from previous sessions
+
+        stopping = False
+        while not stopping:
+            records = []
+            got = 0
+            try:
+                item = self._queue.get(timeout=self.FLUSH_INTERVAL)
+                got += 1
+                while item is not _STOP:
+                    records.append(item)
+                    if len(records) >= self.BATCH_SIZE:
+                        break
+                    item = self._queue.get_nowait()
+                    got += 1
+                stopping = item is _STOP
+            except queue.Empty:
+                pass
+
+            try:
+                if records:
+                    self.write_records(self._connection, records)
+                    if self._pending_since is None:
+                        self._pending_since = time.monotonic()
+            except Exception as e:
+                LOGGER.exception(e)
+            for _ in range(got):
+                self._queue.task_done()
+
+            try:
+                self._upload_if_due(force=stopping)
+            except Exception as e:
+                LOGGER.exception(e)
+
+        self._connection.close()
+        self._connection = None
+
+    def _upload_if_due(self, force: bool = False):
+        if self._pending_since is None:
+            return
+        now = time.monotonic()
+        if now < self._retry_at and not force:
+            return
+        if not force and now - self._pending_since < self.FLUSH_INTERVAL:
+            pending = self._connection.execute("SELECT COUNT(*) FROM records")
+            if pending.fetchone()[0] < self.BATCH_SIZE:
+                return
+
+        if self._upload_spooled():
+            self._pending_since = None
+        else:
+            self._retry_at = now + self.RETRY_INTERVAL
+
+    def _upload_spooled(self) -> bool:
+        """
+        Upload all the spooled records, batch by batch, removing each batch once it is stored.
+
+        Returns:
+            bool: True if the spool could be emptied
+        """
+        while True:
+            rows = self._connection.execute(
+                "SELECT id, record FROM records ORDER BY id LIMIT ?",
+                (self.BATCH_SIZE,),
+            ).fetchall()
+            if not rows:
+                return True
+            try:
+                uploaded = self.upload([json.loads(row[1]) for row in rows])
+            except Exception as e:
+                LOGGER.warning("Could not upload analytics (%s)", e)
+                uploaded = False
+            if not uploaded:
+                LOGGER.info("Analytics kept in %s, to upload later", self.spool_file)
+                return False
+
+            with self._connection:
+                self._connection.executemany(
+                    "DELETE FROM records WHERE id = ?", [(row[0],) for row in rows]
+                )
+            LOGGER.debug("Uploaded %d analytics records", len(rows))
+
+    # FLUSHING ----------------------
+    def flush(self, timeout: float = None) -> bool:
+        """
+        Wait until every record submitted so far is in the spool.
+
+        Args:
+            timeout (float, optional): seconds to wait for. Defaults to None, forever.
+
+        Returns:
+            bool: True if all were spooled in time
+        """
+        with self._queue.all_tasks_done:
+            return self._queue.all_tasks_done.wait_for(
+                lambda: not self._queue.unfinished_tasks, timeout
+            )
+
+    def close(self, timeout: float = 10):
+        """
+        Stop the writer, once it has spooled the records queued and tried a last upload.
+
+        Args:
+            timeout (float, optional): seconds to wait for the writer. Defaults to 10.
+        """
+        with self._writer_lock:
+            writer = self._writer
+            self._writer = None
+        if writer is None or not writer.is_alive():
+            return
+        self._queue.put(_STOP)
+        writer.join(timeout)
+
+
+ANALYTICS_SPOOL = AnalyticsSpool(
+    os.path.join(constants.ANALYTICS_SPOOL_DIR, "analytics_spool.sqlite"),
+    enabled=bool(analytics.DB_READ_AND_WRITE_PASSWORD),
+)  # Singleton to use
@@ -9,11 +9,10 @@ from enum import Enum
 import logging
 import os
 
-from PySide2 import QtCore
-from PySide2 import QtGui
-
 
 # -------------------------------- GRAPHIC -------------------------------- #
+# Qt pens and brushes live in all_nodes.graphic.graphic_constants
+
 # Overall style
 GLOW_EFFECTS = True
 SHOW_GRID = True
@@ -21,32 +20,36 @@ IN_SCREEN_ERRORS = True
 
 # Line style
 CONNECTOR_LINE_WIDTH = 3
-TEST_LINE_PEN = QtGui.QPen(QtCore.Qt.white, CONNECTOR_LINE_WIDTH, QtCore.Qt.DashLine)
-LINE_GLOW_PEN = QtGui.QPen(QtCore.Qt.magenta, CONNECTOR_LINE_WIDTH * 2)
-VALID_LINE_PEN = QtGui.QPen(QtCore.Qt.white, CONNECTOR_LINE_WIDTH)
 STRAIGHT_LINES = 0
 STEPPED_LINES = 1
 SPLINE_LINES = 2
 CONNECTOR_LINE_GEO = SPLINE_LINES
 
+# Level of detail, depending on the zoom of the view
+DETAIL_FULL = 2
+DETAIL_NO_WIDGETS = 1  # Widgets and glows hidden
+DETAIL_BOXES = 0  # Nodes as plain boxes, without texts, and straight lines
+LOD_WIDGETS_ZOOM = 0.5  # Zoom factor below which widgets and glows are hidden
+LOD_BOXES_ZOOM = 0.25  # Zoom factor below which nodes are drawn as plain boxes
+LOD_UPDATE_DELAY_MS = 50  # Wait after zooming/panning before updating the detail
+LINE_REPATH_INTERVAL_MS = (
+    16  # Lines of moved nodes are repathed in batches, once per frame
+)
+
+# Item index of the scenes, its depth is fixed for scenes with at least BSP_MIN_NODES nodes
+BSP_MIN_NODES = 200
+BSP_MAX_DEPTH = 14
+
 # Node style
 STRIPE_HEIGHT = 20
 CHAMFER_RADIUS = STRIPE_HEIGHT / 2
 HEADER_HEIGHT = int(STRIPE_HEIGHT * 1.5)
 NODE_CONTOUR_THICKNESS = 1.0
-NODE_SELECTED_PEN = QtGui.QPen(QtCore.Qt.white, 2.5)
-NODE_SELECTED_GLOW_THICKNESS = NODE_SELECTED_PEN.width() * 2.5
-NODE_ERROR_PEN = QtGui.QPen(QtCore.Qt.red, 2, QtCore.Qt.DashDotDotLine)
-NODE_DEACTIVATED_PEN = QtGui.QPen(QtGui.QColor(250, 0, 0, 235), 10)
-NODE_ERROR_BRUSH = QtGui.QBrush(QtCore.Qt.red, QtCore.Qt.BDiagPattern)
-NODE_FAILED_PEN = QtGui.QPen(QtGui.QColor("orange"), 2, QtCore.Qt.DashDotDotLine)
-NODE_FAILED_BRUSH = QtGui.QBrush(QtGui.QColor("orange"), QtCore.Qt.BDiagPattern)
 NODE_FONT = "arial"
 DEFAULT_NODE_COLOR = "#4D004C"  # magenta
 
 # Plug style
 PLUG_RADIUS = int(0.3 * STRIPE_HEIGHT)
-CONNECTOR_USED_PEN = QtGui.QPen(QtCore.Qt.white, 3)
 
 # Naming
 GRAPHIC_NODE = "GRAPHIC_NODE"
@@ -57,6 +60,9 @@ CONNECTOR_LINE = "CONNECTOR_LINE"
 
 GRAPHIC_ANNOTATION = "GRAPHIC_ANNOTATION"
 
+# Autosave
+AUTOSAVE_INTERVAL_MS = 2 * 60 * 1000
+
 
 # -------------------------------- LOGIC -------------------------------- #
 # Naming
@@ -76,6 +82,29 @@ SKIPPED = "SKIPPED"
 SUCCESSFUL = "SUCCESSFUL"
 FAILED = "FAILED"
 ERROR = "ERROR"
+TIMEOUT = "TIMEOUT"
+
+# Cancellation
+# Reason of tokens cancelled by hand, TIMEOUT being the other one
+CANCELLED = "CANCELLED"
+# Seconds nodes doing web requests wait for a response
+REQUEST_TIMEOUT = float(os.getenv("ALL_NODES_REQUEST_TIMEOUT", 60))
+
+# Scheduling
+# Amount of each resource that can be taken at once by the nodes running, "download" being per host
+RESOURCE_LIMITS = {"cpu": os.cpu_count() or 1, "subprocess": 4, "download": 16}
+# Memory (in MB) the nodes running can declare to be using at once, 0 uses 75% of the physical memory
+MEMORY_BUDGET_MB = float(os.getenv("ALL_NODES_MEMORY_BUDGET_MB", 0))
+# Seconds assumed for the classes that have not run yet, when finding critical paths
+DEFAULT_NODE_DURATION = 0.01
+
+# Scene loading
+LOADING_CHUNK_SIZE = 250  # Nodes/connections created between each progress report
+
+# Spilling of oversized values to disk
+# Values bigger than the threshold are written to disk, 0 disables it
+SPILL_THRESHOLD_MB = float(os.getenv("ALL_NODES_SPILL_THRESHOLD_MB", 0))
+SPILL_DIR = os.getenv("ALL_NODES_SPILL_DIR")  # None uses the system temp folder
 
 
 # -------------------------------- GUI INPUT / PREVIEW TYPES -------------------------------- #
@@ -101,6 +130,8 @@ class PreviewsGUI(Enum):
 
 # -------------------------------- LOGGING PREFS -------------------------------- #
 LOGGING_LEVEL = logging.INFO
+QUIET_LOGGING_LEVEL = logging.WARNING  # For high-throughput batch runs
+LOG_REPR_MAX_LENGTH = 200  # Values are truncated to this many characters when logged
 CONSOLE_LOG_FORMATTER = logging.Formatter(
     "%(asctime)s.%(msecs)03d %(levelname)8s- %(message)s (%(funcName)s) %(filename)s:%(lineno)d",
     datefmt="%Y%m%d %H:%M:%S",
@@ -119,3 +150,11 @@ if IN_DEV:
 DB_ENV = os.getenv("DB_ENV", "PROD")
 if IN_DEV:
     DB_ENV = "DEV"
+# Local folder where analytics wait to be uploaded
+ANALYTICS_SPOOL_DIR = os.getenv(
+    "ALL_NODES_ANALYTICS_SPOOL_DIR", os.path.join(os.path.expanduser("~"), ".all_nodes")
+)
+# Local folder to also store analytics in, as Parquet, for machines that cannot reach the DB
+LOCAL_ANALYTICS_DIR = os.getenv("ALL_NODES_LOCAL_ANALYTICS_DIR")
+# Local port to serve live metrics of the engine at, if any
+METRICS_PORT = os.getenv("ALL_NODES_METRICS_PORT")
@@ -0,0 +1,34 @@
+# -*- coding: UTF-8 -*-
+__author__ = "Jaime Rivera <jaime.rvq@gmail.com>"
+__copyright__ = "Copyright 2022, Jaime Rivera"
+__credits__ = []
+__license__ = "MIT License"
+
+
+from PySide2 import QtCore
+from PySide2 import QtGui
+
+from all_nodes import constants
+
+
+# -------------------------------- GRAPHIC -------------------------------- #
+# Qt-dependent style objects, kept here so the logic layer never needs to import Qt
+
+# Line style
+TEST_LINE_PEN = QtGui.QPen(
+    QtCore.Qt.white, constants.CONNECTOR_LINE_WIDTH, QtCore.Qt.DashLine
+)
+LINE_GLOW_PEN = QtGui.QPen(QtCore.Qt.magenta, constants.CONNECTOR_LINE_WIDTH * 2)
+VALID_LINE_PEN = QtGui.QPen(QtCore.Qt.white, constants.CONNECTOR_LINE_WIDTH)
+
+# Node style
+NODE_SELECTED_PEN = QtGui.QPen(QtCore.Qt.white, 2.5)
+NODE_SELECTED_GLOW_THICKNESS = NODE_SELECTED_PEN.width() * 2.5
+NODE_ERROR_PEN = QtGui.QPen(QtCore.Qt.red, 2, QtCore.Qt.DashDotDotLine)
+NODE_DEACTIVATED_PEN = QtGui.QPen(QtGui.QColor(250, 0, 0, 235), 10)
+NODE_ERROR_BRUSH = QtGui.QBrush(QtCore.Qt.red, QtCore.Qt.BDiagPattern)
+NODE_FAILED_PEN = QtGui.QPen(QtGui.QColor("orange"), 2, QtCore.Qt.DashDotDotLine)
+NODE_FAILED_BRUSH = QtGui.QBrush(QtGui.QColor("orange"), QtCore.Qt.BDiagPattern)
+
+# Plug style
+CONNECTOR_USED_PEN = QtGui.QPen(QtCore.Qt.white, 3)
@@ -17,6 +17,8 @@ from PySide2 import QtSvg
 
 from all_nodes import constants
 from all_nodes import utils
+from all_nodes.graphic import graphic_constants
+from all_nodes.graphic import graphic_utils
 from all_nodes.logic.global_signaler import GLOBAL_SIGNALER as GS
 from all_nodes.graphic.widgets.small_widgets import FakeConsole, NodeHelpWindow
 
@@ -47,7 +49,7 @@ class GeneralGraphicNode(QtWidgets.QGraphicsPathItem):
 
         # COLOR
         self.base_color = QtGui.QColor(color_name)
-        self.bright_color_name = utils.get_bright_color(color_name)
+        self.bright_color_name = graphic_utils.get_bright_color(color_name)
 
         # SUB-ITEMS
         if "svg" in self.logic_node.ICON_PATH:
@@ -106,6 +108,10 @@ class GeneralGraphicNode(QtWidgets.QGraphicsPathItem):
         self.proxy_preview_widgets = []
         self.preview_widget_registry = []
 
+        # LEVEL OF DETAIL
+        self.detail_level = constants.DETAIL_FULL
+        self.widgets_in_view = True
+
         # SETUP
         self.setup_node()
         self.setup_graphic_attributes()
@@ -119,10 +125,12 @@ class GeneralGraphicNode(QtWidgets.QGraphicsPathItem):
 
         self.update_attributes_from_widgets()
 
-        # Connect
-        self.logic_node.signaler.is_executing.connect(self.show_executing)
-        self.logic_node.signaler.status_changed.connect(self.show_result)
-        self.logic_node.signaler.finished.connect(self.show_result)
+        # Connect, only the latest status is shown so repeated updates can be merged
+        self.logic_node.signaler.is_executing.connect(
+            self.show_executing, coalesce=True
+        )
+        self.logic_node.signaler.status_changed.connect(self.show_result, coalesce=True)
+        self.logic_node.signaler.finished.connect(self.show_result, coalesce=True)
 
     # PROPERTIES ----------------------
     @property
@@ -301,6 +309,7 @@ class GeneralGraphicNode(QtWidgets.QGraphicsPathItem):
         self.make_shape()
         self.place_graphic_attributes()
         self.place_widgets()
+        self.set_detail_level(self.detail_level)
 
         # Feedback
         GS.signals.main_screen_feedback.emit(
@@ -338,7 +347,8 @@ class GeneralGraphicNode(QtWidgets.QGraphicsPathItem):
             self.base_color.blue() + 50,
         )
         grad.setColorAt(1.0, lighter_color)
-        self.setBrush(grad)
+        self.fill_brush = QtGui.QBrush(grad)
+        self.setBrush(self.fill_brush)
 
         # STRIPES
         for stripe in self.stripes:
@@ -373,7 +383,8 @@ class GeneralGraphicNode(QtWidgets.QGraphicsPathItem):
 
         # GLOW
         glow_pen = QtGui.QPen(
-            QtGui.QColor(self.bright_color_name), constants.NODE_SELECTED_GLOW_THICKNESS
+            QtGui.QColor(self.bright_color_name),
+            graphic_constants.NODE_SELECTED_GLOW_THICKNESS,
         )
         self.glow.setPen(glow_pen)
         self.glow.setPath(new_path)
@@ -384,7 +395,7 @@ class GeneralGraphicNode(QtWidgets.QGraphicsPathItem):
 
         # SELECTION MARQUEE
         self.selection_marquee.setPath(new_path)
-        self.selection_marquee.setPen(constants.NODE_SELECTED_PEN)
+        self.selection_marquee.setPen(graphic_constants.NODE_SELECTED_PEN)
         self.selection_marquee.setZValue(50)
 
         # DEACTIVATED CROSS
@@ -405,7 +416,7 @@ class GeneralGraphicNode(QtWidgets.QGraphicsPathItem):
             ),
         )
         self.deactivated_cross.setPath(x_path)
-        self.deactivated_cross.setPen(constants.NODE_DEACTIVATED_PEN)
+        self.deactivated_cross.setPen(graphic_constants.NODE_DEACTIVATED_PEN)
         self.deactivated_cross.setZValue(300)
 
         # ERROR MARQUEE
@@ -1009,18 +1020,22 @@ class GeneralGraphicNode(QtWidgets.QGraphicsPathItem):
             )
             self.error_marquee.hide()
 
-        elif self.logic_node.success in [constants.FAILED, constants.ERROR]:
+        elif self.logic_node.success in [
+            constants.FAILED,
+            constants.ERROR,
+            constants.TIMEOUT,
+        ]:
             self.error_marquee.show()
 
             if self.logic_node.success == constants.FAILED:
                 self.badge_icon.setElementId("failed")
-                self.error_marquee.setPen(constants.NODE_FAILED_PEN)
-                self.error_marquee.setBrush(constants.NODE_FAILED_BRUSH)
+                self.error_marquee.setPen(graphic_constants.NODE_FAILED_PEN)
+                self.error_marquee.setBrush(graphic_constants.NODE_FAILED_BRUSH)
 
-            elif self.logic_node.success == constants.ERROR:
+            elif self.logic_node.success in [constants.ERROR, constants.TIMEOUT]:
                 self.badge_icon.setElementId("error")
-                self.error_marquee.setPen(constants.NODE_ERROR_PEN)
-                self.error_marquee.setBrush(constants.NODE_ERROR_BRUSH)
+                self.error_marquee.setPen(graphic_constants.NODE_ERROR_PEN)
+                self.error_marquee.setBrush(graphic_constants.NODE_ERROR_BRUSH)
 
             # Full feedback
             html_text = ""
@@ -1044,6 +1059,7 @@ class GeneralGraphicNode(QtWidgets.QGraphicsPathItem):
             constants.SUCCESSFUL,
             constants.FAILED,
             constants.ERROR,
+            constants.TIMEOUT,
         ]:
             self.update_previews_from_attributes()
 
@@ -1163,25 +1179,72 @@ class GeneralGraphicNode(QtWidgets.QGraphicsPathItem):
         elif change in [
             QtWidgets.QGraphicsItem.GraphicsItemChange.ItemScenePositionHasChanged
         ]:
+            self.logic_node.mark_modified()  # Position is saved along with the node
             self.redraw_lines()
 
         return QtWidgets.QGraphicsItem.itemChange(self, change, value)
 
     # CONNECTIONS/LINES ----------------------
     def redraw_lines(self):
+        if self.scene() is None:
+            return
         self.scene().redraw_node_lines(self)
 
     def clear_all_connections(self):
         for g_a in self.graphic_attributes:
             g_a.clear_connections()
 
+    # LEVEL OF DETAIL ----------------------
+    def set_detail_level(self, detail_level: int):
+        """
+        Simplify the node when zoomed out: widgets and glows are hidden below constants.LOD_WIDGETS_ZOOM, and the
+        node drawn as a plain box without texts below constants.LOD_BOXES_ZOOM.
+
+        Args:
+            detail_level (int): such as constants.DETAIL_FULL
+        """
+        self.detail_level = detail_level
+        simplified = detail_level == constants.DETAIL_BOXES
+
+        self.setBrush(self.base_color if simplified else self.fill_brush)
+        for item in [self.class_icon, self.class_text] + self.stripes:
+            item.setVisible(not simplified)
+        self.glow.setVisible(
+            self.isSelected()
+            and constants.GLOW_EFFECTS
+            and detail_level == constants.DETAIL_FULL
+        )
+        for g_a in self.graphic_attributes:
+            g_a.set_detail_level(detail_level)
+
+        self.update_widgets_visibility()
+
+    def set_widgets_in_view(self, in_view: bool):
+        """
+        Args:
+            in_view (bool): whether the node is in view, otherwise its widgets are hidden so they are not painted
+        """
+        self.widgets_in_view = in_view
+        self.update_widgets_visibility()
+
+    def update_widgets_visibility(self):
+        show_widgets = (
+            self.widgets_in_view and self.detail_level == constants.DETAIL_FULL
+        )
+        for proxy in (
+            [self.proxy_help_btn]
+            + self.proxy_input_widgets
+            + self.proxy_preview_widgets
+        ):
+            proxy.setVisible(show_widgets)
+
     # VISUAL FEEDBACK ----------------------
     def set_selected_appearance(self):
         self.setZValue(10)
 
         if self.isSelected():
             self.selection_marquee.show()
-            if constants.GLOW_EFFECTS:
+            if constants.GLOW_EFFECTS and self.detail_level == constants.DETAIL_FULL:
                 self.glow.show()
         else:
             self.glow.hide()
@@ -1441,7 +1504,7 @@ class GeneralGraphicAttribute(QtWidgets.QGraphicsPathItem):
         self.glow.setPath(plug_path)
         glow_pen = QtGui.QPen(
             QtGui.QColor(self.parent_node.bright_color_name),
-            constants.NODE_SELECTED_GLOW_THICKNESS,
+            graphic_constants.NODE_SELECTED_GLOW_THICKNESS,
         )
         self.glow.setPen(glow_pen)
         blur = QtWidgets.QGraphicsBlurEffect()
@@ -1540,11 +1603,26 @@ class GeneralGraphicAttribute(QtWidgets.QGraphicsPathItem):
         return self.logic_attribute.has_input_connected()
 
     # VISUAL FEEDBACK ----------------------
+    def set_detail_level(self, detail_level: int):
+        """
+        Args:
+            detail_level (int): such as constants.DETAIL_FULL
+        """
+        self.attr_text.setVisible(detail_level != constants.DETAIL_BOXES)
+        self.glow.setVisible(
+            bool(self.connected_graphic_attrs)
+            and constants.GLOW_EFFECTS
+            and detail_level == constants.DETAIL_FULL
+        )
+
     def show_connected_status(self):
         if self.connected_graphic_attrs:
-            if constants.GLOW_EFFECTS:
+            if (
+                constants.GLOW_EFFECTS
+                and self.parent_node.detail_level == constants.DETAIL_FULL
+            ):
                 self.glow.show()
-            self.plug_polygon.setPen(constants.CONNECTOR_USED_PEN)
+            self.plug_polygon.setPen(graphic_constants.CONNECTOR_USED_PEN)
         else:
             self.glow.hide()
             self.plug_polygon.setPen(
@@ -14,14 +14,15 @@ import pprint
 import re
 import subprocess
 import sys
+import tempfile
 
 from PySide2 import QtWidgets
 from PySide2 import QtCore
 from PySide2 import QtGui
-import yaml
 
 from all_nodes import constants
 from all_nodes import utils
+from all_nodes.graphic import graphic_constants
 from all_nodes.graphic.graphic_annotation import GeneralGraphicAnnotation
 from all_nodes.graphic.graphic_node import GeneralGraphicNode, GeneralGraphicAttribute
 from all_nodes.graphic.widgets.attribute_picker import AttributePicker
@@ -49,6 +50,16 @@ class CustomGraphicsView(QtWidgets.QGraphicsView):
         self.setTransformationAnchor(QtWidgets.QGraphicsView.AnchorUnderMouse)
         self.setResizeAnchor(QtWidgets.QGraphicsView.NoAnchor)
 
+        self.setViewportUpdateMode(QtWidgets.QGraphicsView.SmartViewportUpdate)
+        self.setOptimizationFlag(QtWidgets.QGraphicsView.DontSavePainterState)
+        self.setCacheMode(QtWidgets.QGraphicsView.CacheBackground)
+
+        # Level of detail, updated once zooming/panning stops for a moment
+        self.detail_timer = QtCore.QTimer(self)
+        self.detail_timer.setSingleShot(True)
+        self.detail_timer.setInterval(constants.LOD_UPDATE_DELAY_MS)
+        self.detail_timer.timeout.connect(self.update_detail)
+
         self.drag_pos = None
         self.middle_pressed = False
         self.left_pressed = False
@@ -88,9 +99,7 @@ class CustomGraphicsView(QtWidgets.QGraphicsView):
         # Signals connection
         self.reset_btn.clicked.connect(self.reset)
         self.run_btn.clicked.connect(self.run)
-        self.stop_button.clicked.connect(
-            lambda: AS.set_state_var("stop_execution", True)
-        )
+        self.stop_button.clicked.connect(self.stop)
         self.stop_button.clicked.connect(
             lambda: self.show_feedback("Execution stopped", level=logging.WARNING)
         )
@@ -120,6 +129,14 @@ class CustomGraphicsView(QtWidgets.QGraphicsView):
             self.run_btn.setEnabled(False)
             self.reset_btn.setEnabled(False)
 
+    def stop(self):
+        """
+        Stop the execution of the current scene, interrupting the nodes that are running.
+        """
+        AS.set_state_var("stop_execution", True)
+        if self.scene():
+            self.scene().logic_scene.cancel()
+
     def reset(self):
         """
         Reset the current scene.
@@ -128,6 +145,37 @@ class CustomGraphicsView(QtWidgets.QGraphicsView):
             self.scene().reset_graphic_scene()
             GS.signals.attribute_editor_global_refresh_requested.emit()
 
+    # LEVEL OF DETAIL ----------------------
+    def get_detail_level(self) -> int:
+        """
+        Returns:
+            int: level of detail the nodes should be drawn with at the current zoom, such as constants.DETAIL_FULL
+        """
+        zoom = self.transform().m11()
+        if zoom < constants.LOD_BOXES_ZOOM:
+            return constants.DETAIL_BOXES
+        elif zoom < constants.LOD_WIDGETS_ZOOM:
+            return constants.DETAIL_NO_WIDGETS
+        return constants.DETAIL_FULL
+
+    def schedule_detail_update(self):
+        self.detail_timer.start()
+
+    def update_detail(self):
+        """
+        Apply the level of detail of the current zoom to the scene, and show the widgets of the nodes in view only.
+        """
+        if not self.scene():
+            return
+        detail_level = self.get_detail_level()
+        self.setRenderHint(
+            QtGui.QPainter.Antialiasing, detail_level != constants.DETAIL_BOXES
+        )
+        self.scene().set_detail_level(detail_level)
+        self.scene().update_widgets_in_view(
+            self.mapToScene(self.viewport().rect()).boundingRect()
+        )
+
     # UTILITY ----------------------
     def show_feedback(self, message, level=logging.INFO):
         """
@@ -201,6 +249,7 @@ class CustomGraphicsView(QtWidgets.QGraphicsView):
         self.stop_button.move(30, self.height() - 120)
 
         QtWidgets.QGraphicsView.resizeEvent(self, event)
+        self.schedule_detail_update()
 
     # MOUSE EVENTS ----------------------
     def mousePressEvent(self, event):
@@ -224,6 +273,7 @@ class CustomGraphicsView(QtWidgets.QGraphicsView):
             deltaX = disp.x() / transform.m11()
             deltaY = disp.y() / transform.m22()
             self.translate(deltaX, deltaY)
+            self.schedule_detail_update()
 
         QtWidgets.QGraphicsView.mouseMoveEvent(self, event)
 
@@ -242,6 +292,11 @@ class CustomGraphicsView(QtWidgets.QGraphicsView):
             self.scale(zoom_increase, zoom_increase)
         else:
             self.scale(zoom_decrease, zoom_decrease)
+        self.schedule_detail_update()
+
+    def scrollContentsBy(self, dx, dy):
+        QtWidgets.QGraphicsView.scrollContentsBy(self, dx, dy)
+        self.schedule_detail_update()
 
     # DRAG AND DROP EVENT ----------------------
     def dragEnterEvent(self, event):
@@ -264,6 +319,20 @@ class CustomScene(QtWidgets.QGraphicsScene):
 
         # Nodes
         self.all_graphic_nodes = set()
+        self.nodes_with_widgets = (
+            set()
+        )  # Nodes showing their widgets, as they are in view
+
+        # Lines, indexed by the nodes they connect
+        self.lines_by_node = dict()
+        self.lines_to_repath = set()
+        self.repath_timer = QtCore.QTimer(self)
+        self.repath_timer.setSingleShot(True)
+        self.repath_timer.setInterval(constants.LINE_REPATH_INTERVAL_MS)
+        self.repath_timer.timeout.connect(self.repath_pending_lines)
+
+        # Level of detail
+        self.detail_level = constants.DETAIL_FULL
 
         # Annotations
         self.all_graphic_annotations = set()
@@ -276,7 +345,28 @@ class CustomScene(QtWidgets.QGraphicsScene):
         self.testing_path.hide()
         self.addItem(self.testing_path)
 
+        # Autosave
+        self.autosave_timer = QtCore.QTimer(self)
+        self.autosave_timer.timeout.connect(self.autosave)
+
     # SCENE SETUP ----------------------
+    def tune_item_index(self, node_count: int):
+        """
+        Fix the depth of the BSP tree the items are indexed in, for the amount of nodes the scene will have.
+
+        Left to Qt, the depth is re-tuned (and the whole index rebuilt) over and over as many items are added, so big
+        scenes get a depth deep enough for about one node per leaf instead.
+
+        Args:
+            node_count (int): amount of nodes the scene is going to have
+        """
+        if node_count < constants.BSP_MIN_NODES:
+            return
+        depth = min(math.ceil(math.log2(node_count)), constants.BSP_MAX_DEPTH)
+        if depth > self.bspTreeDepth():
+            self.setBspTreeDepth(depth)
+            LOGGER.debug("Item index depth set to {}".format(depth))
+
     def drawBackground(self, painter, rect):
         pen = QtGui.QPen(QtGui.QColor(255, 230, 255, 150), 2)
         painter.setPen(pen)
@@ -286,6 +376,48 @@ class CustomScene(QtWidgets.QGraphicsScene):
             if i > rect.y() and i < rect.y() + rect.height():
                 painter.drawLine(QtCore.QLine(-20_000, i, 20_000, i))
 
+    # LEVEL OF DETAIL ----------------------
+    def get_connector_lines(self) -> set:
+        return set().union(*self.lines_by_node.values())
+
+    def request_detail_update(self):
+        for view in self.views():
+            if isinstance(view, CustomGraphicsView):
+                view.schedule_detail_update()
+
+    def set_detail_level(self, detail_level: int):
+        """
+        Args:
+            detail_level (int): such as constants.DETAIL_FULL
+        """
+        if detail_level == self.detail_level:
+            return
+        self.detail_level = detail_level
+        for node in self.all_graphic_nodes:
+            node.set_detail_level(detail_level)
+        for line in self.get_connector_lines():
+            line.set_detail_level(detail_level)
+
+    def update_widgets_in_view(self, rect: QtCore.QRectF):
+        """
+        Show the widgets of the nodes in view, and hide the ones of the nodes that are not, so they are not painted
+        or updated. Only the nodes found in the item index are checked, not all of them.
+
+        Args:
+            rect (QtCore.QRectF): area of the scene in view
+        """
+        if self.detail_level != constants.DETAIL_FULL:
+            return  # Widgets are hidden anyway
+
+        nodes_in_view = {
+            item for item in self.items(rect) if item.data(0) == constants.GRAPHIC_NODE
+        }
+        for node in self.nodes_with_widgets - nodes_in_view:
+            node.set_widgets_in_view(False)
+        for node in nodes_in_view - self.nodes_with_widgets:
+            node.set_widgets_in_view(True)
+        self.nodes_with_widgets = nodes_in_view
+
     # ANNOTATIONS ----------------------
     def add_annotation_by_type(
         self, annotation_type: str, x: int = 0, y: int = 0
@@ -297,6 +429,19 @@ class CustomScene(QtWidgets.QGraphicsScene):
         return new_annotation
 
     # ADD AND DELETE NODES ----------------------
+    def track_graphic_node(self, graphic_node: GeneralGraphicNode):
+        """
+        Keep track of a graphic node just added to this scene.
+
+        Args:
+            graphic_node (GeneralGraphicNode): node added
+        """
+        self.all_graphic_nodes.add(graphic_node)
+        self.nodes_with_widgets.add(graphic_node)
+        self.tune_item_index(len(self.all_graphic_nodes))
+        graphic_node.set_detail_level(self.detail_level)
+        self.request_detail_update()
+
     def add_graphic_node_by_class_name(
         self, node_classname: str, x: int = 0, y: int = 0
     ) -> GeneralGraphicNode:
@@ -322,7 +467,7 @@ class CustomScene(QtWidgets.QGraphicsScene):
                         )
                         new_graph_node = GeneralGraphicNode(new_logic_node, color)
                         self.addItem(new_graph_node)
-                        self.all_graphic_nodes.add(new_graph_node)
+                        self.track_graphic_node(new_graph_node)
                         new_graph_node.setPos(x, y)
                         GS.signals.main_screen_feedback.emit(
                             "Created graphic node {}".format(node_classname),
@@ -357,14 +502,14 @@ class CustomScene(QtWidgets.QGraphicsScene):
                 for name, _ in all_classes[lib][m]["classes"]:
                     if logic_node.class_name == name:
                         new_graph_node = GeneralGraphicNode(logic_node, color)
+                        new_graph_node.moveBy(x, y)  # Before adding, no lines to redraw
                         self.addItem(new_graph_node)
-                        self.all_graphic_nodes.add(new_graph_node)
+                        self.track_graphic_node(new_graph_node)
                         LOGGER.info(
                             "Created graphic node from logic node {} at x:{} y:{}".format(
                                 logic_node.node_name, x, y
                             )
                         )
-                        new_graph_node.moveBy(x, y)
                         if not logic_node.active:
                             new_graph_node.show_deactivated()
                         return new_graph_node
@@ -379,6 +524,7 @@ class CustomScene(QtWidgets.QGraphicsScene):
         self.clear_node_lines(graphic_node)
         graphic_node.clear_all_connections()
         self.all_graphic_nodes.remove(graphic_node)
+        self.nodes_with_widgets.discard(graphic_node)
         self.removeItem(graphic_node)
 
         self.logic_scene.remove_node_by_name(graphic_node.logic_node.node_name)
@@ -407,16 +553,15 @@ class CustomScene(QtWidgets.QGraphicsScene):
         """
 
         # Remove previously existing lines between these graphic_attrs
-        for item in self.items():
-            if item.data(0) == constants.CONNECTOR_LINE:
-                if graphic_attr_1 in [
-                    item.data(1),
-                    item.data(2),
-                ] and graphic_attr_2 in [
-                    item.data(1),
-                    item.data(2),
-                ]:
-                    self.removeItem(item)
+        for item in self.get_node_lines(graphic_attr_1.parent_node):
+            if graphic_attr_1 in [
+                item.data(1),
+                item.data(2),
+            ] and graphic_attr_2 in [
+                item.data(1),
+                item.data(2),
+            ]:
+                self.removeItem(item)
 
         # Connect
         can_connect, reason = graphic_attr_1.connect_graphic_attr(
@@ -428,11 +573,8 @@ class CustomScene(QtWidgets.QGraphicsScene):
                 logging.DEBUG,
             )
             if graphic_attr_2.connector_type == constants.INPUT:
-                for line in self.items():
-                    if line.data(0) == constants.CONNECTOR_LINE and graphic_attr_2 in [
-                        line.data(1),
-                        line.data(2),
-                    ]:
+                for line in self.get_node_lines(graphic_attr_2.parent_node):
+                    if graphic_attr_2 in [line.data(1), line.data(2)]:
                         self.removeItem(line)
             self.draw_valid_line(graphic_attr_1, graphic_attr_2)
         else:
@@ -452,29 +594,54 @@ class CustomScene(QtWidgets.QGraphicsScene):
         connector_line = ConnectorLine(graphic_attr_1, graphic_attr_2)
         self.addItem(connector_line)
         connector_line.setZValue(-1)
+        for graphic_attr in [graphic_attr_1, graphic_attr_2]:
+            self.lines_by_node.setdefault(graphic_attr.parent_node, set()).add(
+                connector_line
+            )
+        if self.detail_level != constants.DETAIL_FULL:
+            connector_line.set_detail_level(self.detail_level)
+
+    def get_node_lines(self, node: GeneralGraphicNode) -> list:
+        """
+        Args:
+            node (GeneralGraphicNode)
+
+        Returns:
+            list: lines that arrive to/from the node
+        """
+        return list(self.lines_by_node.get(node, []))
 
     def redraw_node_lines(self, node: GeneralGraphicNode):
         """
         Redraw all input and output lines that arrive to/from a node.
 
+        Lines are not repathed right away but in a batch, at most once per frame, so dragging many nodes repaths
+        each of their lines once, even if both of its nodes moved.
+
         Args:
             node (GeneralGraphicNode): node to redraw lines for
         """
-        graphic_attrs = [
-            c
-            for c in self.items()
-            if c.data(0) == constants.GRAPHIC_ATTRIBUTE and c.parent_node == node
-        ]
-
-        for g in graphic_attrs:
-            g_1, g_2 = None, None
-            for line in self.items():
-                if line.data(0) != constants.CONNECTOR_LINE:
-                    continue
-                g_1, g_2 = line.data(1), line.data(2)
-
-                if g in [g_1, g_2]:
-                    line.repath()
+        lines = self.lines_by_node.get(node)
+        if not lines:
+            return
+        self.lines_to_repath.update(lines)
+        if not self.repath_timer.isActive():
+            self.repath_timer.start()
+
+    def repath_pending_lines(self):
+        lines, self.lines_to_repath = self.lines_to_repath, set()
+        for line in lines:
+            line.repath()
+
+    def removeItem(self, item):
+        if item.data(0) == constants.CONNECTOR_LINE:
+            for graphic_attr in [item.graphic_attr_1, item.graphic_attr_2]:
+                if graphic_attr is not None:
+                    self.lines_by_node.get(graphic_attr.parent_node, set()).discard(
+                        item
+                    )
+            self.lines_to_repath.discard(item)
+        QtWidgets.QGraphicsScene.removeItem(self, item)
 
     def disconnect_graphic_attrs(
         self,
@@ -498,15 +665,9 @@ class CustomScene(QtWidgets.QGraphicsScene):
         Args:
             node (GeneralGraphicNode): node to remove lines for
         """
-        for line in self.items():
-            g_1, g_2 = line.data(1), line.data(2)
-            if g_1 is None or g_2 is None:
-                continue
-            if line.data(0) == constants.CONNECTOR_LINE and node in [
-                g_1.parent_node,
-                g_2.parent_node,
-            ]:
-                self.removeItem(line)
+        for line in self.get_node_lines(node):
+            self.removeItem(line)
+        self.lines_by_node.pop(node, None)
 
     # SAVE AND LOAD ----------------------
     def set_filepath(self, filepath):
@@ -541,15 +702,28 @@ class CustomScene(QtWidgets.QGraphicsScene):
             if button == QtWidgets.QMessageBox.No:
                 return
 
+        # Save logic scene
+        self.logic_scene.save_to_file(target_file, self.get_scene_dict())
+
+    def get_scene_dict(self) -> dict:
+        """
+        Get the dict that represents this graphic scene: the logic scene info plus the xy
+        coords of nodes and the annotations.
+
+        Returns:
+            dict: dict that represents the scene
+        """
         # Grab logic scene info and add the xy coords
         the_dict = self.logic_scene.convert_scene_to_dict()
+        node_dicts_by_name = {
+            next(iter(node_dict)): node_dict for node_dict in the_dict.get("nodes", [])
+        }
         for g_node in self.all_graphic_nodes:
-            node_name = g_node.logic_node.node_name
-            for node_dict in the_dict["nodes"]:
-                if node_name in node_dict:
-                    node_dict[node_name]["x_pos"] = int(g_node.scenePos().x())
-                    node_dict[node_name]["y_pos"] = int(g_node.scenePos().y())
-                    break
+            node_dict = node_dicts_by_name.get(g_node.logic_node.node_name)
+            if node_dict is not None:
+                node_dict = next(iter(node_dict.values()))
+                node_dict["x_pos"] = int(g_node.scenePos().x())
+                node_dict["y_pos"] = int(g_node.scenePos().y())
 
         # Add annotations
         if self.all_graphic_annotations:
@@ -565,39 +739,121 @@ class CustomScene(QtWidgets.QGraphicsScene):
                 the_dict["annotations"].append(annotation_dict)
                 annotation_count += 1
 
-        # Save logic scene
-        self.logic_scene.save_to_file(target_file, the_dict)
+        return the_dict
+
+    def get_autosave_path(self) -> str:
+        """
+        Get the filepath this scene is autosaved to: next to the scene file if it has one,
+        in the temp folder otherwise.
+
+        Returns:
+            str: autosave filepath
+        """
+        if self.filepath:
+            return self.filepath + ".autosave"
+        return os.path.join(
+            tempfile.gettempdir(), "all_nodes_autosave_{}.yml".format(id(self))
+        )
+
+    def set_autosave(self, enabled: bool):
+        """
+        Enable or disable periodic autosaving of this scene.
+
+        Args:
+            enabled (bool): whether to autosave
+        """
+        if enabled:
+            self.autosave_timer.start(constants.AUTOSAVE_INTERVAL_MS)
+        else:
+            self.autosave_timer.stop()
 
-    def load_from_file(self, source_file: str, create_logic_nodes=True):
+    def autosave(self):
+        """
+        Save this scene to its autosave filepath, only re-serializing nodes changed since the last save.
+        """
+        if not self.all_graphic_nodes:
+            return
+
+        autosave_path = self.get_autosave_path()
+        self.logic_scene.save_to_file(
+            autosave_path, self.get_scene_dict(), incremental=True
+        )
+        GS.signals.main_screen_feedback.emit(
+            "Autosaved scene to {}".format(autosave_path), logging.DEBUG
+        )
+
+    def load_from_file(
+        self, source_file: str, create_logic_nodes=True, progress_callback=None
+    ):
         """
         Create a graphic scene from a file.
 
+        The scene is built in chunks, giving control back to the Qt event loop in between
+        so the GUI stays responsive while loading big scenes.
+
+        Args:
+            source_file (str): filepath of scene to load
+            create_logic_nodes (bool, optional): whether the logic nodes have to be created too
+            progress_callback (callable, optional): called as progress_callback(stage, done, total)
+                after each chunk. Defaults to None.
+        """
+        for progress in self.iter_load_from_file(source_file, create_logic_nodes):
+            if progress_callback:
+                progress_callback(*progress)
+            QtWidgets.QApplication.processEvents()
+
+    def iter_load_from_file(
+        self,
+        source_file: str,
+        create_logic_nodes=True,
+        chunk_size: int = constants.LOADING_CHUNK_SIZE,
+    ):
+        """
+        Create a graphic scene from a file, yielding after each chunk of work.
+
         Args:
             source_file (str): filepath of scene to load
+            create_logic_nodes (bool, optional): whether the logic nodes have to be created too
+            chunk_size (int, optional): amount of nodes/connections created between yields.
+
+        Yields:
+            tuple(str, int, int): stage being loaded, amount of elements done, total of elements
         """
         # Set filepath
         self.set_filepath(source_file)
 
         # Grab the scene dict and create logic nodes
-        scene_dict = dict()
-        with open(source_file, "r") as file:
-            scene_dict = yaml.safe_load(file)
+        scene_dict = LogicScene.read_scene_file(source_file) or dict()
 
         new_logic_nodes = self.logic_scene.all_logic_nodes
         if create_logic_nodes:
-            new_logic_nodes = self.logic_scene.load_from_file(source_file)
+            new_logic_nodes = (
+                yield from self.logic_scene.iter_load_from_file(
+                    source_file, chunk_size=chunk_size, scene_dict=scene_dict
+                )
+            ) or []
 
         # Create graphic nodes
-        for logic_node in new_logic_nodes:
-            for node_dict in scene_dict["nodes"]:
-                node_name = next(iter(node_dict))
-                if logic_node.node_name == node_name:
+        node_positions = dict()
+        for node_dict in scene_dict.get("nodes", []):
+            node_name = next(iter(node_dict))
+            node_positions[node_name] = (
+                node_dict[node_name].get("x_pos", 0),
+                node_dict[node_name].get("y_pos", 0),
+            )
+
+        self.tune_item_index(len(self.all_graphic_nodes) + len(new_logic_nodes))
+        new_graphic_nodes = []
+        for i, logic_node in enumerate(new_logic_nodes, 1):
+            if logic_node.node_name in node_positions:
+                new_graphic_nodes.append(
                     self.add_graphic_node_from_logic_node(
-                        logic_node,
-                        node_dict[node_name]["x_pos"],
-                        node_dict[node_name]["y_pos"],
+                        logic_node, *node_positions[logic_node.node_name]
                     )
-                    break
+                )
+
+            if i % chunk_size == 0 or i == len(new_logic_nodes):
+                yield ("graphic nodes", i, len(new_logic_nodes))
 
         # Create annotations
         if "annotations" in scene_dict:
@@ -607,37 +863,32 @@ class CustomScene(QtWidgets.QGraphicsScene):
                 )
                 new_annotation.set_text(ann_dict.get("text", ""))
 
-        # Connections
-        all_graphic_attrs = []
-        for g_node in self.all_graphic_nodes:
-            if g_node.logic_node in new_logic_nodes:
-                for g_attribute in g_node.graphic_attributes:
-                    all_graphic_attrs.append(g_attribute)
-
-        for g_attribute in all_graphic_attrs:
-            if g_attribute.connector_type != constants.OUTPUT:
-                continue
-            connected_logic_attributes = []
-            for (
-                connected_logic_attribute
-            ) in g_attribute.logic_attribute.connected_attributes:
-                connected_logic_attributes.append(connected_logic_attribute.dot_name)
-            for logic_attr_full_name in connected_logic_attributes:
-                for other_g_attribute in all_graphic_attrs:
-                    if (
-                        other_g_attribute.logic_attribute.dot_name
-                        == logic_attr_full_name
-                    ):
-                        LOGGER.info(
-                            "Connected graphic attributes {} -> {}".format(
-                                g_attribute.logic_attribute.dot_name,
-                                other_g_attribute.logic_attribute.dot_name,
-                            )
-                        )
-                        self.connect_graphic_attrs(
-                            g_attribute, other_g_attribute, check_logic=False
-                        )
-                        break
+        # Connections, resolved through an index of the graphic attributes
+        graphic_attrs_index = dict()
+        for g_node in new_graphic_nodes:
+            for g_attribute in g_node.graphic_attributes:
+                graphic_attrs_index[g_attribute.logic_attribute.dot_name] = g_attribute
+
+        connections = [
+            (g_attribute, connected_logic_attribute.dot_name)
+            for g_attribute in graphic_attrs_index.values()
+            if g_attribute.connector_type == constants.OUTPUT
+            for connected_logic_attribute in g_attribute.logic_attribute.connected_attributes
+        ]
+        for i, (g_attribute, logic_attr_dot_name) in enumerate(connections, 1):
+            other_g_attribute = graphic_attrs_index.get(logic_attr_dot_name)
+            if other_g_attribute is not None:
+                LOGGER.debug(
+                    "Connected graphic attributes {} -> {}".format(
+                        g_attribute.logic_attribute.dot_name, logic_attr_dot_name
+                    )
+                )
+                # Freshly created attributes, so there are no previous lines to clean up
+                g_attribute.connect_graphic_attr(other_g_attribute, check_logic=False)
+                self.draw_valid_line(g_attribute, other_g_attribute)
+
+            if i % chunk_size == 0 or i == len(connections):
+                yield ("graphic connections", i, len(connections))
 
     # NODE-SPECIFIC ----------------------
     def rename_graphic_node(self, graphic_node: GeneralGraphicNode):
@@ -971,6 +1222,7 @@ class CustomScene(QtWidgets.QGraphicsScene):
         self.parent().fitInView(
             rect + QtCore.QMarginsF(20.0, 20.0, 20.0, 20.0), QtCore.Qt.KeepAspectRatio
         )
+        self.request_detail_update()
 
     # CONTEXT EVENTS ----------------------
     def contextMenuEvent(self, event):
@@ -1219,10 +1471,9 @@ class CustomScene(QtWidgets.QGraphicsScene):
                 self.disconnect_graphic_attrs(
                     connected_out_graphic_attr, self.testing_graphic_attr
                 )
-                for item in self.items():
-                    if item.data(0) == constants.CONNECTOR_LINE:
-                        if self.testing_graphic_attr in [item.data(1), item.data(2)]:
-                            self.removeItem(item)
+                for item in self.get_node_lines(self.testing_graphic_attr.parent_node):
+                    if self.testing_graphic_attr in [item.data(1), item.data(2)]:
+                        self.removeItem(item)
                 self.testing_graphic_attr = connected_out_graphic_attr
 
     def mouseDoubleClickEvent(self, event: QtWidgets.QGraphicsSceneMouseEvent) -> None:
@@ -1390,10 +1641,13 @@ class ConnectorLine(QtWidgets.QGraphicsPathItem):
         self.p1 = QtCore.QPointF(0.0, 0.0)
         self.p2 = QtCore.QPointF(0.0, 0.0)
 
-        # Items
+        self.detail_level = constants.DETAIL_FULL
+
+        # Items, the line itself being drawn by this item, with the glows behind it
         self.glow = QtWidgets.QGraphicsPathItem(parent=self)
+        self.glow.setFlag(QtWidgets.QGraphicsItem.ItemStacksBehindParent)
         self.arrow_glow = QtWidgets.QGraphicsPathItem(parent=self)
-        self.white_line = QtWidgets.QGraphicsPathItem(parent=self)
+        self.arrow_glow.setFlag(QtWidgets.QGraphicsItem.ItemStacksBehindParent)
         self.arrow = QtWidgets.QGraphicsPathItem(parent=self)
 
         # Main path ---------------------
@@ -1409,15 +1663,15 @@ class ConnectorLine(QtWidgets.QGraphicsPathItem):
 
         # Glow
         if constants.GLOW_EFFECTS:
-            self.glow.setPen(constants.LINE_GLOW_PEN)
+            self.glow.setPen(graphic_constants.LINE_GLOW_PEN)
             blur = QtWidgets.QGraphicsBlurEffect()
-            blur.setBlurRadius(constants.LINE_GLOW_PEN.width() * 1.5)
+            blur.setBlurRadius(graphic_constants.LINE_GLOW_PEN.width() * 1.5)
             self.glow.setGraphicsEffect(blur)
         else:
             self.glow.hide()
 
         # White line
-        self.white_line.setPen(constants.VALID_LINE_PEN)
+        self.setPen(graphic_constants.VALID_LINE_PEN)
 
         # Arrow ---------------------
         arrow_path = QtGui.QPainterPath()
@@ -1439,9 +1693,9 @@ class ConnectorLine(QtWidgets.QGraphicsPathItem):
         # Arrow glow
         if constants.GLOW_EFFECTS:
             self.arrow_glow.setPath(arrow_path)
-            self.arrow_glow.setPen(constants.LINE_GLOW_PEN)
+            self.arrow_glow.setPen(graphic_constants.LINE_GLOW_PEN)
             blur = QtWidgets.QGraphicsBlurEffect()
-            blur.setBlurRadius(constants.LINE_GLOW_PEN.width() * 1.5)
+            blur.setBlurRadius(graphic_constants.LINE_GLOW_PEN.width() * 1.5)
             self.arrow_glow.setGraphicsEffect(blur)
         else:
             self.arrow_glow.hide()
@@ -1449,7 +1703,7 @@ class ConnectorLine(QtWidgets.QGraphicsPathItem):
         # Arrow
         self.arrow.setPath(arrow_path)
         self.arrow.setPen(QtCore.Qt.NoPen)
-        self.arrow.setBrush(QtGui.QBrush(constants.VALID_LINE_PEN.color()))
+        self.arrow.setBrush(QtGui.QBrush(graphic_constants.VALID_LINE_PEN.color()))
 
         self.rotate_arrows()
 
@@ -1460,54 +1714,98 @@ class ConnectorLine(QtWidgets.QGraphicsPathItem):
         self.setData(2, graphic_attr_2)
 
     @staticmethod
-    def calculate_path(p1, p2):
+    def calculate_path(p1, p2, line_geo=None):
+        if line_geo is None:
+            line_geo = constants.CONNECTOR_LINE_GEO
+
         new_path = QtGui.QPainterPath(p1)
-        if constants.CONNECTOR_LINE_GEO == constants.STRAIGHT_LINES:
+        if line_geo == constants.STRAIGHT_LINES:
             new_path.lineTo(p2)
-        elif constants.CONNECTOR_LINE_GEO == constants.STEPPED_LINES:
+        elif line_geo == constants.STEPPED_LINES:
             s_p1 = QtCore.QPointF(((p2.x() + p1.x()) / 2), p1.y())
             s_p2 = QtCore.QPointF(((p2.x() + p1.x()) / 2), p2.y())
             new_path.lineTo(s_p1)
             new_path.lineTo(s_p2)
             new_path.lineTo(p2)
-        elif constants.CONNECTOR_LINE_GEO == constants.SPLINE_LINES:
+        elif line_geo == constants.SPLINE_LINES:
             c_p1 = QtCore.QPoint(((p2.x() + p1.x()) / 2) + 10, p1.y())
             c_p2 = QtCore.QPoint(((p2.x() + p1.x()) / 2) - 10, p2.y())
             new_path.cubicTo(c_p1, c_p2, p2)
 
         return new_path
 
+    @staticmethod
+    def calculate_arrow_angle(p1, p2, line_geo=None) -> float:
+        """
+        Get the direction of a path from calculate_path at its middle, where the arrow goes. All the geometries are
+        symmetric around the middle point of p1 and p2, so the direction there follows from the geometry.
+
+        Args:
+            p1 (QtCore.QPointF): start of the path
+            p2 (QtCore.QPointF): end of the path
+            line_geo (int, optional): such as constants.SPLINE_LINES. Defaults to constants.CONNECTOR_LINE_GEO.
+
+        Returns:
+            float: angle, in degrees
+        """
+        if line_geo is None:
+            line_geo = constants.CONNECTOR_LINE_GEO
+
+        dx, dy = p2.x() - p1.x(), p2.y() - p1.y()
+        if line_geo == constants.STEPPED_LINES:
+            # Over 2% of the length around the middle, short vertical steps also include part of the horizontal ones
+            span = 0.02 * (abs(dx) + abs(dy))
+            dx = math.copysign(max(span - abs(dy), 0), dx)
+        elif line_geo == constants.SPLINE_LINES:
+            # Derivative of the cubic at t=0.5: (p2 - p1) + (c_p2 - c_p1)
+            dx, dy = dx - 20, 2 * dy
+        return math.degrees(math.atan2(dy, dx))
+
+    def get_line_geo(self) -> int:
+        if self.detail_level == constants.DETAIL_BOXES:
+            return constants.STRAIGHT_LINES
+        return constants.CONNECTOR_LINE_GEO
+
     def repath(self):
         if self.graphic_attr_1 is None or self.graphic_attr_2 is None:
             return
 
-        p1, p2 = (
+        self.p1, self.p2 = (
             self.graphic_attr_1.plug_coords(),
             self.graphic_attr_2.plug_coords(),
         )
 
-        self.set_new_path(self.calculate_path(p1, p2))
+        self.set_new_path(self.calculate_path(self.p1, self.p2, self.get_line_geo()))
         self.rotate_arrows()
 
     def rotate_arrows(self):
         if self.graphic_attr_1 and self.graphic_attr_2:
-            p1, p2 = self.path().pointAtPercent(0.0), self.path().pointAtPercent(1.0)
-            self.arrow_glow.setPos((p2.x() + p1.x()) / 2, (p2.y() + p1.y()) / 2)
-            self.arrow.setPos((p2.x() + p1.x()) / 2, (p2.y() + p1.y()) / 2)
-            ref_1 = self.path().pointAtPercent(0.49)
-            ref_2 = self.path().pointAtPercent(0.51)
-            radians = math.atan2(ref_2.y() - ref_1.y(), ref_2.x() - ref_1.x())
-            angle = math.degrees(radians)
+            middle = (self.p1 + self.p2) / 2
+            angle = self.calculate_arrow_angle(self.p1, self.p2, self.get_line_geo())
 
+            self.arrow_glow.setPos(middle)
+            self.arrow.setPos(middle)
             self.arrow_glow.setRotation(angle)
             self.arrow.setRotation(angle)
 
+    def set_detail_level(self, detail_level: int):
+        """
+        Args:
+            detail_level (int): such as constants.DETAIL_FULL
+        """
+        self.detail_level = detail_level
+        show_glow = constants.GLOW_EFFECTS and detail_level == constants.DETAIL_FULL
+        self.glow.setVisible(show_glow)
+        self.arrow_glow.setVisible(show_glow)
+        self.arrow.setVisible(detail_level != constants.DETAIL_BOXES)
+        self.repath()
+
     def set_testing_appearance(self):
-        self.white_line.setPen(constants.TEST_LINE_PEN)
+        self.setPen(graphic_constants.TEST_LINE_PEN)
         self.arrow_glow.hide()
         self.arrow.hide()
 
     def set_new_path(self, new_path):
         self.setPath(new_path)
-        self.white_line.setPath(new_path)
-        self.glow.setPath(new_path)
+        if self.glow.isVisibleTo(self):  # Hidden glows get the path once shown
+            self.glow.setPath(new_path)
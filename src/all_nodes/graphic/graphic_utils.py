@@ -0,0 +1,185 @@
+# -*- coding: UTF-8 -*-
+__author__ = "Jaime Rivera <jaime.rvq@gmail.com>"
+__copyright__ = "Copyright 2022, Jaime Rivera"
+__credits__ = []
+__license__ = "MIT License"
+
+
+import collections
+import threading
+import time
+
+from PySide2 import QtCore
+from PySide2 import QtGui
+
+from all_nodes.logic import signals
+from all_nodes.logic.metrics import ENGINE_METRICS as EM
+from all_nodes import utils
+
+
+LOGGER = utils.get_logger(__name__)
+
+
+# -------------------------------- COLORS -------------------------------- #
+def get_bright_color(color_name):
+    """Given a color name, get a fully saturated and bright version of it
+
+    Args:
+        color_name (str): name of the color to saurate
+
+    Returns:
+        str: name of the saturated color
+    """
+    base_color = QtGui.QColor(color_name)
+    h = base_color.hue()
+
+    bright_color = QtGui.QColor.fromHsv(h, 255, 255)
+    return bright_color.name()
+
+
+# -------------------------------- SIGNALS -------------------------------- #
+class QtDispatcher(QtCore.QObject):
+    """
+    Delivers the emissions of the logic signals in the thread this object lives in (the GUI thread).
+
+    Emissions done from that same thread are delivered right away. The ones coming from worker threads are collected
+    and delivered in order, in one batch at most every FLUSH_INTERVAL_MS, so thousands of fast nodes do not flood the
+    event loop. For slots connected with coalesce=True (the status of the graphic nodes), repeated emissions of a
+    signal with the same arguments while waiting are merged into one, delivered in the order of their last emission:
+    they get the latest state (e.g. a node that started and finished shows finished). Any other slot gets every
+    emission.
+
+    Time spent delivering batches and how late the event loop runs its timers are measured, see get_stats.
+    """
+
+    FLUSH_INTERVAL_MS = 33  # ~30 Hz
+    LAG_CHECK_INTERVAL_MS = 100
+
+    flush_requested = QtCore.Signal()
+
+    def __init__(self):
+        super(QtDispatcher, self).__init__()
+
+        self._pending = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+        self._flush_timer = QtCore.QTimer(self)
+        self._flush_timer.setSingleShot(True)
+        self._flush_timer.setInterval(self.FLUSH_INTERVAL_MS)
+        self._flush_timer.timeout.connect(self.flush)
+        self.flush_requested.connect(self.schedule_flush, QtCore.Qt.QueuedConnection)
+
+        self._lag_timer = QtCore.QTimer(self)
+        self._lag_timer.setInterval(self.LAG_CHECK_INTERVAL_MS)
+        self._lag_timer.timeout.connect(self.check_lag)
+        self._last_lag_check = None
+
+        self.stats = {
+            "emissions": 0,
+            "coalesced": 0,
+            "batches": 0,
+            "deliveries": 0,
+            "delivery_time": 0.0,
+            "max_batch_time": 0.0,
+            "max_batch_size": 0,
+            "max_wait": 0.0,
+            "event_loop_lag": 0.0,
+            "max_event_loop_lag": 0.0,
+        }
+
+    # DISPATCHING ----------------------
+    def dispatch(self, delivery, args, coalesce=False):
+        if QtCore.QThread.currentThread() == self.thread():
+            delivery(*args)
+            return
+
+        key = (delivery, args)
+        if coalesce:
+            try:
+                hash(key)
+            except TypeError:
+                coalesce = False
+        if not coalesce:
+            key = (delivery, args, object())  # Unique, delivered on its own
+        with self._lock:
+            first = not self._pending
+            self.stats["emissions"] += 1
+            if key in self._pending:
+                self._pending.move_to_end(key)
+                self.stats["coalesced"] += 1
+            else:
+                self._pending[key] = time.perf_counter()
+        if first:
+            self.flush_requested.emit()
+
+    def schedule_flush(self):
+        if not self._flush_timer.isActive():
+            self._flush_timer.start()
+        if not self._lag_timer.isActive():
+            self._last_lag_check = time.perf_counter()
+            self._lag_timer.start()
+
+    def flush(self):
+        """
+        Deliver all the emissions collected so far.
+        """
+        with self._lock:
+            batch = list(self._pending.items())
+            self._pending.clear()
+        if not batch:
+            return
+
+        start = time.perf_counter()
+        for key, _ in batch:
+            try:
+                key[0](*key[1])
+            except Exception as e:
+                LOGGER.exception(e)
+        end = time.perf_counter()
+
+        stats = self.stats
+        stats["batches"] += 1
+        stats["deliveries"] += len(batch)
+        stats["delivery_time"] += end - start
+        stats["max_batch_time"] = max(stats["max_batch_time"], end - start)
+        stats["max_batch_size"] = max(stats["max_batch_size"], len(batch))
+        stats["max_wait"] = max(stats["max_wait"], start - min(t for _, t in batch))
+
+        with self._lock:
+            if self._pending:  # Emitted while delivering
+                self._flush_timer.start()
+
+    # MEASURING ----------------------
+    def check_lag(self):
+        now = time.perf_counter()
+        lag = max(0.0, now - self._last_lag_check - self.LAG_CHECK_INTERVAL_MS / 1000)
+        self._last_lag_check = now
+        self.stats["event_loop_lag"] = lag
+        self.stats["max_event_loop_lag"] = max(self.stats["max_event_loop_lag"], lag)
+        if lag > 0.25:
+            LOGGER.debug("GUI event loop blocked for %.3fs", lag)
+        with self._lock:
+            if not self._pending and not self._flush_timer.isActive():
+                self._lag_timer.stop()  # Only measured while there are emissions
+
+    def get_stats(self) -> dict:
+        """
+        Returns:
+            dict: amount of emissions, how many were coalesced, batches delivered, time spent delivering them and
+                lag of the event loop (seconds its timers fire late)
+        """
+        return dict(self.stats)
+
+
+QT_DISPATCHER = None
+
+
+def install_qt_dispatcher():
+    """
+    Make all logic signals be delivered in the GUI thread. Must be called from the GUI thread.
+    """
+    global QT_DISPATCHER
+    if QT_DISPATCHER is None:
+        QT_DISPATCHER = QtDispatcher()
+        signals.set_dispatcher(QT_DISPATCHER.dispatch)
+        EM.add_collector("gui", QT_DISPATCHER.get_stats)
@@ -5,6 +5,9 @@ __credits__ = []
 __license__ = "MIT License"
 
 
+import pprint
+import reprlib
+
 from PySide2 import QtCore
 from PySide2 import QtGui
 from PySide2 import QtWidgets
@@ -12,6 +15,7 @@ from PySide2 import QtWidgets
 from all_nodes import constants
 from all_nodes.logic.logic_node import GeneralLogicNode
 from all_nodes.logic.class_registry import CLASS_REGISTRY as CR
+from all_nodes.logic.spill_store import SpilledValue
 
 
 from all_nodes import utils
@@ -19,288 +23,597 @@ from all_nodes import utils
 
 LOGGER = utils.get_logger(__name__)
 
+NAME_COLUMN = 0
+VALUE_COLUMN = 1
+
+SUMMARY_LENGTH = 120  # Values longer than this are shortened, and shown whole when their row is expanded
+MAX_EXPANDED_LINES = 10000
+
+# Kinds of rows
+ROOT_ROW = "ROOT_ROW"
+NODE_ROW = "NODE_ROW"
+SECTION_ROW = "SECTION_ROW"
+ATTRIBUTE_ROW = "ATTRIBUTE_ROW"
+LOG_ROW = "LOG_ROW"
+INFO_ROW = "INFO_ROW"
+LINE_ROW = "LINE_ROW"  # Connection, or line of a value/log, in an expanded row
+
+VALUE_REPR = reprlib.Repr()
+VALUE_REPR.maxstring = SUMMARY_LENGTH
+VALUE_REPR.maxother = SUMMARY_LENGTH
+
+
+# -------------------------------- VALUE FORMATTING -------------------------------- #
+def format_summary(value, data_type=None) -> str:
+    """
+    Format a value in a single line, without going through all of it.
+
+    Args:
+        value (object): value of an attribute
+        data_type (type, optional): of the attribute. Defaults to None.
+
+    Returns:
+        str: shortened representation of the value
+    """
+    if value is None:
+        return ""
+    if isinstance(value, SpilledValue):
+        return "<{} spilled to disk, {} bytes>".format(value.type_name, value.size)
+    if isinstance(value, bool) and data_type is bool:
+        return str(int(value))
+    if isinstance(value, (bool, int, float)):
+        return str(value)
+    if isinstance(value, str):
+        if value == "":
+            return "''"
+        first_line = value.split("\n", 1)[0]
+        if len(first_line) > SUMMARY_LENGTH or first_line != value:
+            return first_line[:SUMMARY_LENGTH] + " …"
+        return value
+    return VALUE_REPR.repr(value)
+
+
+def is_expandable(value) -> bool:
+    """
+    Args:
+        value (object): value of an attribute
+
+    Returns:
+        bool: whether the summary of the value is not enough to show it whole
+    """
+    if value is None or isinstance(value, (bool, int, float, SpilledValue)):
+        return False
+    if isinstance(value, str):
+        return "\n" in value or len(value) > SUMMARY_LENGTH
+    return True
+
+
+def format_lines(value) -> list:
+    """
+    Format a value whole, only done once its row is expanded.
+
+    Args:
+        value (object): value of an attribute
+
+    Returns:
+        list: lines of text
+    """
+    lines = (
+        value.splitlines()
+        if isinstance(value, str)
+        else pprint.pformat(value).splitlines()
+    )
+    if len(lines) > MAX_EXPANDED_LINES:
+        hidden = len(lines) - MAX_EXPANDED_LINES
+        lines = lines[:MAX_EXPANDED_LINES] + ["… ({} more lines)".format(hidden)]
+    return lines
+
+
+def get_node_color(logic_node: GeneralLogicNode) -> QtGui.QColor:
+    """
+    Examine the configs and find the color associated to a node
+
+    Args:
+        logic_node (GeneralLogicNode)
+
+    Returns:
+        QtGui.QColor: color that corresponds to the logic node
+    """
+    all_classes = CR.get_all_classes()
+    node_color = QtGui.QColor(constants.DEFAULT_NODE_COLOR)
+    for lib in all_classes:
+        for module in all_classes[lib]:
+            classes = all_classes[lib][module]["classes"]
+            for c in classes:
+                c_name, _ = c
+                if c_name == logic_node.class_name:
+                    node_color = QtGui.QColor(all_classes[lib][module]["color"])
+                    node_color.setAlphaF(0.8)
+                    return node_color
+
+    return node_color
+
+
+def is_editable(attr) -> bool:
+    """
+    Args:
+        attr (GeneralLogicAttribute)
+
+    Returns:
+        bool: whether the attribute accepts manual input
+    """
+    return not (
+        attr.connector_type == constants.OUTPUT
+        or attr.attribute_name in [constants.START, constants.COMPLETED]
+        or attr.has_connections()
+    )
+
+
+def get_validation_regex(attr) -> QtCore.QRegExp:
+    if attr.data_type is float:
+        return QtCore.QRegExp(r"\d+\.\d+")
+    elif attr.data_type is int:
+        return QtCore.QRegExp(r"\d+")
+    elif attr.data_type is dict:
+        return QtCore.QRegExp(r"\{.+")
+    elif attr.data_type is bool:
+        return QtCore.QRegExp("[01]")
+    return QtCore.QRegExp(".*")
+
+
+# -------------------------------- MODEL -------------------------------- #
+class EditorRow:
+    """
+    Row of the attribute editor model.
+
+    Attribute and log rows build their children (connections and lines of their value) only once expanded.
+    """
+
+    def __init__(self, kind, parent=None, key=None, name="", value=None):
+        self.kind = kind
+        self.parent = parent
+        self.key = key  # Identifies the row among its siblings, across refreshes
+        self.name = name
+        self.value = value
+
+        self.logic_node = None
+        self.attribute = None
+        self.connections = ()
+        self.color = None
+
+        self.position = 0  # Among the children of its parent
+        self.children = []
+        self.lazy = kind in [ATTRIBUTE_ROW, LOG_ROW]
+        self.fetched = True  # Whether the children have been built
+        self.summary = None  # Formatted when first shown
+
+    def get_summary(self) -> str:
+        if self.summary is None:
+            if self.kind == LOG_ROW:
+                self.summary = self.value[0] + (" …" if len(self.value) > 1 else "")
+            elif self.kind == ATTRIBUTE_ROW:
+                self.summary = format_summary(self.value, self.attribute.data_type)
+            else:
+                self.summary = self.value or ""
+        return self.summary
+
+    def set_children(self, children: list):
+        for position, child in enumerate(children):
+            child.parent = self
+            child.position = position
+        self.children = children
+
+    def build_children(self) -> list:
+        children = []
+        if self.kind == ATTRIBUTE_ROW:
+            for dot_name in self.connections:
+                children.append(EditorRow(LINE_ROW, self, name="└─", value=dot_name))
+            if is_expandable(self.value):
+                for line in format_lines(self.value):
+                    children.append(EditorRow(LINE_ROW, self, value=line))
+        elif self.kind == LOG_ROW:
+            for line in self.value:
+                children.append(EditorRow(LINE_ROW, self, value=line))
+        for child in children:
+            child.color = self.color
+        return children
+
+
+class AttributeEditorModel(QtCore.QAbstractItemModel):
+    """
+    Nodes added to the attribute editor, with their attributes, logs and execution time.
+
+    Refreshes compare the rows of a node with its current state and only notify the values that changed, so the
+    view keeps its state and only repaints what it needs to.
+    """
+
+    def __init__(self, parent=None):
+        QtCore.QAbstractItemModel.__init__(self, parent)
+        self.root = EditorRow(ROOT_ROW)
+        self.node_rows = dict()  # By node UUID
+
+    # ROWS ----------------------
+    def build_node_row(self, logic_node: GeneralLogicNode, color=None) -> EditorRow:
+        node_row = EditorRow(NODE_ROW, self.root, logic_node.uuid, logic_node.full_name)
+        node_row.logic_node = logic_node
+        node_row.color = color or get_node_color(logic_node)
+
+        # All the rows of a node hang from it, so only node rows need to be expanded
+        children = []
+        for connector_type, section_name, attrs in [
+            (constants.INPUT, "Inputs", logic_node.get_input_attrs()),
+            (constants.OUTPUT, "Outputs", logic_node.get_output_attrs()),
+        ]:
+            if not attrs:
+                continue
+            children.append(
+                EditorRow(
+                    SECTION_ROW, node_row, ("section", connector_type), section_name
+                )
+            )
+            for attr in attrs:
+                children.append(self.build_attribute_row(node_row, attr))
 
-class NodePanel(QtWidgets.QWidget):
-    """Widget representation of a logic node and its attributes"""
-
-    def __init__(self, logic_node: GeneralLogicNode):
-        QtWidgets.QWidget.__init__(self)
-
-        self.grid_layout = QtWidgets.QGridLayout()
-        self.setLayout(self.grid_layout)
-
-        self.logic_node = logic_node
-
-        self.color = self.get_node_color()
-        self.get_node_color()
+        for key, name, log, color in [
+            ("fail_log", "Fail log", logic_node.fail_log, QtGui.QColor("orange")),
+            ("error_log", "Error log", logic_node.error_log, QtGui.QColor("red")),
+        ]:
+            if not log:
+                continue
+            log_row = EditorRow(LOG_ROW, node_row, ("log", key), name, tuple(log))
+            log_row.color = color
+            log_row.fetched = len(log) < 2
+            children.append(log_row)
+
+        children.append(
+            EditorRow(
+                INFO_ROW,
+                node_row,
+                ("info", "execution_time"),
+                "Execution time",
+                f"{logic_node.execution_time:.8f} s.",
+            )
+        )
+        node_row.set_children(children)
+        return node_row
+
+    @staticmethod
+    def build_attribute_row(parent, attr) -> EditorRow:
+        attr_row = EditorRow(
+            ATTRIBUTE_ROW,
+            parent,
+            ("attribute", attr.attribute_name),
+            "{} ({})".format(attr.attribute_name, attr.get_datatype_str()),
+            attr.value,
+        )
+        attr_row.logic_node = attr.parent_node
+        attr_row.attribute = attr
+        attr_row.connections = tuple(
+            conn[1] if attr.connector_type == constants.OUTPUT else conn[0]
+            for conn in attr.get_connections_list()
+        )
+        if is_editable(attr):
+            attr_row.color = QtGui.QColor("cyan")
+        attr_row.fetched = not (attr_row.connections or is_expandable(attr.value))
+        return attr_row
+
+    def get_row(self, index: QtCore.QModelIndex) -> EditorRow:
+        return index.internalPointer() if index.isValid() else self.root
+
+    def get_index(self, row: EditorRow) -> QtCore.QModelIndex:
+        if row is self.root:
+            return QtCore.QModelIndex()
+        return self.createIndex(row.position, 0, row)
+
+    # MODEL INTERFACE ----------------------
+    def index(self, row, column, parent=QtCore.QModelIndex()):
+        children = self.get_row(parent).children
+        if parent.column() > 0 or not (0 <= row < len(children) and 0 <= column < 2):
+            return QtCore.QModelIndex()
+        return self.createIndex(row, column, children[row])
+
+    def parent(self, index):
+        if not index.isValid():
+            return QtCore.QModelIndex()
+        return self.get_index(index.internalPointer().parent)
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        if parent.column() > 0:
+            return 0
+        return len(self.get_row(parent).children)
+
+    def columnCount(self, parent=QtCore.QModelIndex()):
+        return 2
+
+    def hasChildren(self, parent=QtCore.QModelIndex()):
+        row = self.get_row(parent)
+        return bool(row.children) or not row.fetched
+
+    def canFetchMore(self, parent):
+        return parent.isValid() and not self.get_row(parent).fetched
+
+    def fetchMore(self, parent):
+        row = self.get_row(parent)
+        children = row.build_children()
+        row.fetched = True
+        if not children:
+            return
+        self.beginInsertRows(parent, 0, len(children) - 1)
+        row.set_children(children)
+        self.endInsertRows()
+
+    def flags(self, index):
+        flags = QtCore.Qt.ItemIsEnabled | QtCore.Qt.ItemIsSelectable
+        row = self.get_row(index)
+        if (
+            index.column() == VALUE_COLUMN
+            and row.kind == ATTRIBUTE_ROW
+            and is_editable(row.attribute)
+        ):
+            flags |= QtCore.Qt.ItemIsEditable
+        return flags
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row = index.internalPointer()
+
+        if role == QtCore.Qt.DisplayRole:
+            if index.column() == NAME_COLUMN:
+                return row.name
+            return row.get_summary()
+
+        elif role == QtCore.Qt.EditRole and row.kind == ATTRIBUTE_ROW:
+            return self.get_edit_text(row)
+
+        elif role == QtCore.Qt.ToolTipRole:
+            if row.kind == ATTRIBUTE_ROW:
+                if row.connections:
+                    return "Is connected, does not accept manual input"
+                elif not is_editable(row.attribute):
+                    return "Does not accept manual input"
+                return "Valid input: {}".format(
+                    get_validation_regex(row.attribute).pattern()
+                )
+            elif row.kind == LINE_ROW:
+                return row.value
+
+        elif role == QtCore.Qt.BackgroundRole and row.kind == NODE_ROW:
+            return QtGui.QBrush(row.color)
+
+        elif role == QtCore.Qt.ForegroundRole:
+            if row.kind != NODE_ROW and row.color and index.column() == VALUE_COLUMN:
+                return QtGui.QBrush(row.color)
+
+        elif role == QtCore.Qt.FontRole and row.kind in [NODE_ROW, SECTION_ROW]:
+            font = QtGui.QFont()
+            font.setBold(True)
+            return font
+
+        elif role == QtCore.Qt.TextAlignmentRole and row.kind == LINE_ROW:
+            if index.column() == NAME_COLUMN:
+                return QtCore.Qt.AlignRight | QtCore.Qt.AlignVCenter
+
+        return None
+
+    @staticmethod
+    def get_edit_text(row: EditorRow) -> str:
+        if row.value is None:
+            return ""
+        if isinstance(row.value, bool) and row.attribute.data_type is bool:
+            return str(int(row.value))
+        return str(row.value)
+
+    def setData(self, index, value, role=QtCore.Qt.EditRole):
+        row = self.get_row(index)
+        if role != QtCore.Qt.EditRole or row.kind != ATTRIBUTE_ROW:
+            return False
+        if value == self.get_edit_text(row):
+            return False  # Editor closed without changes
+        row.logic_node.set_attribute_from_str(row.attribute.attribute_name, value)
+        row.logic_node.propagate_clear_cache()
+        self.refresh_node(row.logic_node)
+        return True
+
+    # NODES ----------------------
+    def add_node(self, logic_node: GeneralLogicNode) -> QtCore.QModelIndex:
+        """
+        Add a node at the top, or move it there if it was already added.
 
-        self.row_count = 0
-        self.represent_node()
+        Args:
+            logic_node (GeneralLogicNode): logic node to be represented
 
-    def get_node_color(self):
+        Returns:
+            QtCore.QModelIndex: of the row of the node
         """
-        Examine the configs and find the color associated to the represented node
+        node_row = self.node_rows.get(logic_node.uuid)
+        if node_row is not None:
+            i = node_row.position
+            if i and self.beginMoveRows(
+                QtCore.QModelIndex(), i, i, QtCore.QModelIndex(), 0
+            ):
+                nodes = self.root.children
+                self.root.set_children([node_row] + nodes[:i] + nodes[i + 1 :])
+                self.endMoveRows()
+            return self.get_index(node_row)
+
+        node_row = self.build_node_row(logic_node)
+        self.beginInsertRows(QtCore.QModelIndex(), 0, 0)
+        self.root.set_children([node_row] + self.root.children)
+        self.node_rows[logic_node.uuid] = node_row
+        self.endInsertRows()
+        return self.get_index(node_row)
+
+    def remove_node(self, uuid: str):
+        node_row = self.node_rows.pop(uuid, None)
+        if node_row is None:
+            return
+        i = node_row.position
+        nodes = self.root.children
+        self.beginRemoveRows(QtCore.QModelIndex(), i, i)
+        self.root.set_children(nodes[:i] + nodes[i + 1 :])
+        self.endRemoveRows()
 
-        Returns:
-            QtGui.QColor: color that corresponds to the logic node
+    def clear(self):
+        self.beginResetModel()
+        self.root.children = []
+        self.node_rows = dict()
+        self.endResetModel()
 
+    # REFRESH ----------------------
+    def refresh_node(self, logic_node: GeneralLogicNode):
         """
-        all_classes = CR.get_all_classes()
-        node_color = QtGui.QColor(constants.DEFAULT_NODE_COLOR)
-        for lib in all_classes:
-            for module in all_classes[lib]:
-                classes = all_classes[lib][module]["classes"]
-                for c in classes:
-                    c_name, _ = c
-                    if c_name == self.logic_node.class_name:
-                        node_color = QtGui.QColor(all_classes[lib][module]["color"])
-                        node_color.setAlphaF(0.8)
-                        return node_color
-
-        return node_color
-
-    def paintEvent(self, event: QtGui.QPaintEvent) -> None:
-        qp = QtGui.QPainter()
-        qp.begin(self)
-
-        # Fill
-        path = QtGui.QPainterPath()
-        path.addRoundedRect(QtCore.QRect(0, 0, self.width(), self.height() - 2), 12, 12)
-        linearGrad = QtGui.QLinearGradient(0, 0, 0, self.height())
-        linearGrad.setColorAt(0.0, QtGui.QColor(255, 255, 255, 50))
-        linearGrad.setColorAt(0.1, QtGui.QColor(255, 255, 255, 0))
-        linearGrad.setColorAt(0.7, QtGui.QColor(255, 255, 255, 0))
-        linearGrad.setColorAt(1.0, QtGui.QColor(0, 0, 0, 50))
-        qp.fillPath(path, self.color)
-        qp.fillPath(path, linearGrad)
-        qp.fillPath(
-            path, QtGui.QBrush(QtGui.QColor(0, 0, 0, 50), QtCore.Qt.BDiagPattern)
-        )
+        Update the rows of a node with its current state, only notifying the rows that changed.
 
-        # Shadow
-        qp.setPen(QtGui.QPen(QtGui.QColor(0, 0, 0, 130), 5))
-        qp.drawLine(QtCore.QLine(12, self.height(), self.width() - 12, self.height()))
+        Args:
+            logic_node (GeneralLogicNode): logic node to be refreshed
+        """
+        node_row = self.node_rows.get(logic_node.uuid)
+        if node_row is None:
+            return
+        new_row = self.build_node_row(logic_node, node_row.color)
+        self.merge_row(node_row, new_row)
 
-        # End
-        qp.end()
-        QtWidgets.QWidget.paintEvent(self, event)
+    def refresh(self):
+        for node_row in list(self.root.children):
+            self.refresh_node(node_row.logic_node)
 
-    def clear(self):
-        """
-        Clear all contents of this widget.
+    def merge_row(self, row: EditorRow, new_row: EditorRow):
         """
-        for i in reversed(range(self.grid_layout.count())):
-            w = self.grid_layout.itemAt(i).widget()
-            if w:
-                w.deleteLater()
+        Update a row in place with the contents of a freshly built one for the same key.
 
-    def represent_node(self):
-        """
-        Add the needed child widgets to properly represent all the
-        internal information in the node.
+        Args:
+            row (EditorRow): row in the model
+            new_row (EditorRow): row with the current state
         """
-        self.row_count = 0
-
-        name_label = QtWidgets.QLabel(self.logic_node.full_name)
-        name_label.setFont(QtGui.QFont("arial", 14))
-        self.grid_layout.addWidget(name_label, self.row_count, 0, 1, 3)
-        close_btn = QtWidgets.QToolButton()
-        close_btn.setIcon(QtGui.QIcon("icons:close.svg"))
-        close_btn.setToolTip("Close this node panel")
-        close_btn.clicked.connect(self.deleteLater)
-        self.grid_layout.addWidget(close_btn, self.row_count, 2, 1, 1)
-        self.row_count += 1
-
-        # IN attributes
-        in_attrs = self.logic_node.get_input_attrs()
-        if in_attrs:
-            in_l = QtWidgets.QLabel("Inputs")
-            in_l.setAlignment(QtCore.Qt.AlignVCenter)
-            self.grid_layout.addWidget(in_l, self.row_count, 0, 1, 3)
-            self.row_count += 1
-
-        for attr in in_attrs:
-            self.represent_attribute(attr)
-
-        # OUT attributes
-        out_attrs = self.logic_node.get_output_attrs()
-        if out_attrs:
-            line = QtWidgets.QFrame()
-            line.setFrameShape(QtWidgets.QFrame.HLine)
-            self.grid_layout.addWidget(line, self.row_count, 0, 1, 3)
-            self.row_count += 1
-
-            out_l = QtWidgets.QLabel("Ouputs")
-            out_l.setAlignment(QtCore.Qt.AlignVCenter)
-            self.grid_layout.addWidget(out_l, self.row_count, 0, 1, 3)
-            self.row_count += 1
-
-        for attr in out_attrs:
-            self.represent_attribute(attr)
-
-        # LOGS
-        fail_log = self.logic_node.fail_log
-        error_log = self.logic_node.error_log
-
-        if error_log or fail_log:
-            line = QtWidgets.QFrame()
-            line.setFrameShape(QtWidgets.QFrame.HLine)
-            self.grid_layout.addWidget(line, self.row_count, 0, 1, 3)
-            self.row_count += 1
-
-        if fail_log:
-            fail_label = QtWidgets.QTextEdit()
-            fail_label.setReadOnly(True)
-            fail_label.setText("<b>Fail log:</b><br>" + "<br>".join(fail_log))
-            fail_label.setStyleSheet(
-                "color:orange; background-color:rgba(0,0,0,50); border: 1px solid rgba(200,200,200,50); border-radius:5px;"
+        if row.kind == ATTRIBUTE_ROW:
+            changed = (
+                row.value is not new_row.value or row.connections != new_row.connections
             )
-            self.grid_layout.addWidget(fail_label, self.row_count, 0, 1, 3)
-            self.row_count += 1
-
-        if error_log:
-            error_label = QtWidgets.QTextEdit()
-            error_label.setReadOnly(True)
-            error_label.setText("<b>Error log:</b><br>" + "<br>".join(error_log))
-            error_label.setStyleSheet(
-                "color:red; background-color:rgba(0,0,0,50); border: 1px solid rgba(200,200,200,50); border-radius:5px;"
+        else:
+            changed = row.value != new_row.value
+        changed = changed or row.name != new_row.name or row.color != new_row.color
+
+        if changed:
+            row.name, row.value, row.color = new_row.name, new_row.value, new_row.color
+            row.connections = new_row.connections
+            row.attribute = new_row.attribute
+            row.summary = None
+            index = self.get_index(row)
+            self.dataChanged.emit(index, index.siblingAtColumn(VALUE_COLUMN))
+
+        if row.lazy:
+            if changed:
+                self.refetch_children(row, new_row.fetched)
+            return
+
+        if [c.key for c in row.children] != [c.key for c in new_row.children]:
+            self.replace_children(row, new_row.children)
+            return
+        for child, new_child in zip(row.children, new_row.children):
+            self.merge_row(child, new_child)
+
+    def refetch_children(self, row: EditorRow, has_no_children: bool):
+        """
+        Drop the children of a lazy row whose value changed, building them again right away if they were shown.
+        """
+        was_fetched = row.fetched and bool(row.children)
+        if row.children:
+            index = self.get_index(row)
+            self.beginRemoveRows(index, 0, len(row.children) - 1)
+            row.children = []
+            self.endRemoveRows()
+        row.fetched = has_no_children
+        if was_fetched and not row.fetched:
+            self.fetchMore(self.get_index(row))
+
+    def replace_children(self, row: EditorRow, new_children: list):
+        index = self.get_index(row)
+        if row.children:
+            self.beginRemoveRows(index, 0, len(row.children) - 1)
+            row.children = []
+            self.endRemoveRows()
+        if new_children:
+            self.beginInsertRows(index, 0, len(new_children) - 1)
+            row.set_children(new_children)
+            self.endInsertRows()
+
+
+# -------------------------------- VIEW -------------------------------- #
+class AttributeValueDelegate(QtWidgets.QStyledItemDelegate):
+    def createEditor(self, parent, option, index):
+        editor = QtWidgets.QLineEdit(parent)
+        editor.setPlaceholderText("None")
+        editor.setValidator(
+            QtGui.QRegExpValidator(
+                get_validation_regex(index.internalPointer().attribute), editor
             )
-            self.grid_layout.addWidget(error_label, self.row_count, 0, 1, 3)
-            self.row_count += 1
-
-        # Execution time
-        exec_time = QtWidgets.QLabel(
-            f"Execution time: {self.logic_node.execution_time:.8f} s."
         )
-        self.grid_layout.addWidget(exec_time, self.row_count, 0, 1, 3)
-        self.row_count += 1
+        return editor
 
-        # Spacer
-        verticalSpacer = QtWidgets.QSpacerItem(
-            20, 20, QtWidgets.QSizePolicy.Minimum, QtWidgets.QSizePolicy.Expanding
-        )
-        self.grid_layout.addItem(verticalSpacer, self.row_count, 0, 1, 3)
 
-    def represent_attribute(self, attr):
-        """
-        Add one of the node's attributes to the widget.
+class AttributeEditor(QtWidgets.QTreeView):
+    """
+    Tree of the nodes added to the attribute editor. Only the rows in view are drawn, values are edited in place.
+    """
 
-        It will consist of different parts: a name label, an input text line...
+    def __init__(self):
+        QtWidgets.QTreeView.__init__(self)
 
-        Args:
-            attr (GeneralLogicAttribute): attr to be represented
+        self.editor_model = AttributeEditorModel(self)
+        self.setModel(self.editor_model)
+        self.setItemDelegateForColumn(VALUE_COLUMN, AttributeValueDelegate(self))
+
+        self.setUniformRowHeights(True)
+        self.setHeaderHidden(True)
+        self.header().resizeSection(NAME_COLUMN, 170)
+
+        self.setMinimumWidth(360)
+
+        self.setHorizontalScrollBarPolicy(QtCore.Qt.ScrollBarAlwaysOff)
+
+        self.setContextMenuPolicy(QtCore.Qt.CustomContextMenu)
+        self.customContextMenuRequested.connect(self.show_context_menu)
 
+        self.editor_model.rowsInserted.connect(self.expand_inserted_rows)
+
+    def expand_inserted_rows(self, parent, first, last):
         """
-        attr_name = attr.attribute_name
-        data_type = attr.data_type
-        name_l = QtWidgets.QLabel("{} ({})".format(attr_name, attr.get_datatype_str()))
-        name_l.setAlignment(QtCore.Qt.AlignRight | QtCore.Qt.AlignVCenter)
-        self.grid_layout.addWidget(name_l, self.row_count, 0, 1, 1)
-
-        value = attr.value
-        attrib_value_le = QtWidgets.QLineEdit()
-        attrib_value_le.setPlaceholderText("None")
-
-        if value is not None:
-            attrib_value_le.setText(str(value))
-
-        regex = QtCore.QRegExp(".*")
-        if data_type is str and value == "":
-            attrib_value_le.setText("''")
-        elif data_type is float:
-            regex = QtCore.QRegExp("\d+\.\d+")
-        elif data_type is int:
-            regex = QtCore.QRegExp("\d+")
-        elif data_type is dict:
-            regex = QtCore.QRegExp("\{.+")
-        elif data_type is bool:
-            regex = QtCore.QRegExp("[01]")
-            if value is not None:
-                attrib_value_le.setText(str(int(value)))
-
-        validator = QtGui.QRegExpValidator(regex)
-        attrib_value_le.setValidator(validator)
-        attrib_value_le.setToolTip("Valid input: {}".format(regex.pattern()))
-
-        connector_type = attr.connector_type
-        conns = attr.get_connections_list()
-        if (
-            connector_type == constants.OUTPUT
-            or attr_name
-            in [
-                constants.START,
-                constants.COMPLETED,
-            ]
-            or conns
-        ):
-            attrib_value_le.setToolTip("Does not accept manual input")
-            attrib_value_le.setReadOnly(True)
-            if conns:
-                attrib_value_le.setToolTip("Is connected, does not accept manual input")
-            attrib_value_le.setStyleSheet("border: 1px solid white")
-        else:
-            attrib_value_le.setStyleSheet(
-                "QLineEdit{color:cyan;} QLineEdit:!focus{border: 1px solid white}\
-                                            QLineEdit:focus{border: 1px dashed white}"
-            )
-            attrib_value_le.editingFinished.connect(
-                lambda: self.logic_node.set_attribute_from_str(
-                    attr_name, attrib_value_le.text()
-                )
+        Nodes are shown expanded.
+        """
+        if parent.isValid():
+            return
+        for i in range(first, last + 1):
+            self.expand(self.editor_model.index(i, 0, parent))
+
+    def show_context_menu(self, pos):
+        index = self.indexAt(pos)
+        row = self.editor_model.get_row(index)
+        menu = QtWidgets.QMenu(self)
+
+        if row.kind == NODE_ROW:
+            close_action = menu.addAction(
+                QtGui.QIcon("icons:close.svg"), "Close this node panel"
             )
-            attrib_value_le.editingFinished.connect(
-                self.logic_node.propagate_clear_cache
+            close_action.triggered.connect(
+                lambda: self.editor_model.remove_node(row.key)
             )
-
-        self.grid_layout.addWidget(attrib_value_le, self.row_count, 1, 1, 1)
-
-        if attr.get_datatype_str() not in [
+        elif row.kind == ATTRIBUTE_ROW and row.attribute.get_datatype_str() not in [
             "Run",
             "RunLoop",
         ]:
-            copy_btn = QtWidgets.QToolButton()
-            copy_btn.setIcon(QtGui.QIcon("icons:clipboard.svg"))
-            copy_btn.setToolTip("Copy this value to clipboard")
-            copy_btn.clicked.connect(
+            copy_action = menu.addAction(
+                QtGui.QIcon("icons:clipboard.svg"), "Copy this value to clipboard"
+            )
+            copy_action.triggered.connect(
                 lambda: QtWidgets.QApplication.clipboard().setText(
-                    attrib_value_le.text()
+                    "" if row.value is None else str(row.value)
                 )
             )
-            self.grid_layout.addWidget(copy_btn, self.row_count, 2, 1, 1)
-
-        self.row_count += 1
-
-        if conns:
-            for conn in conns:
-                conn_l = QtWidgets.QLabel("└─")
-                conn_l.setAlignment(QtCore.Qt.AlignRight | QtCore.Qt.AlignVCenter)
-                self.grid_layout.addWidget(conn_l, self.row_count, 0, 1, 1)
-                attrib_conns = QtWidgets.QLabel()
-                if connector_type == constants.OUTPUT:
-                    attrib_conns.setText(conn[1])
-                else:
-                    attrib_conns.setText(conn[0])
-                self.grid_layout.addWidget(attrib_conns, self.row_count, 1, 1, 1)
-                self.row_count += 1
 
-
-class AttributeEditor(QtWidgets.QScrollArea):
-    def __init__(self):
-        QtWidgets.QScrollArea.__init__(self)
-        self.layout = QtWidgets.QVBoxLayout()
-        self.widget = QtWidgets.QWidget()
-        self.widget.setLayout(self.layout)
-        self.setWidgetResizable(True)
-        self.setWidget(self.widget)
-        self.layout.addItem(
-            QtWidgets.QSpacerItem(
-                20, 20, QtWidgets.QSizePolicy.Minimum, QtWidgets.QSizePolicy.Expanding
-            ),
-        )
-
-        self.setMinimumWidth(360)
-
-        self.setHorizontalScrollBarPolicy(QtCore.Qt.ScrollBarAlwaysOff)
+        clear_action = menu.addAction("Close all node panels")
+        clear_action.triggered.connect(self.clear_all)
+        menu.exec_(self.viewport().mapToGlobal(pos))
 
     def add_node_panel(self, logic_node: GeneralLogicNode):
         """
@@ -309,61 +622,39 @@ class AttributeEditor(QtWidgets.QScrollArea):
         Args:
             logic_node (GeneralLogicNode): logic node to be represented
         """
-        for i in range(self.layout.count()):
-            w = self.layout.itemAt(i).widget()
-            if w:
-                if w.logic_node == logic_node:
-                    self.layout.takeAt(i)
-                    self.layout.insertWidget(0, w)
-                    self.verticalScrollBar().setValue(0)
-                    return
-
-        self.layout.insertWidget(0, NodePanel(logic_node))
+        if logic_node is None:
+            return
+        self.editor_model.add_node(logic_node)
+        self.scrollToTop()
 
     def refresh_node_panel(self, logic_node: GeneralLogicNode):
         """
-        Refresh the representation/widget of a logic node in attribute editor.
+        Refresh the representation of a logic node in attribute editor.
 
         Args:
             logic_node (GeneralLogicNode): logic node to be refreshed
         """
-        for i in range(self.layout.count()):
-            w = self.layout.itemAt(i).widget()
-            if w:
-                if w.logic_node == logic_node:
-                    w.clear()
-                    w.represent_node()
-                    return
+        if logic_node is not None:
+            self.editor_model.refresh_node(logic_node)
 
     def remove_node_panel(self, logic_node: GeneralLogicNode):
         """
-        Remove the representation/widget of a logic node in attribute editor.
+        Remove the representation of a logic node in attribute editor.
 
         Args:
             logic_node (GeneralLogicNode): logic node to be removed
         """
-        for i in range(self.layout.count()):
-            w = self.layout.itemAt(i).widget()
-            if w:
-                if w.logic_node == logic_node:
-                    w.deleteLater()
-                    return
+        if logic_node is not None:
+            self.editor_model.remove_node(logic_node.uuid)
 
     def refresh(self):
         """
-        Perform an overall refresh of all representations of nodes.
+        Perform an overall refresh of all representations of nodes, only updating what changed.
         """
-        for i in range(self.layout.count()):
-            w = self.layout.itemAt(i).widget()
-            if w:
-                w.clear()
-                w.represent_node()
+        self.editor_model.refresh()
 
     def clear_all(self):
         """
         Remove all representations of nodes.
         """
-        for i in range(self.layout.count()):
-            w = self.layout.itemAt(i).widget()
-            if w:
-                w.deleteLater()
+        self.editor_model.clear()
@@ -21,6 +21,7 @@ from all_nodes.graphic.widgets.attribute_editor import AttributeEditor
 from all_nodes.graphic.widgets.class_searcher import ClassSearcher
 from all_nodes.logic.global_signaler import GLOBAL_SIGNALER as GS
 from all_nodes.graphic.widgets.shortcuts_help import ShortcutsHelp
+from all_nodes.logic import class_registry
 from all_nodes.logic.class_registry import CLASS_REGISTRY as CR
 from all_nodes import utils
 
@@ -35,6 +36,9 @@ class AllNodesWindow(QtWidgets.QMainWindow):
         # CLASSES SCANNING
         self.libraries_added = set()
 
+        # AUTOSAVE
+        self.autosave_enabled = False
+
         # ADD SEARCH PATHS
         root_dir_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
         QtCore.QDir.addSearchPath("icons", os.path.join(root_dir_path, "general_icons"))
@@ -207,6 +211,14 @@ class AllNodesWindow(QtWidgets.QMainWindow):
         load_scene_action.setIcon(QtGui.QIcon("icons:load.png"))
         load_scene_action.triggered.connect(self.load_scene)
         file_menu.addAction(load_scene_action)
+        file_menu.addSeparator()
+        autosave_action = QtWidgets.QAction("Autosave", self)
+        autosave_action.setCheckable(True)
+        autosave_action.setToolTip(
+            "Periodically save scenes next to their file, with the '.autosave' extension"
+        )
+        autosave_action.toggled.connect(self.set_autosave)
+        file_menu.addAction(autosave_action)
 
         node_menu = menu.addMenu("&Node library")
         re_scan_classes_action = QtWidgets.QAction("Re-scan classes", self)
@@ -256,6 +268,11 @@ class AllNodesWindow(QtWidgets.QMainWindow):
         """
         Populate the tree where all nodes are displayed.
         """
+        # Make the icons found while scanning available to Qt
+        for icons_path in class_registry.get_icons_paths():
+            if icons_path not in QtCore.QDir.searchPaths("icons"):
+                QtCore.QDir.addSearchPath("icons", icons_path)
+
         lib_names = CR.get_all_classes().keys()
         for lib_name in lib_names:
             if lib_name in self.libraries_added:
@@ -440,6 +457,7 @@ class AllNodesWindow(QtWidgets.QMainWindow):
 
         graphics_scene.setSceneRect(-20000, -20000, 40000, 40000)
         graphics_scene.setParent(graphics_view)
+        graphics_scene.set_autosave(self.autosave_enabled)
         GS.signals.main_screen_feedback.connect(graphics_view.show_feedback)
 
         if context:
@@ -598,6 +616,17 @@ class AllNodesWindow(QtWidgets.QMainWindow):
         current_scene = current_gw.scene()
         current_scene.save_to_file()
 
+    def set_autosave(self, enabled: bool):
+        """
+        Enable or disable autosaving for all the scenes, current and future.
+
+        Args:
+            enabled (bool): whether to autosave
+        """
+        self.autosave_enabled = enabled
+        for i in range(self.ui.tabWidget.count()):
+            self.ui.tabWidget.widget(i).scene().set_autosave(enabled)
+
     def load_scene(self, source_file):
         """
         Launch the process of loading a file onto a new tab.
@@ -625,7 +654,21 @@ class AllNodesWindow(QtWidgets.QMainWindow):
         self.add_scene()
         current_gw = self.ui.tabWidget.widget(self.ui.tabWidget.currentIndex())
         current_scene = current_gw.scene()
-        current_scene.load_from_file(source_file)
+
+        progress_dialog = QtWidgets.QProgressDialog(
+            "Loading scene...", None, 0, 0, parent=self
+        )
+        progress_dialog.setWindowTitle("Load scene")
+        progress_dialog.setWindowModality(QtCore.Qt.WindowModal)
+        progress_dialog.setMinimumDuration(500)
+
+        def update_progress(stage, done, total):
+            progress_dialog.setLabelText(f"Loading {stage}... ({done}/{total})")
+            progress_dialog.setMaximum(max(total, 1))
+            progress_dialog.setValue(done)
+
+        current_scene.load_from_file(source_file, progress_callback=update_progress)
+        progress_dialog.close()
         current_scene.fit_in_view()
         self.ui.tabWidget.setTabText(
             self.ui.tabWidget.currentIndex(),
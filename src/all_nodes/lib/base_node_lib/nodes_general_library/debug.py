@@ -4,8 +4,6 @@ __credits__ = []
 __license__ = "MIT License"
 
 
-import time
-
 from all_nodes.constants import PreviewsGUI
 from all_nodes.logic.logic_node import GeneralLogicNode
 from all_nodes import utils
@@ -48,7 +46,7 @@ class TimedNode(GeneralLogicNode):
     }
 
     def run(self):
-        time.sleep(self.get_attribute_value("sleep_time") or 1.5)
+        self.sleep(self.get_attribute_value("sleep_time") or 1.5)
 
 
 class PrintToConsole(GeneralLogicNode):
@@ -37,7 +37,7 @@ class SetDictKey(GeneralLogicNode):
     HELP = "Set a key in a dictionary"
 
     INPUTS_DICT = {
-        "in_dict": {"type": dict},
+        "in_dict": {"type": dict, "mutable": True},
         "key": {"type": str},
         "new_value": {"type": object},
     }
@@ -6,7 +6,6 @@ __license__ = "MIT License"
 
 from all_nodes import constants
 from all_nodes import utils
-from all_nodes.logic.app_state import APP_STATE as AS
 from all_nodes.logic.logic_node import GeneralLogicNode
 from all_nodes.logic.logic_node import Run, RunLoop
 
@@ -63,7 +62,7 @@ class ForEachBegin(GeneralLogicNode):
     }
 
     def _run(self, execute_connected=True):
-        if AS.get_state_var("stop_execution"):
+        if self.execution_stopped():
             return
 
         if not self.active:
@@ -82,7 +81,10 @@ class ForEachBegin(GeneralLogicNode):
         self.success = constants.IN_LOOP
 
         for i in range(num_iterations):
-            if AS.get_state_var("stop_execution"):
+            if self.execution_stopped():
+                if self.is_cancelled():
+                    self.mark_cancelled(self.get_cancel_token().reason)
+                    self.signaler.finished.emit()
                 return
             LOGGER.info(f"{Fore.CYAN}{self.node_name}, iteration {i}{Style.RESET_ALL}")
 
@@ -97,7 +99,7 @@ class ForEachBegin(GeneralLogicNode):
 
             self.propagate_results()
             if execute_connected:
-                for node in self.out_connected_nodes():
+                for node in self.sort_by_priority(self.out_connected_nodes()):
                     if node.success in [constants.NOT_RUN, constants.IN_LOOP]:
                         LOGGER.info(
                             "[LOOP] From {}, launching execution of {}".format(
@@ -107,14 +109,14 @@ class ForEachBegin(GeneralLogicNode):
                         node._run()
 
         # Launch execution of ForEachEnd
-        if AS.get_state_var("stop_execution"):
+        if self.execution_stopped():
             return
 
         self.success = constants.SUCCESSFUL
         self.set_output("foreach_end", RunLoop())
         self.propagate_results()
         if execute_connected:
-            for node in self.out_connected_nodes():
+            for node in self.sort_by_priority(self.out_connected_nodes()):
                 if node.success == constants.IN_LOOP:
                     LOGGER.info(
                         "[LOOP END] From {}, launching execution of {}".format(
@@ -46,16 +46,19 @@ class LaunchSubprocess(GeneralLogicNode):
         "subprocess_args": {"type": list},
     }
 
+    RESOURCES = {"subprocess": 1}
+
     def run(self):
-        import subprocess
         import platform
 
         subprocess_command = self.get_attribute_value("subprocess_command")
         subprocess_args = self.get_attribute_value("subprocess_args")
         if platform.system() == "Windows":
-            s = subprocess.run(["cmd", "/c"] + [subprocess_command] + subprocess_args)
+            s = self.run_subprocess(
+                ["cmd", "/c"] + [subprocess_command] + subprocess_args
+            )
         else:
-            s = subprocess.run([subprocess_command] + subprocess_args)
+            s = self.run_subprocess([subprocess_command] + subprocess_args)
 
         if s.returncode != 0:
             self.fail("Subprocess failed with return code {}".format(s.returncode))
@@ -67,6 +70,8 @@ class LaunchSubprocessWithConsole(GeneralLogicNode):
         "subprocess_args": {"type": list},
     }
 
+    RESOURCES = {"subprocess": 1}
+
     OUTPUTS_DICT = {
         "stdout": {"type": str},
         "stderr": {"type": str},
@@ -81,19 +86,18 @@ class LaunchSubprocessWithConsole(GeneralLogicNode):
 
     def run(self):
         import html
-        import subprocess
         import platform
 
         subprocess_command = self.get_attribute_value("subprocess_command")
         subprocess_args = self.get_attribute_value("subprocess_args")
         if platform.system() == "Windows":
-            s = subprocess.run(
+            s = self.run_subprocess(
                 ["cmd", "/c"] + [subprocess_command] + subprocess_args,
                 capture_output=True,
                 text=True,
             )
         else:
-            s = subprocess.run(
+            s = self.run_subprocess(
                 [subprocess_command] + subprocess_args, capture_output=True, text=True
             )
 
@@ -5,6 +5,7 @@ __license__ = "MIT License"
 
 
 from all_nodes.logic.logic_node import GeneralLogicNode
+from all_nodes.logic.resources import host_resource
 from all_nodes import utils
 
 
@@ -36,6 +37,7 @@ class SendPushNotification(GeneralLogicNode):
             "https://api.pushbullet.com/v2/pushes",
             json=data,
             headers={"Access-Token": api_key},
+            timeout=self.request_timeout(),
         )
         self.set_output("status_code", resp.status_code)
 
@@ -46,13 +48,18 @@ class DownloadToTextFile(GeneralLogicNode):
         "filename": {"type": str},
     }
 
+    def get_resources(self) -> dict:
+        resources = super().get_resources()
+        resources[host_resource(self.get_attribute_value("url"))] = 1
+        return resources
+
     def run(self):
         import requests
 
         url = self.get_input("url")
         filename = self.get_input("filename")
 
-        response = requests.get(url)
+        response = requests.get(url, timeout=self.request_timeout())
 
         if response.status_code == 200:
             with open(filename, "w", encoding="utf-8") as f:
@@ -70,13 +77,18 @@ class DownloadImage(GeneralLogicNode):
 
     OUTPUTS_DICT = {"status_code": {"type": int, "optional": True}}
 
+    def get_resources(self) -> dict:
+        resources = super().get_resources()
+        resources[host_resource(self.get_attribute_value("url"))] = 1
+        return resources
+
     def run(self):
         import requests
 
         url = self.get_input("url")
         filename = self.get_input("filename")
 
-        response = requests.get(url)
+        response = requests.get(url, timeout=self.request_timeout())
 
         self.set_output("status_code", response.status_code)
 
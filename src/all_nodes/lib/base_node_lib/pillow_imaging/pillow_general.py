@@ -6,10 +6,11 @@ __license__ = "MIT License"
 
 
 import numpy as np
-import PIL
+import PIL.Image
 
 from all_nodes.constants import InputsGUI, PreviewsGUI
 from all_nodes.logic.logic_node import GeneralLogicNode
+from all_nodes.logic.resources import host_resource
 from all_nodes import utils
 
 
@@ -17,6 +18,13 @@ LOGGER = utils.get_logger(__name__)
 MAX_W = 500  # Only for previews, otherwise it will crash
 
 
+def image_memory_mb(width: int, height: int, bytes_per_pixel: float) -> float:
+    """
+    Estimate the memory (in MB) taken while working on an image of the given size.
+    """
+    return (width or 0) * (height or 0) * bytes_per_pixel / 1024**2
+
+
 class PIL_ImageOpen(GeneralLogicNode):
     INPUTS_DICT = {"in_path": {"type": str}}
     OUTPUTS_DICT = {"out_image": {"type": PIL.Image.Image}}
@@ -62,6 +70,15 @@ class PIL_DirectOpen(GeneralLogicNode):
         },
     }
 
+    def get_resources(self) -> dict:
+        import os
+
+        resources = super().get_resources()
+        path = self.get_attribute_value("internal_str_image_path")
+        if path and not os.path.exists(path):
+            resources[host_resource(path)] = 1
+        return resources
+
     def run(self):
         from io import BytesIO
         import os
@@ -72,7 +89,7 @@ class PIL_DirectOpen(GeneralLogicNode):
         if os.path.exists(path):
             opened_image = PIL.Image.open(path)
         else:
-            response = requests.get(path)
+            response = requests.get(path, timeout=self.request_timeout())
             response.raise_for_status()
             opened_image = PIL.Image.open(BytesIO(response.content))
 
@@ -101,13 +118,20 @@ class PIL_OpenFromUrl(GeneralLogicNode):
     NICE_NAME = "Open from URL"
     HELP = "Open an image from a URL"
 
+    def get_resources(self) -> dict:
+        resources = super().get_resources()
+        resources[host_resource(self.get_attribute_value("in_url"))] = 1
+        return resources
+
     def run(self):
         from io import BytesIO
         import requests
 
         img = self.get_cached_attribute("out_image")
         if not img:
-            response = requests.get(self.get_attribute_value("in_url"))
+            response = requests.get(
+                self.get_attribute_value("in_url"), timeout=self.request_timeout()
+            )
             response.raise_for_status()
             img = PIL.Image.open(BytesIO(response.content))
             self.cache_attribute("out_image", img)
@@ -185,6 +209,20 @@ class PIL_VoronoiNoise(GeneralLogicNode):
         },
     }
 
+    CPU_SLOTS = 1
+
+    def get_resources(self) -> dict:
+        resources = super().get_resources()
+        bytes_per_pixel = 8  # Rust
+        if self.get_attribute_value("executor_type") == "Python":
+            bytes_per_pixel = 24 * (self.get_attribute_value("num_seeds") or 1) + 32
+        resources["memory_mb"] = image_memory_mb(
+            self.get_attribute_value("in_width"),
+            self.get_attribute_value("in_height"),
+            bytes_per_pixel,
+        )
+        return resources
+
     def generate_voronoi_rgb(self, height, width, num_seeds, seed=None):
         if seed is not None:
             np.random.seed(seed)
@@ -269,6 +307,17 @@ class PIL_PerlinNoise(GeneralLogicNode):
         },
     }
 
+    CPU_SLOTS = 1
+
+    def get_resources(self) -> dict:
+        resources = super().get_resources()
+        resources["memory_mb"] = image_memory_mb(
+            self.get_attribute_value("in_width"),
+            self.get_attribute_value("in_height"),
+            320,  # All the float arrays of the gradients
+        )
+        return resources
+
     def fade(self, t):
         return 6 * t**5 - 15 * t**4 + 10 * t**3
 
@@ -377,6 +426,17 @@ class PIL_FbmNoise(GeneralLogicNode):
         },
     }
 
+    CPU_SLOTS = 1
+
+    def get_resources(self) -> dict:
+        resources = super().get_resources()
+        resources["memory_mb"] = image_memory_mb(
+            self.get_attribute_value("in_width"),
+            self.get_attribute_value("in_height"),
+            8,
+        )
+        return resources
+
     def run(self):
         import platform
         import time
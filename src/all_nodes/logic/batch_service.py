@@ -0,0 +1,248 @@
+# -*- coding: UTF-8 -*-
+__author__ = "Jaime Rivera <jaime.rvq@gmail.com>"
+__copyright__ = "Copyright 2022, Jaime Rivera"
+__credits__ = []
+__license__ = "MIT License"
+
+
+import concurrent.futures
+import copy
+import json
+import os
+import socketserver
+import threading
+import time
+
+from all_nodes import constants
+from all_nodes import utils
+from all_nodes.logic.class_registry import CLASS_REGISTRY as CR
+from all_nodes.logic.logic_scene import LogicScene, LogicSceneError
+from all_nodes.logic.metrics import ENGINE_METRICS as EM
+
+
+LOGGER = utils.get_logger(__name__)
+
+
+# -------------------------------- SERVICE -------------------------------- #
+class BatchService:
+    """
+    Persistent worker that runs many scenes without restarting.
+
+    Classes are scanned only once and the parsed scene files are kept as templates, so every request only pays for
+    creating and running its nodes. Each request gets its own LogicScene.
+
+    Requests are dicts (one JSON line each) such as:
+        {"id": "job_1", "scene": "word_count", "parameters": {"StrInput_1.internal_str": "Hello there"}}
+    Parameters given as strings are parsed like in batch mode (-s), other JSON values are set as they are.
+    """
+
+    def __init__(self, max_workers: int = None):
+        """
+        Args:
+            max_workers (int, optional): Scenes to run at the same time. Defaults to None, as many as CPUs.
+        """
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="all_nodes_service"
+        )
+
+        self._templates = {}
+        self._templates_lock = threading.Lock()
+
+        CR.get_all_classes()  # Warm up
+
+    # TEMPLATES ----------------------
+    def get_scene_template(self, scene_path: str) -> dict:
+        """
+        Get the parsed contents of a scene file, parsing it again only if it changed on disk.
+
+        Args:
+            scene_path (str): resolved filepath of the scene
+
+        Returns:
+            dict: contents of the scene file
+        """
+        mtime = os.path.getmtime(scene_path)
+        with self._templates_lock:
+            cached = self._templates.get(scene_path)
+            hit = bool(cached) and cached[0] == mtime
+        EM.cache_request("scene_templates", hit)
+        if hit:
+            return cached[1]
+
+        scene_dict = LogicScene.read_scene_file(scene_path)
+        with self._templates_lock:
+            self._templates[scene_path] = (mtime, scene_dict)
+        return scene_dict
+
+    # RUNNING ----------------------
+    def build_scene(self, scene_alias: str, parameters: dict = None) -> LogicScene:
+        """
+        Create a new scene from a template and set parameters on it.
+
+        Args:
+            scene_alias (str): filepath or alias of the scene
+            parameters (dict, optional): values by dot name of the attribute. Defaults to None.
+
+        Raises:
+            LogicSceneError: if the scene cannot be found or a node to set parameters on does not exist
+
+        Returns:
+            LogicScene: scene ready to be run
+        """
+        scene = LogicScene()
+        scene_path = scene.resolve_scene_path(scene_alias)
+        scene_dict = copy.deepcopy(self.get_scene_template(scene_path))
+        for _ in scene.iter_load_from_file(scene_path, scene_dict=scene_dict):
+            pass
+
+        for attr_dot_name, value in (parameters or {}).items():
+            node_name, attr_name = attr_dot_name.rsplit(".", 1)
+            node = scene.to_node(node_name)
+            if node is None:
+                raise LogicSceneError(
+                    "No node {} to set parameters on".format(node_name)
+                )
+            if isinstance(value, str):
+                node.set_attribute_from_str(attr_name, value)
+            else:
+                node.set_attribute_value(attr_name, value)
+
+        return scene
+
+    def run_request(self, request: dict) -> dict:
+        """
+        Run the scene of a request.
+
+        Args:
+            request (dict): with keys "scene", and optionally "id", "parameters", "conserve_memory", "timeout"
+                (seconds the scene can run for) and "node_timeout" (seconds each node can run for, unless it has
+                its own limit)
+
+        Returns:
+            dict: result, with the overall status and the status of every node
+        """
+        result = {"id": request.get("id"), "scene": request.get("scene")}
+        t1 = time.time()
+        try:
+            scene = self.build_scene(request["scene"], request.get("parameters"))
+            if request.get("node_timeout"):
+                scene.set_nodes_timeout(request["node_timeout"])
+            scene.run_all_nodes(
+                spawn_thread=False,
+                conserve_memory=request.get("conserve_memory", False),
+                timeout=request.get("timeout"),
+            )
+        except Exception as e:
+            LOGGER.exception(e)
+            result["status"] = constants.ERROR
+            result["errors"] = [str(e)]
+            result["execution_time"] = time.time() - t1
+            return result
+
+        nodes = {node.node_name: node.success for node in scene.all_logic_nodes}
+        result["status"] = constants.SUCCESSFUL
+        for status in [constants.FAILED, constants.TIMEOUT, constants.ERROR]:
+            if status in nodes.values():
+                result["status"] = status
+        result["nodes"] = nodes
+        result["failures"] = scene.gather_failed_nodes_logs()
+        result["errors"] = scene.gather_errored_nodes_logs()
+        result["execution_time"] = time.time() - t1
+        return result
+
+    # STREAMS ----------------------
+    def serve_lines(self, lines, write_line):
+        """
+        Run the requests read from JSON lines, writing back one JSON line when each run starts and another one with
+        its result when it finishes. Results are written as soon as they are ready, not in the order of the requests.
+
+        If a line cannot be written back, such as when the client has disconnected, no more requests are read and the
+        ones not started yet are cancelled.
+
+        Args:
+            lines (iterable): JSON lines with requests
+            write_line (callable): called with each JSON line to send back
+        """
+        write_lock = threading.Lock()
+        broken = threading.Event()
+
+        def send(message: dict):
+            line = json.dumps(message, default=str)
+            with write_lock:
+                if broken.is_set():
+                    return
+                try:
+                    write_line(line)
+                except Exception as e:
+                    LOGGER.error(
+                        "Cannot send back results, no more requests are served here (%s)",
+                        e,
+                    )
+                    broken.set()
+
+        def log_failure(future: concurrent.futures.Future):
+            if not future.cancelled() and future.exception() is not None:
+                LOGGER.error("Could not serve a request", exc_info=future.exception())
+
+        futures = []
+        for line in lines:
+            if broken.is_set():
+                break
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                request = json.loads(line)
+                if not isinstance(request, dict) or "scene" not in request:
+                    raise ValueError("Requests need a 'scene'")
+            except ValueError as e:
+                send({"status": constants.ERROR, "errors": [str(e)]})
+                continue
+
+            send({"id": request.get("id"), "status": constants.EXECUTING})
+            future = self.executor.submit(lambda r: send(self.run_request(r)), request)
+            future.add_done_callback(log_failure)
+            futures.append(future)
+
+        if broken.is_set():
+            for future in futures:
+                future.cancel()
+        concurrent.futures.wait(futures)
+
+    def serve_stdin(self, stdin, stdout):
+        """
+        Serve the requests read from stdin, until it is closed.
+        """
+        LOGGER.info("Serving requests from stdin")
+
+        def write_line(line: str):
+            stdout.write(line + "\n")
+            stdout.flush()
+
+        self.serve_lines(stdin, write_line)
+
+    def serve_socket(self, host: str, port: int):
+        """
+        Serve the requests of clients connecting to a local TCP socket, until interrupted.
+        """
+        service = self
+
+        class RequestHandler(socketserver.StreamRequestHandler):
+            def handle(self):
+                def write_line(line: str):
+                    self.wfile.write((line + "\n").encode("utf-8"))
+                    self.wfile.flush()
+
+                lines = (raw.decode("utf-8") for raw in self.rfile)
+                service.serve_lines(lines, write_line)
+
+        with socketserver.ThreadingTCPServer((host, port), RequestHandler) as server:
+            LOGGER.info("Serving requests at %s:%d", *server.server_address)
+            try:
+                server.serve_forever()
+            except KeyboardInterrupt:
+                pass
+
+    def shutdown(self):
+        self.executor.shutdown(wait=True)
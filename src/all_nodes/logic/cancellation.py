@@ -0,0 +1,175 @@
+# -*- coding: UTF-8 -*-
+__author__ = "Jaime Rivera <jaime.rvq@gmail.com>"
+__copyright__ = "Copyright 2022, Jaime Rivera"
+__credits__ = []
+__license__ = "MIT License"
+
+
+import threading
+import time
+
+from all_nodes import constants
+from all_nodes import utils
+
+
+LOGGER = utils.get_logger(__name__)
+
+
+# -------------------------------- EXCEPTIONS -------------------------------- #
+class CancelledError(Exception):
+    """
+    Raised inside a node run when its cancellation token has been cancelled.
+    """
+
+    def __init__(self, reason: str = constants.CANCELLED):
+        self.reason = reason
+        super().__init__("Execution cancelled ({})".format(reason))
+
+
+# -------------------------------- TOKEN -------------------------------- #
+class CancellationToken:
+    """
+    Cooperative cancellation shared by the engine and the nodes it runs.
+
+    Whoever runs a scene can cancel its token at any time, or give it a deadline. Nodes check it between steps
+    (is_cancelled / raise_if_cancelled), wait on it instead of sleeping, and register callbacks to kill whatever they
+    are blocked on (a subprocess, a pool of processes...) as soon as it is cancelled.
+
+    A child token is cancelled whenever its parent is, and can also be cancelled on its own (e.g. a node timeout).
+    """
+
+    def __init__(self, parent: "CancellationToken" = None):
+        """
+        Args:
+            parent (CancellationToken, optional): token whose cancellation also cancels this one. Defaults to None.
+        """
+        self.reason = None
+        self.deadline = None
+
+        self._event = threading.Event()
+        self._callbacks = []
+        self._lock = threading.Lock()
+        self._timer = None
+
+        self.parent = parent
+        if parent is not None:
+            parent.add_callback(self._cancel_from_parent)
+
+    # STATE ----------------------
+    @property
+    def is_cancelled(self) -> bool:
+        return self._event.is_set()
+
+    @property
+    def timed_out(self) -> bool:
+        return self.reason == constants.TIMEOUT
+
+    def remaining_time(self):
+        """
+        Returns:
+            float: seconds left until the closest deadline of this token or its parents, None if there is none
+        """
+        deadlines = []
+        token = self
+        while token is not None:
+            if token.deadline is not None:
+                deadlines.append(token.deadline)
+            token = token.parent
+        if not deadlines:
+            return None
+        return max(0.0, min(deadlines) - time.monotonic())
+
+    # CANCELLING ----------------------
+    def cancel(self, reason: str = constants.CANCELLED):
+        """
+        Cancel the token, and call all its callbacks. Cancelling an already cancelled token does nothing.
+
+        Args:
+            reason (str, optional): constants.CANCELLED or constants.TIMEOUT. Defaults to constants.CANCELLED.
+        """
+        with self._lock:
+            if self._event.is_set():
+                return
+            self.reason = reason
+            self._event.set()
+            callbacks = list(self._callbacks)
+            self._callbacks = []
+            if self._timer is not None:
+                self._timer.cancel()
+
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                LOGGER.exception(e)
+
+    def cancel_after(self, seconds: float):
+        """
+        Cancel the token with a TIMEOUT reason once the given amount of seconds have passed.
+
+        Args:
+            seconds (float): time allowed
+        """
+        with self._lock:
+            if self._event.is_set():
+                return
+            if self._timer is not None:
+                self._timer.cancel()
+            self.deadline = time.monotonic() + seconds
+            self._timer = threading.Timer(seconds, self.cancel, (constants.TIMEOUT,))
+            self._timer.daemon = True
+            self._timer.start()
+
+    def close(self):
+        """
+        Stop the deadline timer and detach from the parent, once the token is not needed anymore.
+        """
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        if self.parent is not None:
+            self.parent.remove_callback(self._cancel_from_parent)
+
+    def _cancel_from_parent(self):
+        self.cancel(self.parent.reason)
+
+    # CALLBACKS ----------------------
+    def add_callback(self, callback):
+        """
+        Call something when the token gets cancelled, right away if it already is.
+
+        Args:
+            callback (callable): called with no arguments, from the thread that cancels the token
+        """
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return
+        callback()
+
+    def remove_callback(self, callback):
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+    # WAITING ----------------------
+    def wait(self, seconds: float = None) -> bool:
+        """
+        Block until the token gets cancelled or the given amount of seconds have passed.
+
+        Args:
+            seconds (float, optional): time to wait for. Defaults to None, forever.
+
+        Returns:
+            bool: True if the token was cancelled
+        """
+        return self._event.wait(seconds)
+
+    def raise_if_cancelled(self):
+        """
+        Raises:
+            CancelledError: if the token has been cancelled
+        """
+        if self._event.is_set():
+            raise CancelledError(self.reason)
@@ -7,14 +7,13 @@ __license__ = "MIT License"
 
 import builtins
 import concurrent.futures
-import importlib
+import importlib.util
 import inspect
 import os
 from pathlib import Path
+import threading
 import time
 
-from PySide2 import QtCore
-
 import toml
 import yaml
 
@@ -22,6 +21,8 @@ from all_nodes import constants
 from all_nodes import utils
 from all_nodes.logic.logic_node import GeneralLogicNode
 from all_nodes.logic.global_signaler import GLOBAL_SIGNALER as GS
+from all_nodes.logic.signals import Signal
+from all_nodes.logic.thread_pool import THREAD_POOL
 
 TYPE_MAP = {
     "str": str,
@@ -37,6 +38,51 @@ TYPE_MAP = {
 LOGGER = utils.get_logger(__name__)
 
 
+# -------------------------------- ICONS -------------------------------- #
+ICONS_PATHS = [
+    os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        "graphic",
+        "general_icons",
+    )
+]  # Folders where icons are looked for, the GUI registers them as its 'icons:' search path
+_icons_paths_lock = threading.Lock()
+
+
+def register_icons_path(icons_path: str):
+    """
+    Add a folder to the ones where icons are looked for.
+
+    Args:
+        icons_path (str): folder containing icons
+    """
+    with _icons_paths_lock:
+        if icons_path not in ICONS_PATHS:
+            ICONS_PATHS.append(icons_path)
+            LOGGER.debug("Registered path {} to 'icons'".format(icons_path))
+
+
+def get_icons_paths() -> list:
+    with _icons_paths_lock:
+        return list(ICONS_PATHS)
+
+
+def icon_exists(icon_filename: str) -> bool:
+    """
+    Check if an icon can be found in any of the registered icon folders.
+
+    Args:
+        icon_filename (str): name of the icon file, such as 'nodes.svg'
+
+    Returns:
+        bool: whether the icon was found
+    """
+    return any(
+        os.path.isfile(os.path.join(icons_path, icon_filename))
+        for icons_path in get_icons_paths()
+    )
+
+
 # -------------------------------- NODE CLASSES -------------------------------- #
 CLASSES_TO_SKIP = [
     "InputsGUI",
@@ -77,11 +123,8 @@ def register_node_lib(lib_path):
             LOGGER.warning(
                 f"No icons folder available for {node_library_name}, icons for this library should be saved at: {icons_path}"
             )
-        if os.path.isdir(icons_path) and icons_path not in QtCore.QDir.searchPaths(
-            "icons"
-        ):
-            QtCore.QDir.addSearchPath("icons", icons_path)
-            LOGGER.debug("Registered path {} to 'icons'".format(icons_path))
+        if os.path.isdir(icons_path):
+            register_icons_path(icons_path)
 
         # STYLES
         node_styles = dict()
@@ -134,14 +177,14 @@ def register_node_lib(lib_path):
                 hasattr(cls_object, "IS_CONTEXT") and cls_object.IS_CONTEXT
             ):  # TODO inheritance not working here?
                 icon_path = "icons:cubes.svg"
-            if QtCore.QFile.exists(f"icons:{name}.png"):
+            if icon_exists(f"{name}.png"):
                 icon_path = f"icons:{name}.png"
-            elif QtCore.QFile.exists(f"icons:{name}.svg"):
+            elif icon_exists(f"{name}.svg"):
                 icon_path = f"icons:{name}.svg"
             elif default_icon:
-                if QtCore.QFile.exists("icons:" + default_icon + ".png"):
+                if icon_exists(default_icon + ".png"):
                     icon_path = f"icons:{default_icon}.png"
-                elif QtCore.QFile.exists("icons:" + default_icon + ".svg"):
+                elif icon_exists(default_icon + ".svg"):
                     icon_path = f"icons:{default_icon}.svg"
             setattr(cls_object, "ICON_PATH", icon_path)
 
@@ -360,8 +403,8 @@ class ClassRegistry:
         node_libs = get_all_node_libs()
         cls._lib_workers = [LibWorker(node_lib) for node_lib in node_libs]
         for worker in cls._lib_workers:
-            QtCore.QThreadPool.globalInstance().start(worker)
             worker.signaler.finished.connect(cls.update_classes_dict)
+            THREAD_POOL.start(worker)
 
     def scan_for_classes(cls):
         LOGGER.info("Gathering all classes...")
@@ -450,14 +493,12 @@ CLASS_REGISTRY = ClassRegistry()  # Singleton to use
 
 
 # -------------------------------- WORKER -------------------------------- #
-class LibWorkerSignaler(QtCore.QObject):
-    finished = QtCore.Signal()
+class LibWorkerSignaler:
+    finished = Signal()
 
 
-class LibWorker(QtCore.QRunnable):
+class LibWorker:
     def __init__(self, lib_path: str):
-        super(LibWorker, self).__init__()
-
         self.lib_path = lib_path
         self.lib_name = Path(lib_path).name
         self.dict_lib = None
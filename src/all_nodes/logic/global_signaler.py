@@ -4,40 +4,40 @@ __credits__ = []
 __license__ = "MIT License"
 
 
-from PySide2 import QtCore
+from all_nodes.logic.signals import Signal
 
 
-class GlobalSignals(QtCore.QObject):
+class GlobalSignals:
     # -------------------------- LOGIC -------------------------- #
-    class_scanning_finished = QtCore.Signal()
+    class_scanning_finished = Signal()
 
     # -------------------------- WIDGETS -------------------------- #
     # Widget move ----------------------
-    class_searcher_move = QtCore.Signal(int, int)
+    class_searcher_move = Signal(int, int)
 
     # Tabs ----------------------
-    tab_names_refresh_requested = QtCore.Signal()
+    tab_names_refresh_requested = Signal()
 
     # Attribute editor ----------------------
-    attribute_editor_node_addition_requested = QtCore.Signal(str)
-    attribute_editor_refresh_node_requested = QtCore.Signal(str)
-    attribute_editor_remove_node_requested = QtCore.Signal(str)
+    attribute_editor_node_addition_requested = Signal(str)
+    attribute_editor_refresh_node_requested = Signal(str)
+    attribute_editor_remove_node_requested = Signal(str)
 
-    attribute_editor_global_refresh_requested = QtCore.Signal()
+    attribute_editor_global_refresh_requested = Signal()
 
     # Contexts ----------------------
-    context_expansion_requested = QtCore.Signal(str)
+    context_expansion_requested = Signal(str)
 
     # Node creation ----------------------
-    dropped_node = QtCore.Signal(QtCore.QPoint)
-    node_creation_requested = QtCore.Signal(QtCore.QPoint, str)
+    dropped_node = Signal(object)  # QPoint
+    node_creation_requested = Signal(object, str)  # QPoint, class name
 
     # Feedback ----------------------
-    main_screen_feedback = QtCore.Signal(str, int)
+    main_screen_feedback = Signal(str, int)
 
     # -------------------------- EXECUTION -------------------------- #
-    execution_started = QtCore.Signal()
-    execution_finished = QtCore.Signal()
+    execution_started = Signal()
+    execution_finished = Signal()
 
 
 class GlobalSignaler:
@@ -12,19 +12,24 @@ import datetime
 import getpass
 import html
 import inspect
+import logging
 import os
 from pathlib import Path
 import pprint
 import re
+import subprocess
 import textwrap
 import time
 import uuid
 
-from PySide2 import QtCore
-
 from all_nodes import constants
 from all_nodes import utils
 from all_nodes.logic.app_state import APP_STATE as AS
+from all_nodes.logic.cancellation import CancellationToken, CancelledError
+from all_nodes.logic.metrics import ENGINE_METRICS as EM
+from all_nodes.logic.resources import RESOURCE_MANAGER as RM
+from all_nodes.logic.signals import Signal
+from all_nodes.logic.spill_store import SPILL_STORE, SpilledValue
 
 LOGGER = utils.get_logger(__name__)
 
@@ -48,6 +53,28 @@ class GeneralLogicNode:
     The 'optional' parameter can be provided, but will always default to False unless specified,
     as we mostly want all inputs of nodes to be set.
 
+    Inputs are read-only by default: the values are shared with the nodes that produced them (no copies).
+    If the node modifies an input in place, it must be declared as mutable:
+    INPUTS_DICT = {"in_dict": {"type": dict, "mutable": True}}
+    The node then gets its own copy of that value, made only when the node reads it.
+
+    When running in memory-conserving mode, output values are released once all the nodes connected to them have
+    run. To always keep the value of an output, it can be declared as kept:
+    OUTPUTS_DICT = {"out_table": {"type": object, "keep": True}}
+
+    A node can be given a time limit (RUN_TIMEOUT for the whole class, or timeout for a single node). When the time
+    is up, or the run of the scene gets cancelled, the cancellation token of the node is cancelled. Nodes that block
+    should do it through self.sleep, self.run_subprocess and self.request_timeout, or check self.is_cancelled, so
+    they can be interrupted. Nodes that time out are marked with the TIMEOUT status.
+
+    Nodes can declare the resources they hold while running, so the nodes running at once across scenes do not
+    oversubscribe the machine (see ResourceManager):
+    CPU_SLOTS = 1
+    MEMORY_MB = 500
+    RESOURCES = {"subprocess": 1}
+    Nodes that are ready to run start by order of priority (PRIORITY for the whole class, or priority for a single
+    node), and then by the length of the critical path that follows them.
+
     """
 
     FILEPATH = ""
@@ -63,6 +90,13 @@ class GeneralLogicNode:
 
     INTERNALS_DICT = {}  # Internal attrs not exposed (for GUI input / preview mostly)
 
+    RUN_TIMEOUT = None  # Seconds a run can take, None for no limit
+
+    CPU_SLOTS = 0  # CPU slots taken while running
+    MEMORY_MB = 0  # Estimate of the memory used while running
+    RESOURCES = {}  # Other named resources taken while running
+    PRIORITY = 0  # Higher priority nodes start first
+
     VALID_NAMING_PATTERN = "^[A-Z]+[a-zA-Z0-9_]*$"
 
     def __init__(self):
@@ -70,6 +104,7 @@ class GeneralLogicNode:
         self.class_name = type(self).__name__
         self.node_name = self.class_name + "_1"
         self.uuid = str(uuid.uuid4())
+        self.revision = 0  # Bumped on every change, to know what needs re-serializing
 
         # Copy dicts
         self.INPUTS_DICT = deepcopy(self.INPUTS_DICT)
@@ -92,6 +127,15 @@ class GeneralLogicNode:
         self.active = True
         self.success = constants.NOT_RUN
         self.execution_counter = 0
+        self.conserve_memory = False  # Release values as soon as they are consumed
+        self.profiler = None  # ExecutionProfiler recording each run, if any
+        self.code_profiler = None  # CodeProfiler wrapping the run() calls, if any
+        self.analytics_recorders = []  # AnalyticsRecorders to report each run to
+        self.timeout = self.RUN_TIMEOUT
+        self.cancel_token = None  # CancellationToken of the run of the scene, if any
+        self._run_token = None  # CancellationToken of the current run of this node
+        self.priority = self.PRIORITY
+        self.critical_path = 0.0  # Seconds expected until the scene ends
 
         self.fail_log = []
         self.error_log = []
@@ -122,6 +166,12 @@ class GeneralLogicNode:
             return True
         return False
 
+    def mark_modified(self):
+        """
+        Register that the state of this node (the one that gets saved to file) has changed.
+        """
+        self.revision += 1
+
     def rename(self, new_name: str) -> bool:
         """
         Rename the node to the given new name.
@@ -142,6 +192,7 @@ class GeneralLogicNode:
         if self.name_is_valid(new_name):
             LOGGER.debug("Renamed node '{}' to '{}'".format(self.node_name, new_name))
             self.node_name = new_name
+            self.mark_modified()
             return True
         else:
             LOGGER.warning("Name proposed for node is not valid: {}".format(new_name))
@@ -162,6 +213,7 @@ class GeneralLogicNode:
             "Forcing renaming of node '{}' to '{}'".format(self.node_name, new_name)
         )
         self.node_name = new_name
+        self.mark_modified()
         return True
 
     def get_max_in_or_out_count(self) -> int:
@@ -258,6 +310,10 @@ class GeneralLogicNode:
         out_dict[self.node_name]["class_name"] = self.class_name
         if not self.active:
             out_dict[self.node_name]["active"] = self.active
+        if self.timeout != self.RUN_TIMEOUT:
+            out_dict[self.node_name]["timeout"] = self.timeout
+        if self.priority != self.PRIORITY:
+            out_dict[self.node_name]["priority"] = self.priority
 
         out_dict[self.node_name]["node_attributes"] = dict()
         for attr in self.all_attributes:
@@ -265,6 +321,8 @@ class GeneralLogicNode:
                 constants.PreviewsGUI
             ):
                 continue  # No need to register preview attrs
+            if isinstance(attr.value, SpilledValue):
+                continue  # Only valid while its file exists, results are not saved
 
             if (
                 attr.attribute_name not in [constants.START, constants.COMPLETED]
@@ -338,8 +396,20 @@ class GeneralLogicNode:
         Returns:
             bool: True if the given node is part of a cycle, False otherwise.
         """
-        in_connected_nodes = self.in_connected_nodes_recursive()
-        return node_to_check in in_connected_nodes
+        visited = set()
+        to_visit = [self]
+        while to_visit:
+            node = to_visit.pop()
+            for attr in node.get_input_attrs():
+                for connected_attr in attr.connected_attributes:
+                    in_node = connected_attr.parent_node
+                    if in_node is node_to_check:
+                        return True
+                    if in_node not in visited:
+                        visited.add(in_node)
+                        to_visit.append(in_node)
+
+        return False
 
     def get_gui_internals_inputs(self) -> dict:
         """
@@ -433,6 +503,7 @@ class GeneralLogicNode:
                 is_optional=self.INPUTS_DICT[input_attribute_name].get(
                     "optional", False
                 ),
+                is_mutable=self.INPUTS_DICT[input_attribute_name].get("mutable", False),
             )
             self.all_attributes.append(in_attr)
 
@@ -446,6 +517,7 @@ class GeneralLogicNode:
                 is_optional=self.OUTPUTS_DICT[output_attribute_name].get(
                     "optional", False
                 ),
+                keep_value=self.OUTPUTS_DICT[output_attribute_name].get("keep", False),
             )
             self.all_attributes.append(out_attr)
 
@@ -476,6 +548,7 @@ class GeneralLogicNode:
         gui_type=None,
         is_optional=False,
         value=None,
+        is_mutable=False,
     ):
         # Check name
         if attribute_name in self.all_attribute_names:
@@ -486,19 +559,26 @@ class GeneralLogicNode:
 
         # Create attribute
         new_attribute = GeneralLogicAttribute(
-            self, attribute_name, connector_type, data_type, is_optional=is_optional
+            self,
+            attribute_name,
+            connector_type,
+            data_type,
+            is_optional=is_optional,
+            is_mutable=is_mutable,
         )
 
         if value:
             new_attribute.set_value(value)
 
         self.all_attributes.append(new_attribute)
+        self.mark_modified()
 
         # Registrer it to the dict of the instance
         if connector_type == constants.INPUT:
             self.INPUTS_DICT[attribute_name] = dict()
             self.INPUTS_DICT[attribute_name]["type"] = data_type
             self.INPUTS_DICT[attribute_name]["optional"] = is_optional
+            self.INPUTS_DICT[attribute_name]["mutable"] = is_mutable
         elif connector_type == constants.OUTPUT:
             self.OUTPUTS_DICT[attribute_name] = dict()
             self.OUTPUTS_DICT[attribute_name]["type"] = data_type
@@ -579,7 +659,7 @@ class GeneralLogicNode:
                 else:
                     raise RuntimeError(
                         "Not a valid type! {} not valid for {} (needed: {})".format(
-                            value,
+                            utils.short_repr(value),
                             attribute.dot_name,
                             attribute.get_datatype_str(),
                         )
@@ -613,6 +693,7 @@ class GeneralLogicNode:
             )
             return
 
+        EM.cache_request("node_attributes", attribute_name in self.cached_attributes)
         return self.cached_attributes.get(attribute_name)
 
     def propagate_clear_cache(self):
@@ -759,7 +840,11 @@ class GeneralLogicNode:
             )
             return
 
-        return self[attribute_name].get_value()
+        attribute = self[attribute_name]
+        if attribute.is_mutable and not attribute.owns_value:
+            attribute.take_ownership()  # Copy-on-write, this node is going to modify it
+
+        return attribute.get_value()
 
     def connect_attribute(
         self,
@@ -917,7 +1002,7 @@ class GeneralLogicNode:
         """
         # ------------------- PRE-CHECKS ------------------- #
         # --------------- Global state
-        if AS.get_state_var("stop_execution"):
+        if self.execution_stopped():
             return
 
         # --------------- Status
@@ -946,11 +1031,11 @@ class GeneralLogicNode:
 
             # Execute connected, if they can (might be missing inputs from this one)
             if execute_connected:
-                for node in self.out_connected_nodes():
-                    LOGGER.info(
-                        "From {} (skipped), launching execution of {}".format(
-                            self.full_name, node.full_name
-                        )
+                for node in self.sort_by_priority(self.out_connected_nodes()):
+                    LOGGER.debug(
+                        "From %s (skipped), launching execution of %s",
+                        self.full_name,
+                        node.full_name,
                     )
                     node._run()
                 return
@@ -966,17 +1051,21 @@ class GeneralLogicNode:
             return
 
         # ------------------- START EXECUTION ------------------- #
-        if AS.get_state_var("stop_execution"):
+        if self.execution_stopped():
             return
 
-        LOGGER.info(
-            "Starting execution of {} ({})".format(self.full_name, self.class_name)
-        )
+        LOGGER.info("Starting execution of %s (%s)", self.full_name, self.class_name)
         self.execution_counter += 1
+        in_loop = self.success == constants.IN_LOOP  # Will run again, keep its inputs
 
         t1 = time.time()
+        profile_record = self.profiler.node_started(self) if self.profiler else None
+        self._run_token = CancellationToken(parent=self.cancel_token)
+        if self.timeout:
+            self._run_token.cancel_after(self.timeout)
         self.run_date = datetime.datetime.now()
         self.signaler.is_executing.emit()
+        EM.node_started(self)
 
         # --------------- Clear any previous logging
         self.fail_log = []
@@ -985,7 +1074,11 @@ class GeneralLogicNode:
         # --------------- Run
         if self.IS_CONTEXT:
             self.internal_scene.run_all_nodes(
-                spawn_thread=False
+                spawn_thread=False,
+                conserve_memory=self.conserve_memory,
+                profiler=self.profiler,
+                code_profiler=self.code_profiler,
+                cancel_token=self._run_token,
             )  # TODO maybe this can be improved? / recursive
             internal_failures = self.internal_scene.gather_failed_nodes_logs()
             if internal_failures:
@@ -998,13 +1091,24 @@ class GeneralLogicNode:
 
         else:
             try:
-                self.run()
+                with RM.reserve(self):
+                    if self.code_profiler:
+                        self.code_profiler.profile_run(self)
+                    else:
+                        self.run()
+            except CancelledError:
+                pass
             except Exception as e:
-                self.error(str(e))
-                LOGGER.exception(e)
-                self.signaler.finished.emit()
-                self.execution_time = time.time() - t1
-                return
+                if not self._run_token.is_cancelled:
+                    self.error(str(e))
+                    LOGGER.exception(e)
+                    self.stop_timer(t1, profile_record)
+                    self.signaler.finished.emit()
+                    return
+
+        # --------------- Cancelled or timed out during Run
+        if self._run_token.is_cancelled:
+            self.mark_cancelled(self._run_token.reason)
 
         # --------------- Result of Run
         if self.success == constants.FAILED:
@@ -1013,8 +1117,8 @@ class GeneralLogicNode:
                     self.full_name
                 )
             )
+            self.stop_timer(t1, profile_record)
             self.signaler.finished.emit()
-            self.execution_time = time.time() - t1
             return
 
         elif self.success == constants.ERROR:
@@ -1023,8 +1127,18 @@ class GeneralLogicNode:
                     self.full_name
                 )
             )
+            self.stop_timer(t1, profile_record)
+            self.signaler.finished.emit()
+            return
+
+        elif self.success == constants.TIMEOUT:
+            LOGGER.error(
+                "Execution of {} TIMED OUT, cannot keep executing from this node".format(
+                    self.full_name
+                )
+            )
+            self.stop_timer(t1, profile_record)
             self.signaler.finished.emit()
-            self.execution_time = time.time() - t1
             return
 
         # --------------- Check outputs were all set during Run
@@ -1034,38 +1148,202 @@ class GeneralLogicNode:
                 "cannot keep executing from this node".format(self.full_name)
             )
             self.fail("Not all output attributes are set")
-            self.execution_time = time.time() - t1
+            self.stop_timer(t1, profile_record)
+            self.signaler.finished.emit()
             return
 
         # --------------- Mark successful
         self.success = constants.SUCCESSFUL
         self.set_output(constants.COMPLETED, Run())
+        self.spill_oversized_outputs()
 
         # --------------- Stop timer and emit signal
-        self.execution_time = time.time() - t1
+        self.stop_timer(t1, profile_record)
         self.signaler.finished.emit()
-        if AS.get_state_var("stop_execution"):
+        if self.execution_stopped():
             return
 
         # --------------- Propagate results
         LOGGER.debug(
-            "From {}, propagating out attributes to connected nodes".format(
-                self.full_name
-            )
+            "From %s, propagating out attributes to connected nodes", self.full_name
         )
         self.propagate_results()
 
+        # --------------- Release values already consumed
+        if self.conserve_memory and not in_loop:
+            self.release_consumed_values()
+
         # --------------- Execute connected
         if execute_connected:
-            for node in self.out_connected_nodes():
-                if node.success not in [constants.FAILED, constants.ERROR]:
-                    LOGGER.info(
-                        "From {}, launching execution of {}".format(
-                            self.full_name, node.full_name
-                        )
+            for node in self.sort_by_priority(self.out_connected_nodes()):
+                if node.success not in [
+                    constants.FAILED,
+                    constants.ERROR,
+                    constants.TIMEOUT,
+                ]:
+                    LOGGER.debug(
+                        "From %s, launching execution of %s",
+                        self.full_name,
+                        node.full_name,
                     )
                     node._run()
 
+    def stop_timer(self, start_time: float, profile_record: dict = None):
+        """
+        Set the execution time of the node, report it to the metrics and analytics, release its cancellation token
+        and finish its profiling record if it is being profiled.
+
+        Args:
+            start_time (float): time.time() when the execution started
+            profile_record (dict, optional): record given by the profiler when the execution started
+        """
+        self.execution_time = time.time() - start_time
+        RM.record_duration(self.class_name, self.execution_time)
+        EM.node_finished(self)
+        for recorder in self.analytics_recorders:
+            recorder.node_finished(self)
+        if self._run_token is not None:
+            self._run_token.close()
+            self._run_token = None
+        if profile_record is not None:
+            self.profiler.node_finished(self, profile_record)
+
+    # SCHEDULING ----------------------
+    def get_resources(self) -> dict:
+        """
+        Get the resources this node holds while running. Can be reimplemented for resources that depend on the
+        inputs, such as a host to download from.
+
+        Returns:
+            dict: amount by name of resource
+        """
+        resources = dict(self.RESOURCES)
+        if self.CPU_SLOTS:
+            resources["cpu"] = self.CPU_SLOTS
+        if self.MEMORY_MB:
+            resources["memory_mb"] = self.MEMORY_MB
+        return resources
+
+    def set_priority(self, priority: int):
+        """
+        Args:
+            priority (int): higher priority nodes start first
+        """
+        self.priority = priority
+        self.mark_modified()
+
+    def get_priority_key(self) -> tuple:
+        return (self.priority, self.critical_path)
+
+    @staticmethod
+    def sort_by_priority(nodes) -> list:
+        """
+        Sort nodes in the order they should start: by priority, then by longest critical path.
+
+        Args:
+            nodes (iterable): nodes ready to run
+
+        Returns:
+            list: sorted nodes
+        """
+        return sorted(nodes, key=lambda node: node.get_priority_key(), reverse=True)
+
+    # CANCELLATION ----------------------
+    def set_timeout(self, seconds: float = None):
+        """
+        Set the time this node can run for before being cancelled.
+
+        Args:
+            seconds (float, optional): time limit. Defaults to None, no limit.
+        """
+        self.timeout = seconds
+        self.mark_modified()
+
+    def execution_stopped(self) -> bool:
+        """
+        Returns:
+            bool: True if execution was stopped from the GUI or the run of the scene was cancelled
+        """
+        if AS.get_state_var("stop_execution"):
+            return True
+        return self.cancel_token is not None and self.cancel_token.is_cancelled
+
+    def get_cancel_token(self) -> CancellationToken:
+        """
+        Returns:
+            CancellationToken: token of the current run of this node, or the one of the scene when not running
+        """
+        return self._run_token or self.cancel_token or CancellationToken()
+
+    def is_cancelled(self) -> bool:
+        return self.get_cancel_token().is_cancelled
+
+    def remaining_time(self):
+        """
+        Returns:
+            float: seconds left before this node times out, None if it has no time limit
+        """
+        return self.get_cancel_token().remaining_time()
+
+    def request_timeout(self) -> float:
+        """
+        Get the timeout to give to web requests made by this node, so they cannot hang past its time limit.
+
+        Returns:
+            float: seconds
+        """
+        remaining = self.remaining_time()
+        if remaining is None:
+            return constants.REQUEST_TIMEOUT
+        return max(0.01, min(remaining, constants.REQUEST_TIMEOUT))
+
+    def sleep(self, seconds: float):
+        """
+        Sleep, waking up as soon as the execution gets cancelled.
+
+        Args:
+            seconds (float): time to sleep for
+
+        Raises:
+            CancelledError: if the execution gets cancelled
+        """
+        token = self.get_cancel_token()
+        token.wait(seconds)
+        token.raise_if_cancelled()
+
+    def run_subprocess(
+        self, args: list, capture_output: bool = False, text: bool = False
+    ) -> subprocess.CompletedProcess:
+        """
+        Run a subprocess, killing it as soon as the execution gets cancelled.
+
+        Args:
+            args (list): command and its arguments
+            capture_output (bool, optional): Whether to capture stdout and stderr. Defaults to False.
+            text (bool, optional): Whether to decode the captured output as text. Defaults to False.
+
+        Raises:
+            CancelledError: if the execution gets cancelled
+
+        Returns:
+            subprocess.CompletedProcess: like subprocess.run would
+        """
+        token = self.get_cancel_token()
+        token.raise_if_cancelled()
+
+        pipe = subprocess.PIPE if capture_output else None
+        process = subprocess.Popen(args, stdout=pipe, stderr=pipe, text=text)
+        token.add_callback(process.kill)
+        try:
+            stdout, stderr = process.communicate()
+        finally:
+            token.remove_callback(process.kill)
+
+        if token.is_cancelled:
+            LOGGER.warning("Killed subprocess %s of %s", args[0], self.full_name)
+            token.raise_if_cancelled()
+        return subprocess.CompletedProcess(args, process.returncode, stdout, stderr)
+
     def run_single(self):
         """
         Run only this node.
@@ -1123,12 +1401,31 @@ class GeneralLogicNode:
             )
             self.error_log.append(message)
 
+    def mark_cancelled(self, reason: str):
+        """
+        Mark this node as timed out, or as errored if its execution was cancelled for another reason.
+
+        Args:
+            reason (str): reason of the cancellation, constants.TIMEOUT or constants.CANCELLED
+        """
+        if reason == constants.TIMEOUT:
+            self.success = constants.TIMEOUT
+            LOGGER.error(
+                "{} TIMED OUT. Cannot keep executing from this node".format(
+                    self.full_name
+                )
+            )
+            self.error_log.append("Execution timed out")
+        else:
+            self.error("Execution cancelled")
+
     def mark_skipped(self):
         """
         Mark this node as skipped.
         """
         self.success = constants.SKIPPED
         self.signaler.finished.emit()
+        EM.node_skipped(self)
 
     def propagate_results(self):
         """
@@ -1137,6 +1434,41 @@ class GeneralLogicNode:
         for attr in self.get_output_attrs():
             attr.propagate_value()
 
+    def spill_oversized_outputs(self):
+        """
+        Spill to disk the output values that are bigger than the threshold of the spill store (if enabled).
+        """
+        if not SPILL_STORE.enabled:
+            return
+
+        for attr in self.get_output_attrs():
+            if SPILL_STORE.needs_spilling(attr.value):
+                attr.value = SPILL_STORE.spill(attr.value)
+
+    def has_previews(self) -> bool:
+        return any(
+            internal.get("gui_type") in set(constants.PreviewsGUI)
+            for internal in self.INTERNALS_DICT.values()
+        )
+
+    def release_consumed_values(self):
+        """
+        Release the values this node received through its connections, now that it has consumed them.
+
+        The outputs these values came from are released too, once all the nodes connected to them have run
+        (unless declared as kept). Nodes with previews keep all their values, so they can be displayed.
+        """
+        if self.has_previews():
+            return
+
+        for attr in self.get_input_attrs():
+            if not attr.has_input_connected():
+                continue
+            source_attr = next(iter(attr.connected_attributes))
+            attr.clear()
+            if source_attr.is_consumed():
+                source_attr.clear()
+
     def reset(self):
         """
         Reset this node.
@@ -1179,6 +1511,7 @@ class GeneralLogicNode:
     def toggle_activated(self):
         """Toggle the activated state of the node."""
         self.active = not self.active
+        self.mark_modified()
         return self.active
 
     # SPECIAL METHODS ----------------------
@@ -1258,14 +1591,14 @@ class GeneralLogicNode:
         return run_body
 
 
-class LogicNodeSignaler(QtCore.QObject):
+class LogicNodeSignaler:
     """
     Defines the signals available from a logic node.
     """
 
-    status_changed = QtCore.Signal()
-    is_executing = QtCore.Signal()
-    finished = QtCore.Signal()
+    status_changed = Signal()
+    is_executing = Signal()
+    finished = Signal()
 
 
 # -------------------------------- ATTRIBUTE -------------------------------- #
@@ -1278,6 +1611,8 @@ class GeneralLogicAttribute:
         data_type,
         value=None,
         is_optional=False,
+        is_mutable=False,
+        keep_value=False,
     ):
         self.parent_node = parent_node
 
@@ -1286,6 +1621,11 @@ class GeneralLogicAttribute:
         self.data_type = data_type
         self.value = value
         self.is_optional = is_optional
+        self.is_mutable = (
+            is_mutable  # The node modifies the value of this input in place
+        )
+        self.owns_value = True  # False when the value is shared with other attributes
+        self.keep_value = keep_value  # Never released in memory-conserving mode
 
         self.connected_attributes = set()
 
@@ -1300,6 +1640,8 @@ class GeneralLogicAttribute:
 
     # GET AND SET ----------------------
     def get_value(self):
+        if isinstance(self.value, SpilledValue):
+            return self.value.load()  # Transparently reload values spilled to disk
         return self.value
 
     def is_empty(self) -> bool:
@@ -1311,15 +1653,21 @@ class GeneralLogicAttribute:
         """
         return self.value is None
 
-    def set_value(self, new_value):
+    def set_value(self, new_value, shared=False):
         """
         Set the value of the attribute to the given new value.
 
         Args:
             new_value (Any): The new value to set the object to.
+            shared (bool, optional): Whether the value is shared with other attributes (not copied). Defaults to False.
         """
         self.value = new_value
-        LOGGER.debug("Setting {} to new value {}".format(self.full_name, self.value))
+        self.owns_value = not shared
+        self.parent_node.mark_modified()
+        if LOGGER.isEnabledFor(logging.DEBUG):  # Hot path, skip even building the args
+            LOGGER.debug(
+                "Setting %s to new value %s", self.full_name, utils.LazyRepr(new_value)
+            )
 
     def clear(self):
         """
@@ -1328,6 +1676,8 @@ class GeneralLogicAttribute:
         This method sets the value of the attribute to None, effectively clearing its current value.
         """
         self.value = None
+        self.owns_value = True
+        self.parent_node.mark_modified()
 
     def propagate_clear_cache(self):
         self.parent_node.clear_cache()
@@ -1372,19 +1722,25 @@ class GeneralLogicAttribute:
         """
         return len(self.connected_attributes) > 0
 
-    def connect_to_other(self, other_attribute: GeneralLogicAttribute) -> tuple:
+    def connect_to_other(
+        self, other_attribute: GeneralLogicAttribute, check_cycles: bool = True
+    ) -> tuple:
         """
         Connect this attribute to another.
 
         Args:
             other_attribute (GeneralLogicAttribute)
+            check_cycles (bool, optional): whether to look for cycles before connecting. Can be
+                skipped when connecting many attributes at once and checking the whole graph later.
 
         Returns:
             tuple(bool, str): whether or not the connection could be done, log of the reason
         """
         # Checks -------------------------
         # Cycles check
-        if self.connector_type == constants.INPUT:
+        if not check_cycles:
+            pass
+        elif self.connector_type == constants.INPUT:
             if other_attribute.parent_node.check_cycles(self.parent_node):
                 connection_warning = "Cannot connect, cycle detected!"
                 LOGGER.warning(connection_warning)
@@ -1452,7 +1808,7 @@ class GeneralLogicAttribute:
         connection_log = "Connected {} {} {}".format(
             self.dot_name, connection_direction, other_attribute.dot_name
         )
-        LOGGER.info(connection_log)
+        LOGGER.debug(connection_log)
 
         return (True, connection_log)
 
@@ -1466,12 +1822,12 @@ class GeneralLogicAttribute:
         self.connected_attributes.remove(other_attribute)
         other_attribute.connected_attributes.remove(self)
         if self.connector_type == constants.OUTPUT:
-            LOGGER.info(
-                "Disconnected {} -/- {}".format(self.dot_name, other_attribute.dot_name)
+            LOGGER.debug(
+                "Disconnected %s -/- %s", self.dot_name, other_attribute.dot_name
             )
         else:
-            LOGGER.info(
-                "Disconnected {} -/- {}".format(other_attribute.dot_name, self.dot_name)
+            LOGGER.debug(
+                "Disconnected %s -/- %s", other_attribute.dot_name, self.dot_name
             )
 
     def disconnect_input(self):
@@ -1491,12 +1847,41 @@ class GeneralLogicAttribute:
         """
         return utils.parse_datatype(str(self.data_type))
 
+    def is_consumed(self) -> bool:
+        """
+        Check if this output can be released: all the nodes connected to it have already run successfully.
+
+        Returns:
+            bool
+        """
+        if (
+            self.keep_value
+            or self.connector_type != constants.OUTPUT
+            or not self.connected_attributes
+            or self.parent_node.has_previews()
+        ):
+            return False
+
+        return all(
+            attr.parent_node.success == constants.SUCCESSFUL
+            for attr in self.connected_attributes
+        )
+
+    def take_ownership(self):
+        """
+        Replace a shared value with a copy of it, so it can be modified without affecting other attributes.
+        """
+        self.value = utils.copy_value(self.get_value())
+        self.owns_value = True
+
     def propagate_value(self):
         """
         Propagate the value of this attribute to all its connected attributes.
+
+        The value is shared, not copied. Connected inputs declared as mutable will copy it when read.
         """
         for connected_attr in self.connected_attributes:
-            connected_attr.set_value(self.value)
+            connected_attr.set_value(self.value, shared=True)
 
     # SPECIAL METHODS ----------------------
     def __str__(self):
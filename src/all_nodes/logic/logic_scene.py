@@ -12,21 +12,36 @@ import getpass
 import os
 import yaml
 
-from PySide2 import QtCore
-
 from all_nodes import constants
 from all_nodes import utils
-from all_nodes.analytics import analytics
+from all_nodes.analytics.local_store import LOCAL_ANALYTICS
+from all_nodes.analytics.records import AnalyticsRecorder
+from all_nodes.analytics.spool import ANALYTICS_SPOOL
 from all_nodes.logic.global_signaler import GLOBAL_SIGNALER as GS
 
 from all_nodes.logic import class_registry
 from all_nodes.logic.app_state import APP_STATE as AS
+from all_nodes.logic.cancellation import CancellationToken
 from all_nodes.logic.class_registry import CLASS_REGISTRY as CR
 from all_nodes.logic.logic_node import GeneralLogicNode
+from all_nodes.logic.metrics import ENGINE_METRICS as EM
+from all_nodes.logic.resources import RESOURCE_MANAGER as RM
+from all_nodes.logic.signals import Signal
+from all_nodes.logic.thread_pool import THREAD_POOL
 
 
 LOGGER = utils.get_logger(__name__)
 
+YAML_DUMPER = getattr(yaml, "CDumper", yaml.Dumper)  # Same output, much faster
+
+
+def clear_stop_execution():
+    AS.remove_state_var("stop_execution")
+
+
+# Connected once for all the scenes, as they are created per request when serving
+GS.signals.execution_finished.connect(clear_stop_execution)
+
 
 # -------------------------------- LOGIC SCENE -------------------------------- #
 class LogicScene:
@@ -40,11 +55,17 @@ class LogicScene:
 
         self.pasted_count = 0
 
-        self.thread_manager = QtCore.QThreadPool.globalInstance()
+        self.dumped_nodes = (
+            dict()
+        )  # uuid -> (revision, yaml text), for incremental saves
 
-        GS.signals.execution_finished.connect(
-            lambda: AS.remove_state_var("stop_execution")
-        )
+        self.thread_manager = THREAD_POOL
+
+        self.conserve_memory = False  # Release values as soon as they are consumed
+        self.profiler = None  # ExecutionProfiler to record the runs with, if any
+        self.code_profiler = None  # CodeProfiler to wrap the run() calls with, if any
+        self.timeout = None  # Seconds a whole run can take, None for no limit
+        self.cancel_token = None  # CancellationToken of the current run
 
         LOGGER.debug("Initialized logic scene")
 
@@ -106,6 +127,19 @@ class LogicScene:
                 return
         raise RuntimeError("No node matches name" + node_fullname)
 
+    def remove_nodes(self, nodes):
+        """
+        Remove nodes from the logic scene, disconnecting them from any other node.
+
+        Args:
+            nodes (iterable): logic nodes to remove
+        """
+        for node in nodes:
+            for attr in node.all_attributes:
+                for other_attr in list(attr.connected_attributes):
+                    attr.disconnect_from_other(other_attr)
+            self.all_logic_nodes.discard(node)
+
     # NODE RETRIEVAL ----------------------
     def all_nodes(self):
         return self.all_logic_nodes
@@ -176,13 +210,57 @@ class LogicScene:
         for node in self.all_logic_nodes:
             node.set_context(self.context)
 
-    def connect_attrs_by_name(self, source_attr_name: str, target_attr_name: str):
+    def set_nodes_timeout(self, seconds: float):
+        """
+        Give a time limit to every node that does not have its own, including the nodes inside contexts,
+        at any depth. Context nodes are left without one, as they run for as long as their nodes do.
+
+        Args:
+            seconds (float): time limit of each node
+        """
+        for node in self.all_logic_nodes:
+            if node.IS_CONTEXT:
+                if node.internal_scene is not None:
+                    node.internal_scene.set_nodes_timeout(seconds)
+            elif node.timeout is None:
+                node.timeout = seconds
+
+    def get_attrs_by_dot_name(self, nodes=None) -> dict:
+        """
+        Build an index of attributes by their dot name, to resolve many connections at once.
+
+        Args:
+            nodes (iterable, optional): nodes to index. Defaults to all nodes of the scene.
+
+        Returns:
+            dict: dot name -> GeneralLogicAttribute
+        """
+        if nodes is None:
+            nodes = self.all_logic_nodes
+
+        attrs_index = dict()
+        for node in nodes:
+            for attr in node.all_attributes:
+                attrs_index[attr.dot_name] = attr
+
+        return attrs_index
+
+    def connect_attrs_by_name(
+        self,
+        source_attr_name: str,
+        target_attr_name: str,
+        attrs_index: dict = None,
+        check_cycles: bool = True,
+    ):
         """
         Connect two attributes in the logic scene by their names.
 
         Args:
             source_attr_name (str): The dot-separated name of the source attribute.
             target_attr_name (str): The dot-separated name of the target attribute.
+            attrs_index (dict, optional): Index as given by get_attrs_by_dot_name, to avoid
+                re-scanning the scene when connecting many attributes. Defaults to None.
+            check_cycles (bool, optional): Whether to look for cycles before connecting. Defaults to True.
 
         Raises:
             LogicSceneError: If any of the following conditions are met:
@@ -191,18 +269,16 @@ class LogicScene:
                 - The source attribute does not exist.
                 - The target attribute does not exist.
         """
-        source_attr, target_attr = None, None
-        for node in self.all_logic_nodes:
-            for attr in node.all_attributes:
-                if attr.dot_name == source_attr_name:
-                    source_attr = attr
-                    break
-                elif attr.dot_name == target_attr_name:
-                    target_attr = attr
-                    break
-            if source_attr and target_attr:
-                source_attr.connect_to_other(target_attr)  # TODO check for result
-                return
+        if attrs_index is None:
+            attrs_index = self.get_attrs_by_dot_name()
+
+        source_attr = attrs_index.get(source_attr_name)
+        target_attr = attrs_index.get(target_attr_name)
+        if source_attr and target_attr:
+            source_attr.connect_to_other(
+                target_attr, check_cycles=check_cycles
+            )  # TODO check for result
+            return
 
         # Errors
         source_node_name = source_attr_name.rsplit(".", 1)[0]
@@ -242,15 +318,11 @@ class LogicScene:
         """
         scene_dict = dict()
 
-        all_node_names = sorted([n.node_name for n in self.all_logic_nodes])
-        if all_node_names:
-            scene_dict["nodes"] = list()
-            for name in all_node_names:
-                for node in self.all_logic_nodes:
-                    if node.node_name == name:
-                        node_dict = node.get_node_basic_dict()
-                        scene_dict["nodes"].append(node_dict)
-                        break
+        if self.all_logic_nodes:
+            scene_dict["nodes"] = [
+                node.get_node_basic_dict()
+                for node in sorted(self.all_logic_nodes, key=lambda n: n.node_name)
+            ]
 
         connections = set()
         for node in self.all_logic_nodes:
@@ -263,13 +335,52 @@ class LogicScene:
 
         return scene_dict
 
-    def save_to_file(self, filepath: str, scene_dict: dict = None) -> None:
+    def dump_nodes_section(self, nodes_list: list, incremental: bool = False) -> str:
+        """
+        Get the yaml text of the nodes section of a scene.
+
+        Every node is dumped on its own, and the text kept along with the revision of the node,
+        so on incremental saves only the nodes that changed since the last save are re-serialized.
+
+        Args:
+            nodes_list (list): node dicts, as given by convert_scene_to_dict
+            incremental (bool, optional): reuse the text of unchanged nodes. Defaults to False.
+
+        Returns:
+            str: yaml text of the nodes list
+        """
+        nodes_by_name = {n.node_name: n for n in self.all_logic_nodes}
+
+        dumped_nodes = dict()
+        nodes_text = []
+        for node_dict in nodes_list:
+            node = nodes_by_name.get(next(iter(node_dict)))
+            cached = self.dumped_nodes.get(node.uuid) if node else None
+            if incremental and cached and cached[0] == node.revision:
+                node_text = cached[1]
+            else:
+                node_text = yaml.dump([node_dict], Dumper=YAML_DUMPER, sort_keys=True)
+            if node:
+                dumped_nodes[node.uuid] = (node.revision, node_text)
+            nodes_text.append(node_text)
+
+        self.dumped_nodes = dumped_nodes  # Forget about nodes no longer in the scene
+        return "".join(nodes_text)
+
+    def save_to_file(
+        self, filepath: str, scene_dict: dict = None, incremental: bool = False
+    ) -> None:
         """
-        Save the scene out
+        Save the scene out.
+
+        The file is written to a temporary file first and then moved over the target filepath,
+        so an interrupted save never leaves a corrupted scene behind.
 
         Args:
             filepath (str): filepath to save to
             scene_dict (dict, optional): scene info to write out. Defaults to None.
+            incremental (bool, optional): only re-serialize the nodes that changed since the
+                last save (for autosaves). Defaults to False.
         """
         # Get scene data
         if scene_dict is None:
@@ -286,7 +397,7 @@ class LogicScene:
             save_type = "modified"
 
         # Actual save
-        with open(filepath, "w") as file:
+        with utils.atomic_write(filepath) as file:
             header = "# {} {}".format(
                 file_type.upper(), os.path.splitext(os.path.basename(filepath))[0]
             )
@@ -298,21 +409,23 @@ class LogicScene:
                 file.write(
                     "\n# Nodes section: overall list of nodes to be created\nnodes:\n"
                 )
-                yaml.dump(scene_dict["nodes"], file, sort_keys=True)
+                file.write(self.dump_nodes_section(scene_dict["nodes"], incremental))
 
             if "connections" in scene_dict:
                 file.write(
                     "\n# Connections section: connections to be done between nodes\n"
                     "connections:\n"
                 )
-                yaml.dump(scene_dict["connections"], file)
+                yaml.dump(scene_dict["connections"], file, Dumper=YAML_DUMPER)
 
             if "annotations" in scene_dict:
                 file.write(
                     "\n# Annotations section: list of annotations in the scene\n"
                     "annotations:\n"
                 )
-                yaml.dump(scene_dict["annotations"], file, sort_keys=True)
+                yaml.dump(
+                    scene_dict["annotations"], file, Dumper=YAML_DUMPER, sort_keys=True
+                )
 
             file.write(
                 f"\n\n# {file_type.capitalize()} {save_type} at: {datetime.datetime.now()}"
@@ -321,17 +434,103 @@ class LogicScene:
 
         LOGGER.info("Wrote scene to file: {}".format(filepath))
 
-    def load_from_file(self, scene_path: str, namespace: str = None) -> list:
+    @staticmethod
+    def read_scene_file(scene_path: str) -> dict:
+        """
+        Parse a scene file, using the C-accelerated yaml loader when available.
+
+        Args:
+            scene_path (str): scene filepath
+
+        Returns:
+            dict: contents of the scene file
+        """
+        with open(scene_path, "r") as file:
+            return yaml.load(file, Loader=getattr(yaml, "CSafeLoader", yaml.SafeLoader))
+
+    def resolve_scene_path(self, scene_path: str) -> str:
+        """
+        Get the filepath of a scene, which can be given as filepath or as alias.
+
+        Args:
+            scene_path (str): scene filepath or alias
+
+        Raises:
+            LogicSceneError: if no scene can be found for the alias
+
+        Returns:
+            str: filepath of the scene
+        """
+        if os.path.isfile(scene_path):
+            return scene_path
+
+        LOGGER.info(
+            "Cannot find scene with path '{}', trying to find it as alias".format(
+                scene_path
+            )
+        )
+        all_scenes = CR.get_all_scenes()  # TODO move this into the class
+        found_scene_path = class_registry.get_scene_from_alias(all_scenes, scene_path)
+        if not found_scene_path:
+            raise LogicSceneError("Cannot find scene for alias '{}'".format(scene_path))
+
+        return found_scene_path
+
+    def load_from_file(
+        self,
+        scene_path: str,
+        namespace: str = None,
+        chunk_size: int = constants.LOADING_CHUNK_SIZE,
+        progress_callback=None,
+    ) -> list:
         """
         Load scene from a given file
 
         Args:
             scene_path (str): scene filepath or alias to load
             namespace (str, optional): namespace to apply to the created nodes while loading scene. Defaults to None.
+            chunk_size (int, optional): amount of nodes/connections created between progress reports.
+            progress_callback (callable, optional): called as progress_callback(stage, done, total)
+                after each chunk. Defaults to None.
 
         Raises:
             LogicSceneError: if the scene requested doesnt exist, or is malformed
 
+        Returns:
+            list: of newly created nodes
+        """
+        loader = self.iter_load_from_file(scene_path, namespace, chunk_size)
+        while True:
+            try:
+                progress = next(loader)
+            except StopIteration as stop:
+                return stop.value
+            if progress_callback:
+                progress_callback(*progress)
+
+    def iter_load_from_file(
+        self,
+        scene_path: str,
+        namespace: str = None,
+        chunk_size: int = constants.LOADING_CHUNK_SIZE,
+        scene_dict: dict = None,
+    ):
+        """
+        Load scene from a given file in stages, yielding after each chunk of work so the caller
+        can report progress or give control back to an event loop.
+
+        Args:
+            scene_path (str): scene filepath or alias to load
+            namespace (str, optional): namespace to apply to the created nodes while loading scene. Defaults to None.
+            chunk_size (int, optional): amount of nodes/connections created between yields.
+            scene_dict (dict, optional): already parsed contents of the scene file. Defaults to None.
+
+        Raises:
+            LogicSceneError: if the scene requested doesnt exist, or is malformed
+
+        Yields:
+            tuple(str, int, int): stage being loaded, amount of elements done, total of elements
+
         Returns:
             list: of newly created nodes
         """
@@ -348,51 +547,40 @@ class LogicScene:
             LOGGER.debug("Using namespace: {}".format(namespace))
 
         # Alias
-        all_scenes = CR.get_all_scenes()  # TODO move this into the class
-        if not os.path.isfile(scene_path):
-            LOGGER.info(
-                "Cannot find scene with path '{}', trying to find it as alias".format(
-                    scene_path
-                )
-            )
-            found_scene_path = class_registry.get_scene_from_alias(
-                all_scenes, scene_path
-            )
-            if not found_scene_path:
-                raise LogicSceneError(
-                    "Cannot find scene for alias '{}'".format(scene_path)
-                )
-            else:
-                scene_path = found_scene_path
+        scene_path = self.resolve_scene_path(scene_path)
 
         # Filepath
         if self.context:
             utils.print_separator("Loading context " + scene_path)
         else:
             utils.print_separator("Loading scene " + scene_path)
-        scene_dict = dict()
-        with open(scene_path, "r") as file:
-            scene_dict = yaml.safe_load(file)
+        if scene_dict is None:
+            scene_dict = self.read_scene_file(scene_path)
 
         if not scene_dict:
             return  # TODO raise error
 
         # Create nodes
+        nodes_to_create = scene_dict.get("nodes", [])
+        taken_names = {n.node_name for n in self.all_logic_nodes}
         new_nodes = []
-        for node in scene_dict.get("nodes", []):
+        for i, node in enumerate(nodes_to_create, 1):
             node_name = next(iter(node))
             n = self.add_node_by_name(node[node_name]["class_name"], False)
             new_nodes.append(n)
             if namespace:
-                if not self.rename_node_with_namespace(n, namespace + node_name):
+                if namespace + node_name in taken_names:
                     raise LogicSceneError(
-                        "Node cannot be renamed to: {}".format(namespace + node_name)
+                        "Node {} already exists!".format(namespace + node_name)
                     )
+                n.force_rename(namespace + node_name)
             else:
-                if not self.rename_node(n, node_name):
+                if node_name in taken_names or not n.rename(node_name):
                     raise LogicSceneError(
                         "Node cannot be renamed to: {}".format(namespace + node_name)
                     )
+            taken_names.add(n.node_name)
+
             attrs_to_set = node[node_name].get("node_attributes")
             if attrs_to_set:
                 for attr in attrs_to_set:
@@ -402,17 +590,72 @@ class LogicScene:
             if not active:
                 n.toggle_activated()
 
-        # Create connections
-        for connection in scene_dict.get("connections", []):
+            if "timeout" in node[node_name]:
+                n.timeout = node[node_name]["timeout"]
+            if "priority" in node[node_name]:
+                n.priority = node[node_name]["priority"]
+
+            if i % chunk_size == 0 or i == len(nodes_to_create):
+                yield ("nodes", i, len(nodes_to_create))
+
+        # Create connections, resolved through an index of the attributes and checking
+        # for cycles only once all of them are done
+        connections = scene_dict.get("connections", [])
+        attrs_index = self.get_attrs_by_dot_name(new_nodes)
+        for i, connection in enumerate(connections, 1):
             attrs_to_connect = connection.split("->")
             source_attr_name, target_attr_name = (
                 namespace + attrs_to_connect[0].strip(),
                 namespace + attrs_to_connect[1].strip(),
             )
-            self.connect_attrs_by_name(source_attr_name, target_attr_name)
+            self.connect_attrs_by_name(
+                source_attr_name, target_attr_name, attrs_index, check_cycles=False
+            )
+
+            if i % chunk_size == 0 or i == len(connections):
+                yield ("connections", i, len(connections))
+
+        cycle_nodes = self.find_nodes_in_cycles(new_nodes)
+        if cycle_nodes:
+            self.remove_nodes(new_nodes)
+            raise LogicSceneError(
+                "Cannot load scene {}, cycle detected between nodes: {}".format(
+                    scene_path, sorted(n.node_name for n in cycle_nodes)
+                )
+            )
 
         return new_nodes
 
+    @staticmethod
+    def find_nodes_in_cycles(nodes) -> list:
+        """
+        Find the nodes that are part of (or downstream of) a cycle, by peeling off the
+        nodes with no incoming connections until nothing else can be removed.
+
+        Args:
+            nodes (iterable): nodes to examine
+
+        Returns:
+            list: nodes that could not be sorted topologically, empty if there are no cycles
+        """
+        nodes = set(nodes)
+        in_count = {n: 0 for n in nodes}
+        for n in nodes:
+            for out_node in n.out_connected_nodes():
+                if out_node in in_count:
+                    in_count[out_node] += 1
+
+        to_visit = [n for n in nodes if in_count[n] == 0]
+        while to_visit:
+            n = to_visit.pop()
+            for out_node in n.out_connected_nodes():
+                if out_node in in_count:
+                    in_count[out_node] -= 1
+                    if in_count[out_node] == 0:
+                        to_visit.append(out_node)
+
+        return [n for n in nodes if in_count[n] > 0]
+
     # SCENE PROPERTIES ----------------------
     def set_name(self, new_name: str):
         """
@@ -453,24 +696,64 @@ class LogicScene:
             node.soft_reset()
 
     # EXECUTION ----------------------
-    def run_all_nodes(self, spawn_thread=True):
+    def run_all_nodes(
+        self,
+        spawn_thread=True,
+        conserve_memory=None,
+        profiler=None,
+        code_profiler=None,
+        timeout=None,
+        cancel_token=None,
+    ):
         """
         Run all nodes in the scene.
 
         Parameters:
             spawn_thread (bool, optional): Whether to spawn a new thread to run the nodes in . Defaults to True.
+            conserve_memory (bool, optional): Whether to release values as soon as all the nodes using them have run.
+                Defaults to None, which uses the conserve_memory setting of the scene.
+            profiler (ExecutionProfiler, optional): Profiler to record every node run with.
+                Defaults to None, which uses the profiler of the scene.
+            code_profiler (CodeProfiler, optional): Profiler to wrap the run() of nodes with.
+                Defaults to None, which uses the code profiler of the scene.
+            timeout (float, optional): Seconds the whole run can take, nodes still running then are marked as
+                TIMEOUT and the rest are not run. Defaults to None, which uses the timeout of the scene.
+            cancel_token (CancellationToken, optional): Token to cancel the run with.
+                Defaults to None, which creates a new one.
         """
         if spawn_thread:
-            worker = Worker(self._run_all_nodes)
-            worker.signaler.finished.connect(self.submit_stats_in_thread)
+            # The analytics recorder is closed in the worker thread too, as soon as the run ends
+            worker = Worker(
+                self.run_all_nodes_batch,
+                conserve_memory,
+                profiler,
+                code_profiler,
+                timeout,
+                cancel_token,
+            )
             self.thread_manager.start(worker)
         else:
-            self._run_all_nodes()
+            self._run_all_nodes(
+                conserve_memory, profiler, code_profiler, timeout, cancel_token
+            )
 
-    def run_all_nodes_batch(self):
-        """For non-GUI, we cannot spawn threads"""
-        # TODO investigate a better way
-        self._run_all_nodes()
+    def run_all_nodes_batch(
+        self,
+        conserve_memory=None,
+        profiler=None,
+        code_profiler=None,
+        timeout=None,
+        cancel_token=None,
+    ):
+        """Run all nodes in the calling thread, as done in non-GUI mode"""
+        recorder = self.start_analytics_recorder()
+        try:
+            self._run_all_nodes(
+                conserve_memory, profiler, code_profiler, timeout, cancel_token
+            )
+        finally:
+            if recorder is not None:
+                recorder.close()
 
     def run_list_of_nodes(self, nodes_to_execute: list, spawn_thread: bool = True):
         """
@@ -486,10 +769,48 @@ class LogicScene:
         else:
             self._run_list_of_nodes(nodes_to_execute)
 
-    def _run_all_nodes(self):
+    def _run_all_nodes(
+        self,
+        conserve_memory=None,
+        profiler=None,
+        code_profiler=None,
+        timeout=None,
+        cancel_token=None,
+    ):
         """
         Execute all the nodes in this logic scene.
-        """
+
+        Parameters:
+            conserve_memory (bool, optional): Whether to release values as soon as all the nodes using them have run.
+                Defaults to None, which uses the conserve_memory setting of the scene.
+            profiler (ExecutionProfiler, optional): Profiler to record every node run with.
+                Defaults to None, which uses the profiler of the scene.
+            code_profiler (CodeProfiler, optional): Profiler to wrap the run() of nodes with.
+                Defaults to None, which uses the code profiler of the scene.
+            timeout (float, optional): Seconds the whole run can take, nodes still running then are marked as
+                TIMEOUT and the rest are not run. Defaults to None, which uses the timeout of the scene.
+            cancel_token (CancellationToken, optional): Token to cancel the run with.
+                Defaults to None, which creates a new one.
+        """
+        if conserve_memory is None:
+            conserve_memory = self.conserve_memory
+        if profiler is None:
+            profiler = self.profiler
+        if code_profiler is None:
+            code_profiler = self.code_profiler
+        if timeout is None:
+            timeout = self.timeout
+        if cancel_token is None or timeout:
+            cancel_token = CancellationToken(parent=cancel_token)
+        if timeout:
+            cancel_token.cancel_after(timeout)
+        self.cancel_token = cancel_token
+        for node in self.all_logic_nodes:
+            node.conserve_memory = conserve_memory
+            node.profiler = profiler
+            node.code_profiler = code_profiler
+            node.cancel_token = cancel_token
+
         # Feedback
         if self.scene_name:
             utils.print_separator("Running {}".format(self.scene_name))
@@ -497,8 +818,30 @@ class LogicScene:
             utils.print_separator("Running logic scene")
 
         # Execution
-        for node in self.get_starting_nodes():
-            node._run()
+        self.compute_critical_paths()
+        starting_nodes = GeneralLogicNode.sort_by_priority(self.get_starting_nodes())
+        profiling = profiler is not None and not self.context
+        if profiling:
+            profiler.start()
+        if profiler is not None:
+            for node in starting_nodes:
+                profiler.mark_ready(node)
+        EM.scene_started(self)
+        try:
+            for node in starting_nodes:
+                node._run()
+        finally:
+            EM.scene_finished(self)
+            if timeout:
+                cancel_token.close()
+            # The token is of this run only, nodes run later on their own must not stay cancelled
+            self.cancel_token = None
+            for node in self.all_logic_nodes:
+                node.cancel_token = None
+            if profiling:
+                profiler.stop()
+            if code_profiler is not None and not self.context:
+                code_profiler.write_results()
         LOGGER.info("Finished running logic scene")
 
         # Mark nodes that were skipped
@@ -516,6 +859,41 @@ class LogicScene:
         for node in nodes_to_execute:
             node.run_single()
 
+    def compute_critical_paths(self):
+        """
+        Set on every node the time expected from its start to the end of the scene, following its longest chain of
+        connected nodes and using how long nodes of each class have been taking.
+        """
+        out_nodes = {node: node.out_connected_nodes() for node in self.all_logic_nodes}
+
+        # Order the nodes so each of them comes before the ones connected to its outputs
+        in_degrees = dict.fromkeys(out_nodes, 0)
+        for connected_nodes in out_nodes.values():
+            for node in connected_nodes:
+                if node in in_degrees:
+                    in_degrees[node] += 1
+        ordered_nodes = [node for node, degree in in_degrees.items() if degree == 0]
+        for node in ordered_nodes:
+            for connected_node in out_nodes[node]:
+                if connected_node in in_degrees:
+                    in_degrees[connected_node] -= 1
+                    if in_degrees[connected_node] == 0:
+                        ordered_nodes.append(connected_node)
+
+        for node in reversed(ordered_nodes):
+            node.critical_path = RM.expected_duration(node.class_name) + max(
+                (n.critical_path for n in out_nodes[node] if n in in_degrees),
+                default=0.0,
+            )
+
+    def cancel(self):
+        """
+        Cancel the current run of the scene: the nodes running are interrupted and no more nodes are started.
+        """
+        if self.cancel_token is not None:
+            LOGGER.warning("Cancelling run of %s", self.scene_name or "logic scene")
+            self.cancel_token.cancel()
+
     # FEEDBACK GATHERING AND SUBMITTING----------------------
     # TODO make these properly recursive, mark contexts appropriately
     def gather_failed_nodes_logs(self) -> list:
@@ -527,7 +905,7 @@ class LogicScene:
         """
         failed_log = []
         for node in self.all_logic_nodes:
-            if node.success in [constants.FAILED, constants.ERROR]:
+            if node.success in [constants.FAILED, constants.ERROR, constants.TIMEOUT]:
                 for line in node.fail_log:
                     failed_log.append(node.full_name + ": " + line)
         return failed_log
@@ -541,29 +919,30 @@ class LogicScene:
         """
         errored_log = []
         for node in self.all_logic_nodes:
-            if node.success in [constants.FAILED, constants.ERROR]:
+            if node.success in [constants.FAILED, constants.ERROR, constants.TIMEOUT]:
                 for line in node.error_log:
                     errored_log.append(node.full_name + ": " + line)
         return errored_log
 
-    def submit_stats_in_thread(self):
-        if self.context:
-            return
+    def start_analytics_recorder(self):
+        """
+        Start submitting the analytics of the nodes of this scene, and of the contexts in it, as they finish.
 
-        LOGGER.info("Gathering analytics")
-        node_properties_list = []
-        for node in self.all_logic_nodes:
-            node_properties_list.append(node.get_node_full_dict())
-            if node.IS_CONTEXT:
-                for i_node in (
-                    node.internal_scene.all_logic_nodes
-                ):  # TODO make this properly recursive
-                    node_properties_list.append(i_node.get_node_full_dict())
+        Returns:
+            AnalyticsRecorder: recorder to close once the run finishes, None if analytics are not submitted
+        """
+        sinks = [sink for sink in [ANALYTICS_SPOOL, LOCAL_ANALYTICS] if sink.enabled]
+        if self.context or not sinks:
+            return None
 
-        worker = Worker(
-            analytics.submit_bulk_analytics, node_properties_list, no_signals=True
-        )
-        self.thread_manager.start(worker)
+        def submit(records):
+            for sink in sinks:
+                sink.submit(records)
+
+        # Not flushed after each run, the local store writes its records in the background
+        recorder = AnalyticsRecorder(submit)
+        recorder.attach(self)
+        return recorder
 
 
 # -------------------------------- UTILITY -------------------------------- #
@@ -572,13 +951,12 @@ class LogicSceneError(Exception):
 
 
 # -------------------------------- WORKER -------------------------------- #
-class WorkerSignals(QtCore.QObject):
-    finished = QtCore.Signal()
+class WorkerSignals:
+    finished = Signal()
 
 
-class Worker(QtCore.QRunnable):
+class Worker:
     def __init__(self, fn, *args, **kwargs):
-        super(Worker, self).__init__()
         self.no_signals = kwargs.pop("no_signals", False)
         self.fn = fn
         self.args = args
@@ -0,0 +1,323 @@
+# -*- coding: UTF-8 -*-
+__author__ = "Jaime Rivera <jaime.rvq@gmail.com>"
+__copyright__ = "Copyright 2022, Jaime Rivera"
+__credits__ = []
+__license__ = "MIT License"
+
+
+import bisect
+import collections
+import http.server
+import json
+import threading
+import time
+import weakref
+
+from all_nodes import constants
+from all_nodes import utils
+from all_nodes.logic.resources import RESOURCE_MANAGER as RM
+
+
+LOGGER = utils.get_logger(__name__)
+
+# Upper bounds of the node duration histogram buckets, in seconds
+LATENCY_BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300]
+THROUGHPUT_WINDOW = 60  # Seconds the throughput is averaged over
+
+
+# -------------------------------- METRICS -------------------------------- #
+class EngineMetrics:
+    """
+    Live counters of the execution of all the scenes running in the process, cheap enough to be always on.
+
+    Nodes report to it from the same places they emit their is_executing and finished signals. A snapshot can be
+    taken at any time, as a dict or in Prometheus text format, and served over HTTP with a MetricsServer.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._running_scenes = weakref.WeakSet()
+        self._collectors = {}
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.start_time = time.time()
+            self.running = 0
+            self.finished = collections.Counter()
+            self.latencies = {}
+            self.cache_requests = {}
+            self._finish_times = collections.deque()
+
+    # SCENES ----------------------
+    def scene_started(self, scene):
+        with self._lock:
+            self._running_scenes.add(scene)
+
+    def scene_finished(self, scene):
+        with self._lock:
+            self._running_scenes.discard(scene)
+
+    # NODES ----------------------
+    def node_started(self, node):
+        with self._lock:
+            self.running += 1
+
+    def node_finished(self, node):
+        """
+        Args:
+            node (GeneralLogicNode): node that has just run, with its status and execution time set
+        """
+        now = time.time()
+        with self._lock:
+            self.running -= 1
+            self.finished[node.success] += 1
+
+            latency = self.latencies.get(node.class_name)
+            if latency is None:
+                latency = self.latencies[node.class_name] = {
+                    "buckets": [0] * (len(LATENCY_BUCKETS) + 1),
+                    "sum": 0.0,
+                    "count": 0,
+                }
+            latency["buckets"][
+                bisect.bisect_left(LATENCY_BUCKETS, node.execution_time)
+            ] += 1
+            latency["sum"] += node.execution_time
+            latency["count"] += 1
+
+            self._finish_times.append(now)
+            self._trim_finish_times(now)
+
+    def node_skipped(self, node):
+        with self._lock:
+            self.finished[constants.SKIPPED] += 1
+
+    def _trim_finish_times(self, now: float):
+        while self._finish_times and self._finish_times[0] < now - THROUGHPUT_WINDOW:
+            self._finish_times.popleft()
+
+    # CACHES ----------------------
+    def cache_request(self, cache_name: str, hit: bool):
+        """
+        Args:
+            cache_name (str): such as "scene_templates"
+            hit (bool): whether the value was found in the cache
+        """
+        with self._lock:
+            requests = self.cache_requests.setdefault(cache_name, [0, 0])
+            requests[0 if hit else 1] += 1
+
+    # COLLECTORS ----------------------
+    def add_collector(self, name: str, collector):
+        """
+        Include more metrics in the snapshots, such as the ones of the GUI.
+
+        Args:
+            name (str): key of the metrics in the snapshot, and prefix of their names in Prometheus format
+            collector (callable): returns a dict of numbers
+        """
+        self._collectors[name] = collector
+
+    # SNAPSHOTS ----------------------
+    def get_snapshot(self) -> dict:
+        """
+        Returns:
+            dict: current value of all the metrics
+        """
+        now = time.time()
+        with self._lock:
+            self._trim_finish_times(now)
+            window = min(THROUGHPUT_WINDOW, max(now - self.start_time, 1e-6))
+            queued = sum(
+                node.success in [constants.NOT_RUN, constants.IN_LOOP]
+                for scene in list(self._running_scenes)
+                for node in scene.all_logic_nodes
+            )
+            snapshot = {
+                "uptime": now - self.start_time,
+                "running_scenes": len(self._running_scenes),
+                "nodes_running": self.running,
+                "nodes_finished": dict(self.finished),
+                "queue_depth": queued,
+                "throughput": len(self._finish_times) / window,
+                "latencies": {
+                    class_name: {
+                        "buckets": list(latency["buckets"]),
+                        "sum": latency["sum"],
+                        "count": latency["count"],
+                    }
+                    for class_name, latency in self.latencies.items()
+                },
+                "caches": {
+                    cache_name: {
+                        "hits": hits,
+                        "misses": misses,
+                        "hit_rate": hits / (hits + misses),
+                    }
+                    for cache_name, (hits, misses) in self.cache_requests.items()
+                },
+            }
+        # Nodes ready to run, only waiting for resources to be available
+        snapshot["nodes_ready"] = sum(
+            waiting for _, _, waiting in RM.get_usage().values()
+        )
+        for name, collector in list(self._collectors.items()):
+            try:
+                snapshot[name] = collector()
+            except Exception as e:
+                LOGGER.exception(e)
+        return snapshot
+
+    def get_prometheus_text(self) -> str:
+        """
+        Returns:
+            str: snapshot of the metrics, in the Prometheus text exposition format
+        """
+        snapshot = self.get_snapshot()
+        lines = []
+
+        def add_metric(name, metric_type, help_text, samples):
+            lines.append(f"# HELP all_nodes_{name} {help_text}")
+            lines.append(f"# TYPE all_nodes_{name} {metric_type}")
+            for suffix, labels, value in samples:
+                labels_str = ",".join(f'{k}="{v}"' for k, v in labels.items())
+                if labels_str:
+                    labels_str = "{" + labels_str + "}"
+                lines.append(f"all_nodes_{name}{suffix}{labels_str} {value}")
+
+        add_metric(
+            "nodes_running",
+            "gauge",
+            "Nodes running",
+            [("", {}, snapshot["nodes_running"])],
+        )
+        add_metric(
+            "nodes_ready",
+            "gauge",
+            "Nodes ready to run, waiting for resources",
+            [("", {}, snapshot["nodes_ready"])],
+        )
+        add_metric(
+            "queue_depth",
+            "gauge",
+            "Nodes of the running scenes still to be run",
+            [("", {}, snapshot["queue_depth"])],
+        )
+        add_metric(
+            "nodes_finished_total",
+            "counter",
+            "Nodes finished, by status",
+            [
+                ("", {"status": status}, amount)
+                for status, amount in sorted(snapshot["nodes_finished"].items())
+            ],
+        )
+        add_metric(
+            "throughput_nodes_per_second",
+            "gauge",
+            f"Nodes finished per second, over the last {THROUGHPUT_WINDOW}s",
+            [("", {}, round(snapshot["throughput"], 6))],
+        )
+
+        samples = []
+        for class_name, latency in sorted(snapshot["latencies"].items()):
+            cumulative = 0
+            for bound, amount in zip(LATENCY_BUCKETS + ["+Inf"], latency["buckets"]):
+                cumulative += amount
+                samples.append(
+                    ("_bucket", {"class_name": class_name, "le": bound}, cumulative)
+                )
+            samples.append(("_sum", {"class_name": class_name}, latency["sum"]))
+            samples.append(("_count", {"class_name": class_name}, latency["count"]))
+        add_metric(
+            "node_duration_seconds",
+            "histogram",
+            "Node execution times, by class",
+            samples,
+        )
+
+        samples = []
+        for cache_name, cache in sorted(snapshot["caches"].items()):
+            samples.append(("", {"cache": cache_name, "result": "hit"}, cache["hits"]))
+            samples.append(
+                ("", {"cache": cache_name, "result": "miss"}, cache["misses"])
+            )
+        add_metric(
+            "cache_requests_total", "counter", "Cache lookups, by result", samples
+        )
+
+        for name in self._collectors:
+            for key, value in sorted(snapshot.get(name, {}).items()):
+                add_metric(f"{name}_{key}", "gauge", f"{name} {key}", [("", {}, value)])
+
+        return "\n".join(lines) + "\n"
+
+
+ENGINE_METRICS = EngineMetrics()  # Singleton to use
+
+
+# -------------------------------- SERVER -------------------------------- #
+class MetricsServer:
+    """
+    Local HTTP endpoint for the engine metrics:
+    - /metrics: Prometheus text format
+    - /metrics.json: JSON snapshot
+    """
+
+    def __init__(self, metrics: EngineMetrics = ENGINE_METRICS):
+        self.metrics = metrics
+        self._server = None
+        self._thread = None
+
+    @property
+    def address(self) -> tuple:
+        return self._server.server_address if self._server else None
+
+    def start(self, port: int, host: str = "127.0.0.1") -> tuple:
+        """
+        Start serving in a background thread.
+
+        Args:
+            port (int): port to listen at, 0 for any free one
+            host (str, optional): Defaults to "127.0.0.1".
+
+        Returns:
+            tuple: (host, port) served at
+        """
+        metrics = self.metrics
+
+        class RequestHandler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path == "/metrics":
+                    body = metrics.get_prometheus_text().encode("utf-8")
+                    content_type = "text/plain; version=0.0.4; charset=utf-8"
+                elif self.path == "/metrics.json":
+                    body = json.dumps(metrics.get_snapshot()).encode("utf-8")
+                    content_type = "application/json"
+                else:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                LOGGER.debug(format, *args)
+
+        self._server = http.server.ThreadingHTTPServer((host, port), RequestHandler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="all_nodes_metrics", daemon=True
+        )
+        self._thread.start()
+        LOGGER.info("Serving metrics at http://%s:%d/metrics", *self.address)
+        return self.address
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
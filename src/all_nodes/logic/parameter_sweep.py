@@ -0,0 +1,199 @@
+# -*- coding: UTF-8 -*-
+__author__ = "Jaime Rivera <jaime.rvq@gmail.com>"
+__copyright__ = "Copyright 2022, Jaime Rivera"
+__credits__ = []
+__license__ = "MIT License"
+
+
+import concurrent.futures
+import csv
+import itertools
+import json
+import multiprocessing
+import multiprocessing.util
+import os
+
+import yaml
+
+from all_nodes import utils
+from all_nodes.logic.resources import RESOURCE_MANAGER as RM
+from all_nodes.logic.spill_store import SPILL_STORE
+
+
+LOGGER = utils.get_logger(__name__)
+
+
+# -------------------------------- PARAMETER SETS -------------------------------- #
+def read_parameter_sets(filepath: str) -> list:
+    """
+    Read the parameter sets of a sweep. Each set is a dict of values by dot name of the attribute.
+
+    - .csv: one set per row, the header has the dot names
+    - .jsonl: one set per line
+    - .json / .yml / .yaml: grid, with a list of values per dot name, that is expanded to all their combinations
+
+    Args:
+        filepath (str): file with the parameter sets
+
+    Raises:
+        ValueError: if the extension of the file is not supported
+
+    Returns:
+        list: of dicts
+    """
+    extension = os.path.splitext(filepath)[1].lower()
+    with open(filepath, "r", newline="") as file:
+        if extension == ".csv":
+            return [dict(row) for row in csv.DictReader(file)]
+        elif extension == ".jsonl":
+            return [json.loads(line) for line in file if line.strip()]
+        elif extension in [".json", ".yml", ".yaml"]:
+            return expand_grid(yaml.safe_load(file))
+
+    raise ValueError(
+        "Cannot read parameter sets from {}, expected .csv, .jsonl, .json or .yml".format(
+            filepath
+        )
+    )
+
+
+def expand_grid(grid: dict) -> list:
+    """
+    Get all the combinations of values of a grid.
+
+    Args:
+        grid (dict): list of values by dot name of the attribute
+
+    Returns:
+        list: of dicts, one per combination
+    """
+    names = list(grid)
+    return [
+        dict(zip(names, values))
+        for values in itertools.product(*(grid[name] for name in names))
+    ]
+
+
+# -------------------------------- WORKERS -------------------------------- #
+_SERVICE = None  # BatchService of each worker process
+
+
+def _init_worker(logging_level: int, spill_threshold_mb: float, resource_limits: dict):
+    from all_nodes.analytics.local_store import LOCAL_ANALYTICS
+    from all_nodes.analytics.spool import ANALYTICS_SPOOL
+    from all_nodes.logic.batch_service import BatchService
+
+    global _SERVICE
+    utils.set_logging_level(logging_level)
+    SPILL_STORE.set_threshold_mb(spill_threshold_mb)
+    RM.set_limits(resource_limits)
+    _SERVICE = BatchService(max_workers=1)
+
+    # Worker processes do not run atexit handlers, write the analytics buffered when they exit
+    for sink in [LOCAL_ANALYTICS, ANALYTICS_SPOOL]:
+        multiprocessing.util.Finalize(None, sink.close, exitpriority=10)
+
+
+def _run_parameter_set(
+    scene_path: str, set_index: int, parameters: dict, base_request: dict
+) -> dict:
+    request = dict(base_request, id=set_index, scene=scene_path)
+    request["parameters"] = dict(base_request.get("parameters") or {}, **parameters)
+    result = _SERVICE.run_request(request)
+    result["parameters"] = parameters
+    return result
+
+
+# -------------------------------- SWEEP -------------------------------- #
+def result_to_row(result: dict, parameter_names: list) -> dict:
+    row = {"set_index": result["id"]}
+    for name in parameter_names:
+        value = result["parameters"].get(name)
+        row[name] = None if value is None else str(value)
+    row["status"] = result["status"]
+    row["execution_time"] = result["execution_time"]
+    row["nodes"] = json.dumps(result.get("nodes", {}))
+    row["failures"] = result.get("failures", [])
+    row["errors"] = result.get("errors", [])
+    return row
+
+
+def run_sweep(
+    scene_path: str,
+    parameter_sets: list,
+    output_path: str,
+    workers: int = None,
+    base_request: dict = None,
+):
+    """
+    Run a scene once per parameter set, spreading the runs across processes, and write a table with the status and
+    timing of every run.
+
+    Each process scans the classes and parses the scene once, then builds a new scene for each set it runs.
+
+    Args:
+        scene_path (str): filepath or alias of the scene
+        parameter_sets (list): dicts of values by dot name of the attribute
+        output_path (str): Parquet file to write the results to
+        workers (int, optional): Amount of processes. Defaults to None, as many as CPUs.
+        base_request (dict, optional): options of every run, as in BatchService.run_request ("parameters" set
+            before the ones of each set, "conserve_memory", "timeout", "node_timeout"). Defaults to None.
+
+    Returns:
+        polars.DataFrame: results, one row per parameter set
+    """
+    import polars as pl
+
+    parameter_names = []
+    for parameters in parameter_sets:
+        for name in parameters:
+            if name not in parameter_names:
+                parameter_names.append(name)
+
+    LOGGER.info("Sweeping %s over %d parameter sets", scene_path, len(parameter_sets))
+    rows = []
+    # Spawned, not forked, as a fork could copy a lock held by another thread of this process. The settings of this
+    # process are passed to the workers instead
+    with concurrent.futures.ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(
+            LOGGER.getEffectiveLevel(),
+            SPILL_STORE.threshold_bytes / 2**20,
+            RM.limits,
+        ),
+    ) as executor:
+        futures = [
+            executor.submit(
+                _run_parameter_set, scene_path, i, parameters, base_request or {}
+            )
+            for i, parameters in enumerate(parameter_sets)
+        ]
+        for future in concurrent.futures.as_completed(futures):
+            result = future.result()
+            rows.append(result_to_row(result, parameter_names))
+            LOGGER.info(
+                "Parameter set %d: %s (%d/%d done)",
+                result["id"],
+                result["status"],
+                len(rows),
+                len(parameter_sets),
+            )
+
+    rows.sort(key=lambda row: row["set_index"])
+    schema = {"set_index": pl.Int64}
+    schema.update({name: pl.Utf8 for name in parameter_names})
+    schema.update(
+        {
+            "status": pl.Utf8,
+            "execution_time": pl.Float64,
+            "nodes": pl.Utf8,
+            "failures": pl.List(pl.Utf8),
+            "errors": pl.List(pl.Utf8),
+        }
+    )
+    results_df = pl.DataFrame(rows, schema=schema)
+    results_df.write_parquet(output_path)
+    LOGGER.info("Wrote results of the sweep to %s", output_path)
+    return results_df
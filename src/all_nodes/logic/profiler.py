@@ -0,0 +1,406 @@
+# -*- coding: UTF-8 -*-
+__author__ = "Jaime Rivera <jaime.rvq@gmail.com>"
+__copyright__ = "Copyright 2022, Jaime Rivera"
+__credits__ = []
+__license__ = "MIT License"
+
+
+import json
+import os
+import threading
+import time
+import tracemalloc
+
+from all_nodes import utils
+from all_nodes.logic.spill_store import SpilledValue, estimate_size
+
+
+LOGGER = utils.get_logger(__name__)
+
+
+# -------------------------------- UTILITY -------------------------------- #
+def attrs_size(attributes: list) -> int:
+    """
+    Add up the size of the values held by some attributes, without loading the ones spilled to disk.
+
+    Args:
+        attributes (list): logic attributes
+
+    Returns:
+        int: size in bytes
+    """
+    total = 0
+    for attr in attributes:
+        if attr.value is None:
+            continue
+        if isinstance(attr.value, SpilledValue):
+            total += attr.value.size
+        else:
+            total += estimate_size(attr.value)
+    return total
+
+
+# -------------------------------- PROFILER -------------------------------- #
+class ExecutionProfiler:
+    """
+    Opt-in profiler that records, for every node run: wall time, CPU time, time waited since it was ready to run,
+    peak memory delta, input/output sizes and the process/thread it ran in.
+
+    Nodes inside loops get one record per iteration.
+    """
+
+    def __init__(self, trace_memory: bool = True):
+        """
+        Args:
+            trace_memory (bool, optional): Measure peak memory with tracemalloc, which slows execution down.
+                Defaults to True.
+        """
+        self.trace_memory = trace_memory
+        self.records = []
+
+        self._origin = time.perf_counter()
+        self._started_tracemalloc = False
+        self._ready_times = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    # START / STOP ----------------------
+    def start(self):
+        """
+        Clear previous records and start measuring.
+        """
+        self.records = []
+        self._ready_times = {}
+        self._origin = time.perf_counter()
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+
+    def stop(self):
+        """
+        Stop measuring.
+        """
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self._origin
+
+    # NODE HOOKS ----------------------
+    def mark_ready(self, node):
+        """
+        Mark a node as ready to run, so the time until it actually starts is recorded as waiting time.
+
+        Args:
+            node (GeneralLogicNode): node that can be run
+        """
+        with self._lock:
+            self._ready_times[node.uuid] = self.elapsed()
+
+    def node_started(self, node) -> dict:
+        """
+        Start recording the run of a node.
+
+        Args:
+            node (GeneralLogicNode): node that is starting its execution
+
+        Returns:
+            dict: record of this run, to be given back to node_finished
+        """
+        start = self.elapsed()
+        with self._lock:
+            ready = self._ready_times.pop(node.uuid, start)
+
+        record = {
+            "node_name": node.full_name,
+            "class_name": node.class_name,
+            "start": start,
+            "queue_wait": max(start - ready, 0.0),
+            "cpu_start": time.thread_time(),
+            "input_bytes": attrs_size(node.get_input_attrs()),
+            "pid": os.getpid(),
+            "tid": threading.get_native_id(),
+            "thread_name": threading.current_thread().name,
+        }
+
+        if tracemalloc.is_tracing():
+            # Nested runs (contexts) reset the peak, so it is handed over to the runs that contain them
+            stack = self._get_memory_stack()
+            current, peak = tracemalloc.get_traced_memory()
+            if stack:
+                stack[-1]["peak"] = max(stack[-1]["peak"], peak)
+            tracemalloc.reset_peak()
+            stack.append({"start": current, "peak": current})
+
+        return record
+
+    def node_finished(self, node, record: dict):
+        """
+        Finish recording the run of a node.
+
+        Args:
+            node (GeneralLogicNode): node that finished its execution
+            record (dict): record returned by node_started
+        """
+        end = self.elapsed()
+        record["wall_time"] = end - record["start"]
+        record["cpu_time"] = time.thread_time() - record.pop("cpu_start")
+        record["output_bytes"] = attrs_size(node.get_output_attrs())
+        record["status"] = node.success
+        record["memory_peak_delta"] = 0
+
+        stack = self._get_memory_stack()
+        if stack and tracemalloc.is_tracing():
+            mem_record = stack.pop()
+            peak = max(mem_record["peak"], tracemalloc.get_traced_memory()[1])
+            record["memory_peak_delta"] = peak - mem_record["start"]
+            if stack:
+                stack[-1]["peak"] = max(stack[-1]["peak"], peak)
+
+        with self._lock:
+            self.records.append(record)
+            for next_node in node.out_connected_nodes():
+                self._ready_times[next_node.uuid] = end
+
+    def _get_memory_stack(self) -> list:
+        if not hasattr(self._local, "memory_stack"):
+            self._local.memory_stack = []
+        return self._local.memory_stack
+
+    # EXPORT ----------------------
+    def get_chrome_trace(self) -> dict:
+        """
+        Build a trace in the Chrome trace event format, that can be opened in chrome://tracing or Perfetto.
+
+        Returns:
+            dict: trace, ready to be dumped as JSON
+        """
+        events = []
+        thread_names = {}
+        for record in self.records:
+            thread_names[(record["pid"], record["tid"])] = record["thread_name"]
+            events.append(
+                {
+                    "name": record["node_name"],
+                    "cat": record["class_name"],
+                    "ph": "X",
+                    "ts": record["start"] * 1e6,
+                    "dur": record["wall_time"] * 1e6,
+                    "pid": record["pid"],
+                    "tid": record["tid"],
+                    "args": {
+                        "status": record["status"],
+                        "cpu_time_ms": record["cpu_time"] * 1e3,
+                        "queue_wait_ms": record["queue_wait"] * 1e3,
+                        "memory_peak_delta_bytes": record["memory_peak_delta"],
+                        "input_bytes": record["input_bytes"],
+                        "output_bytes": record["output_bytes"],
+                    },
+                }
+            )
+
+        for (pid, tid), thread_name in thread_names.items():
+            events.append(
+                {
+                    "name": "thread_name",
+                    "ph": "M",
+                    "pid": pid,
+                    "tid": tid,
+                    "args": {"name": thread_name},
+                }
+            )
+
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def export_chrome_trace(self, filepath: str):
+        """
+        Write the trace to a JSON file.
+
+        Args:
+            filepath (str): path of the JSON file to write
+        """
+        with open(filepath, "w") as file:
+            json.dump(self.get_chrome_trace(), file)
+        LOGGER.info("Exported execution profile to %s", filepath)
+
+    def get_nodes_stats(self) -> list:
+        """
+        Aggregate the records of each node (several in the case of nodes inside loops).
+
+        Returns:
+            list: one dict per node, slowest first
+        """
+        stats = {}
+        for record in self.records:
+            node_stats = stats.setdefault(
+                record["node_name"],
+                {
+                    "node_name": record["node_name"],
+                    "class_name": record["class_name"],
+                    "runs": 0,
+                    "wall_time": 0.0,
+                    "cpu_time": 0.0,
+                    "queue_wait": 0.0,
+                    "memory_peak_delta": 0,
+                    "input_bytes": 0,
+                    "output_bytes": 0,
+                },
+            )
+            node_stats["runs"] += 1
+            node_stats["status"] = record["status"]
+            for key in ["wall_time", "cpu_time", "queue_wait"]:
+                node_stats[key] += record[key]
+            for key in ["memory_peak_delta", "input_bytes", "output_bytes"]:
+                node_stats[key] = max(node_stats[key], record[key])
+
+        return sorted(stats.values(), key=lambda s: s["wall_time"], reverse=True)
+
+    def get_summary(self, top_n: int = 10) -> str:
+        """
+        Build a table with the slowest nodes.
+
+        Args:
+            top_n (int, optional): How many nodes to include. Defaults to 10.
+
+        Returns:
+            str: table, one line per node
+        """
+        row_format = "{:<40} {:<24} {:>5} {:>10} {:>10} {:>10} {:>10} {:>9} {:>9}"
+        lines = [
+            row_format.format(
+                "Node",
+                "Class",
+                "Runs",
+                "Wall (ms)",
+                "CPU (ms)",
+                "Wait (ms)",
+                "Mem (MB)",
+                "In (MB)",
+                "Out (MB)",
+            )
+        ]
+        for stats in self.get_nodes_stats()[:top_n]:
+            lines.append(
+                row_format.format(
+                    stats["node_name"][-40:],
+                    stats["class_name"][:24],
+                    stats["runs"],
+                    "{:.2f}".format(stats["wall_time"] * 1e3),
+                    "{:.2f}".format(stats["cpu_time"] * 1e3),
+                    "{:.2f}".format(stats["queue_wait"] * 1e3),
+                    "{:.2f}".format(stats["memory_peak_delta"] / 2**20),
+                    "{:.2f}".format(stats["input_bytes"] / 2**20),
+                    "{:.2f}".format(stats["output_bytes"] / 2**20),
+                )
+            )
+        return "\n".join(lines)
+
+
+# -------------------------------- CODE PROFILER -------------------------------- #
+CPROFILE = "cprofile"
+PYINSTRUMENT = "pyinstrument"
+
+
+class CodeProfiler:
+    """
+    Opt-in profiler that wraps the run() of nodes in cProfile (deterministic, .pstats files) or pyinstrument
+    (sampling, flame graph .html files).
+
+    There is one profile per node, so the runs of nodes inside loops are aggregated into it.
+    """
+
+    def __init__(
+        self, output_dir: str, class_names: list = None, engine: str = CPROFILE
+    ):
+        """
+        Args:
+            output_dir (str): Folder to write the profiles to
+            class_names (list, optional): Only profile nodes of these classes. Defaults to None, all nodes.
+            engine (str, optional): CPROFILE or PYINSTRUMENT. Defaults to CPROFILE.
+
+        Raises:
+            ImportError: if the engine is not installed, before any node is run
+        """
+        if engine == PYINSTRUMENT:
+            try:
+                import pyinstrument
+            except ImportError as e:
+                raise ImportError(
+                    "Profiling engine {} is not installed, run: pip install pyinstrument".format(
+                        engine
+                    )
+                ) from e
+            self.profile_class = pyinstrument.Profiler
+        elif engine == CPROFILE:
+            import cProfile
+
+            self.profile_class = cProfile.Profile
+        else:
+            raise ValueError("Unknown profiling engine: {}".format(engine))
+
+        self.output_dir = output_dir
+        self.class_names = set(class_names) if class_names else None
+        self.engine = engine
+
+        self.profiles = {}
+        self._lock = threading.Lock()
+
+    def should_profile(self, node) -> bool:
+        return self.class_names is None or node.class_name in self.class_names
+
+    def _get_profile(self, node):
+        with self._lock:
+            if node.full_name not in self.profiles:
+                self.profiles[node.full_name] = self.profile_class()
+            return self.profiles[node.full_name]
+
+    def profile_run(self, node):
+        """
+        Call the run() of a node, profiling it if its class was selected.
+
+        Args:
+            node (GeneralLogicNode): node to run
+        """
+        if not self.should_profile(node):
+            node.run()
+            return
+
+        profile = self._get_profile(node)
+        if self.engine == PYINSTRUMENT:
+            profile.start()
+            try:
+                node.run()
+            finally:
+                profile.stop()
+        else:
+            profile.enable()
+            try:
+                node.run()
+            finally:
+                profile.disable()
+
+    def write_results(self) -> list:
+        """
+        Write one file per profiled node to the output folder.
+
+        Returns:
+            list: paths of the files written
+        """
+        os.makedirs(self.output_dir, exist_ok=True)
+
+        filepaths = []
+        with self._lock:
+            for node_full_name, profile in self.profiles.items():
+                filename = node_full_name.strip("/").replace("/", ".")
+                if self.engine == PYINSTRUMENT:
+                    filepath = os.path.join(self.output_dir, filename + ".html")
+                    with open(filepath, "w") as file:
+                        file.write(profile.output_html())
+                else:
+                    filepath = os.path.join(self.output_dir, filename + ".pstats")
+                    profile.dump_stats(filepath)
+                filepaths.append(filepath)
+
+        LOGGER.info("Wrote %d node profiles to %s", len(filepaths), self.output_dir)
+        return filepaths
@@ -0,0 +1,262 @@
+# -*- coding: UTF-8 -*-
+__author__ = "Jaime Rivera <jaime.rvq@gmail.com>"
+__copyright__ = "Copyright 2022, Jaime Rivera"
+__credits__ = []
+__license__ = "MIT License"
+
+
+import contextlib
+import heapq
+import itertools
+import os
+import threading
+import urllib.parse
+
+from all_nodes import constants
+from all_nodes import utils
+from all_nodes.logic.cancellation import CancelledError
+
+
+LOGGER = utils.get_logger(__name__)
+
+
+# -------------------------------- UTILITY -------------------------------- #
+def get_physical_memory_mb():
+    """
+    Returns:
+        float: total physical memory of the machine in MB, None if it cannot be known
+    """
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES") / 1024**2
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def parse_limits(limits_str: str) -> dict:
+    """
+    Parse resource limits given as text, such as "subprocess=4,download=16".
+
+    Args:
+        limits_str (str): comma or space separated NAME=AMOUNT pairs
+
+    Returns:
+        dict: amount by name of resource
+    """
+    limits = {}
+    for pair in limits_str.replace(",", " ").split():
+        name, amount = pair.split("=", 1)
+        limits[name.strip()] = float(amount)
+    return limits
+
+
+def host_resource(url: str, name: str = "download") -> str:
+    """
+    Get the name of a resource limited per host, such as "download@some.host".
+
+    Args:
+        url (str): URL to be requested
+        name (str, optional): resource the limit of which applies to each host. Defaults to "download".
+
+    Returns:
+        str: name of the resource
+    """
+    return "{}@{}".format(name, urllib.parse.urlparse(url).netloc or "localhost")
+
+
+# -------------------------------- POOL -------------------------------- #
+class ResourcePool:
+    """
+    Counting semaphore that hands out amounts of a resource by priority.
+
+    Waiters are served strictly in order of priority (ties in order of arrival), so a big request cannot be starved
+    by a stream of small ones.
+    """
+
+    def __init__(self, name: str, capacity: float):
+        self.name = name
+        self.capacity = capacity
+        self.in_use = 0
+
+        self._condition = threading.Condition()
+        self._waiters = []
+        self._counter = itertools.count()
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiters)
+
+    def acquire(self, amount: float, priority: tuple = (0,), cancel_token=None):
+        """
+        Take an amount of the resource, waiting until it is available and it is the turn of this priority.
+
+        Args:
+            amount (float): amount to take, capped to the capacity of the pool
+            priority (tuple, optional): higher is served first. Defaults to (0,).
+            cancel_token (CancellationToken, optional): stop waiting when cancelled. Defaults to None.
+
+        Raises:
+            CancelledError: if the token gets cancelled while waiting
+        """
+        amount = min(amount, self.capacity)
+        entry = (tuple(-p for p in priority), next(self._counter))
+
+        def wake_up():
+            with self._condition:
+                self._condition.notify_all()
+
+        with self._condition:
+            heapq.heappush(self._waiters, entry)
+            if cancel_token is not None:
+                cancel_token.add_callback(wake_up)
+            try:
+                while (
+                    self._waiters[0] is not entry
+                    or self.in_use + amount > self.capacity
+                ):
+                    if cancel_token is not None and cancel_token.is_cancelled:
+                        raise CancelledError(cancel_token.reason)
+                    self._condition.wait()
+                self.in_use += amount
+            finally:
+                self._waiters.remove(entry)
+                heapq.heapify(self._waiters)
+                if cancel_token is not None:
+                    cancel_token.remove_callback(wake_up)
+                self._condition.notify_all()
+
+        return amount
+
+    def release(self, amount: float):
+        with self._condition:
+            self.in_use -= amount
+            self._condition.notify_all()
+
+
+# -------------------------------- MANAGER -------------------------------- #
+class ResourceManager:
+    """
+    Limits on the resources nodes take while running, shared by all the scenes running in the process.
+
+    Nodes declare what they take through GeneralLogicNode.get_resources, as an amount by name:
+    - "cpu": CPU slots (CPU_SLOTS)
+    - "memory_mb": estimate of the memory used while running (MEMORY_MB)
+    - any other name, limited here (RESOURCES), such as "subprocess". A name like "download@some.host" gets its own
+      pool for each host, limited by the limit of "download".
+
+    Resources without a limit are not throttled. The manager also keeps how long nodes of each class usually take,
+    used to find the critical path of scenes.
+    """
+
+    def __init__(self):
+        self._pools = {}
+        self._durations = {}
+        self._lock = threading.Lock()
+
+        self.limits = {}
+        self.set_limits(constants.RESOURCE_LIMITS)
+        memory_budget_mb = constants.MEMORY_BUDGET_MB
+        if not memory_budget_mb:
+            physical_memory_mb = get_physical_memory_mb()
+            if physical_memory_mb:
+                memory_budget_mb = 0.75 * physical_memory_mb
+        if memory_budget_mb:
+            self.limits["memory_mb"] = memory_budget_mb
+        env_limits = os.getenv("ALL_NODES_RESOURCE_LIMITS")
+        if env_limits:
+            self.set_limits(parse_limits(env_limits))
+
+    # LIMITS ----------------------
+    def set_limits(self, limits: dict):
+        """
+        Args:
+            limits (dict): amount that can be taken at once by name of resource, None or 0 to remove the limit
+        """
+        for name, amount in limits.items():
+            if amount:
+                self.limits[name] = amount
+            else:
+                self.limits.pop(name, None)
+        with self._lock:
+            self._pools = {}  # New limits apply to the nodes reserving from now on
+
+    def get_limit(self, name: str):
+        if name in self.limits:
+            return self.limits[name]
+        return self.limits.get(name.split("@", 1)[0])
+
+    def get_pool(self, name: str) -> ResourcePool:
+        """
+        Returns:
+            ResourcePool: pool of the resource, None if it is not limited
+        """
+        with self._lock:
+            pool = self._pools.get(name)
+            if pool is None:
+                limit = self.get_limit(name)
+                if limit is None:
+                    return None
+                pool = self._pools[name] = ResourcePool(name, limit)
+            return pool
+
+    def get_usage(self) -> dict:
+        """
+        Returns:
+            dict: (in use, capacity, waiting) by name of every resource reserved so far
+        """
+        with self._lock:
+            return {
+                name: (pool.in_use, pool.capacity, pool.waiting)
+                for name, pool in self._pools.items()
+            }
+
+    # RESERVING ----------------------
+    @contextlib.contextmanager
+    def reserve(self, node):
+        """
+        Hold the resources a node declares while it runs, waiting for them by priority.
+
+        Resources are always taken in the same order, so nodes waiting for several of them cannot deadlock.
+
+        Args:
+            node (GeneralLogicNode): node about to run
+
+        Raises:
+            CancelledError: if the node gets cancelled while waiting
+        """
+        requests = {
+            name: amount for name, amount in node.get_resources().items() if amount
+        }
+        taken = []
+        try:
+            for name in sorted(requests):
+                pool = self.get_pool(name)
+                if pool is None:
+                    continue
+                if pool.in_use + requests[name] > pool.capacity:
+                    LOGGER.debug("%s waiting for %s", node.full_name, name)
+                amount = pool.acquire(
+                    requests[name], node.get_priority_key(), node.get_cancel_token()
+                )
+                taken.append((pool, amount))
+            yield
+        finally:
+            for pool, amount in reversed(taken):
+                pool.release(amount)
+
+    # DURATIONS ----------------------
+    def record_duration(self, class_name: str, seconds: float):
+        previous = self._durations.get(class_name)
+        if previous is None:
+            self._durations[class_name] = seconds
+        else:
+            self._durations[class_name] = 0.8 * previous + 0.2 * seconds
+
+    def expected_duration(self, class_name: str) -> float:
+        """
+        Returns:
+            float: seconds nodes of the class have been taking, a small default if none has run yet
+        """
+        return self._durations.get(class_name, constants.DEFAULT_NODE_DURATION)
+
+
+RESOURCE_MANAGER = ResourceManager()  # Singleton to use
@@ -0,0 +1,166 @@
+# -*- coding: UTF-8 -*-
+__author__ = "Jaime Rivera <jaime.rvq@gmail.com>"
+__copyright__ = "Copyright 2022, Jaime Rivera"
+__credits__ = []
+__license__ = "MIT License"
+
+
+import json
+import os
+import threading
+
+from all_nodes import constants
+from all_nodes import utils
+
+
+LOGGER = utils.get_logger(__name__)
+
+
+class ResultsWriter:
+    """
+    Write a machine-readable record for every node run of a scene, as soon as each node finishes.
+
+    - .json: a JSON list, written record by record
+    - .jsonl: one JSON record per line
+    - .parquet: records are spooled to a .jsonl file next to it while running, and converted once the run finishes
+
+    Nodes inside loops get one record per iteration. Nodes that never ran are recorded when the writer is closed.
+    """
+
+    def __init__(self, filepath: str, output_attrs: list = None):
+        """
+        Args:
+            filepath (str): file to write to, .json, .jsonl or .parquet
+            output_attrs (list, optional): Dot names of attributes whose values are included in the records.
+                Defaults to None.
+
+        Raises:
+            ValueError: if the extension of the file is not supported
+        """
+        self.filepath = filepath
+        self.extension = os.path.splitext(filepath)[1].lower()
+        if self.extension not in [".json", ".jsonl", ".parquet"]:
+            raise ValueError(
+                "Cannot write results to {}, expected .json, .jsonl or .parquet".format(
+                    filepath
+                )
+            )
+        self.output_attrs = set(output_attrs or [])
+
+        self.scene = None
+        self.records_count = 0
+
+        self._written_runs = {}
+        self._lock = threading.Lock()
+
+        self._spool_path = filepath
+        if self.extension == ".parquet":
+            self._spool_path = filepath + ".partial.jsonl"
+        self._file = open(self._spool_path, "w")
+        if self.extension == ".json":
+            self._file.write("[\n")
+
+    # RECORDS ----------------------
+    def build_record(self, node) -> dict:
+        outputs = {
+            attr.dot_name: attr.get_value()
+            for attr in node.all_attributes
+            if attr.dot_name in self.output_attrs
+        }
+        return {
+            "node_name": node.full_name,
+            "class_name": node.class_name,
+            "status": node.success,
+            "execution_counter": node.execution_counter,
+            "run_date": node.run_date.isoformat() if node.run_date else None,
+            "execution_time": node.execution_time,
+            "outputs": outputs,
+            "node": node.get_node_full_dict(),
+        }
+
+    def write_record(self, record: dict):
+        if self.extension == ".parquet":
+            # Nested values are kept as JSON, so the columns have a stable type
+            record = dict(record)
+            record["outputs"] = json.dumps(record["outputs"], default=str)
+            record["node"] = json.dumps(record["node"], default=str)
+        line = json.dumps(record, default=str)
+
+        with self._lock:
+            if self.extension == ".json" and self.records_count:
+                self._file.write(",\n")
+            self._file.write(line)
+            if self.extension != ".json":
+                self._file.write("\n")
+            self._file.flush()
+            self.records_count += 1
+
+    def node_finished(self, node):
+        """
+        Write the record of a node, if it has run since the last time it was recorded.
+
+        Args:
+            node (GeneralLogicNode): node that emitted its finished signal
+        """
+        if node.success not in [
+            constants.SUCCESSFUL,
+            constants.FAILED,
+            constants.ERROR,
+            constants.TIMEOUT,
+        ]:
+            return  # Could not run yet, or still in a loop
+        if self._written_runs.get(node.uuid) == node.execution_counter:
+            return  # Asked to run again after having run
+        self._written_runs[node.uuid] = node.execution_counter
+        self.write_record(self.build_record(node))
+
+    # SCENE ----------------------
+    @staticmethod
+    def walk_nodes(scene):
+        """
+        Args:
+            scene (LogicScene)
+
+        Yields:
+            GeneralLogicNode: every node of the scene and of the internal scenes of its contexts
+        """
+        for node in scene.all_logic_nodes:
+            yield node
+            if node.IS_CONTEXT and node.internal_scene is not None:
+                yield from ResultsWriter.walk_nodes(node.internal_scene)
+
+    def attach(self, scene):
+        """
+        Start recording the nodes of a scene, and of its contexts, as they finish.
+
+        Args:
+            scene (LogicScene): scene about to be run
+        """
+        self.scene = scene
+        for node in self.walk_nodes(scene):
+            node.signaler.finished.connect(lambda node=node: self.node_finished(node))
+
+    def close(self):
+        """
+        Record the nodes that never ran and finish writing the file.
+        """
+        if self.scene:
+            for node in self.walk_nodes(self.scene):
+                if node.uuid not in self._written_runs:
+                    self._written_runs[node.uuid] = node.execution_counter
+                    self.write_record(self.build_record(node))
+
+        if self.extension == ".json":
+            self._file.write("\n]\n")
+        self._file.close()
+
+        if self.extension == ".parquet":
+            import polars as pl
+
+            if self.records_count:
+                pl.read_ndjson(self._spool_path).write_parquet(self.filepath)
+            else:
+                pl.DataFrame().write_parquet(self.filepath)
+            os.remove(self._spool_path)
+
+        LOGGER.info("Wrote %d node results to %s", self.records_count, self.filepath)
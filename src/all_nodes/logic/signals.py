@@ -0,0 +1,129 @@
+# -*- coding: UTF-8 -*-
+__author__ = "Jaime Rivera <jaime.rvq@gmail.com>"
+__copyright__ = "Copyright 2022, Jaime Rivera"
+__credits__ = []
+__license__ = "MIT License"
+
+
+import threading
+
+
+# -------------------------------- DISPATCHING -------------------------------- #
+def direct_dispatcher(delivery, args, coalesce=False):
+    """
+    Default dispatcher: deliver the emission right away, in the thread that emitted it.
+
+    Args:
+        delivery (callable): function that calls all the slots connected to a signal
+        args (tuple): arguments of the emission
+        coalesce (bool, optional): whether the emission can be merged with later identical ones. Defaults to False.
+    """
+    delivery(*args)
+
+
+_DISPATCHER = direct_dispatcher
+
+
+def set_dispatcher(dispatcher=None):
+    """
+    Set the function in charge of delivering all signal emissions.
+
+    The GUI uses this to deliver emissions in its main thread, the way Qt's queued connections would.
+
+    Args:
+        dispatcher (callable, optional): receives a delivery function, the emission arguments and whether the
+            emission can be coalesced. Defaults to None, which restores the direct dispatcher.
+    """
+    global _DISPATCHER
+    _DISPATCHER = dispatcher or direct_dispatcher
+
+
+# -------------------------------- SIGNALS -------------------------------- #
+class Signal:
+    """
+    Qt-like signal, without depending on Qt.
+
+    Meant to be declared as a class attribute, each instance of the class gets its own bound signal:
+
+        class MySignaler:
+            finished = Signal()
+    """
+
+    def __init__(self, *arg_types):
+        self.arg_types = arg_types
+        self.attr_name = None
+
+    def __set_name__(self, owner, name):
+        self.attr_name = name
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+
+        bound_signal = instance.__dict__.get(self.attr_name)
+        if bound_signal is None:
+            bound_signal = instance.__dict__.setdefault(
+                self.attr_name, BoundSignal(self.attr_name)
+            )
+        return bound_signal
+
+
+class BoundSignal:
+    def __init__(self, name: str):
+        self.name = name
+        self._slots = []
+        self._coalesced_slots = []
+        self._lock = threading.Lock()
+
+    def connect(self, slot, coalesce=False):
+        """
+        Connect a slot to this signal.
+
+        Args:
+            slot (callable): slot to call on every emission
+            coalesce (bool, optional): let the dispatcher merge repeated emissions with the same arguments, calling
+                the slot only once for them. For slots that just show the latest state. Defaults to False.
+        """
+        with self._lock:
+            if coalesce:
+                self._coalesced_slots.append(slot)
+            else:
+                self._slots.append(slot)
+
+    def disconnect(self, slot=None):
+        """
+        Disconnect a slot from this signal.
+
+        Args:
+            slot (callable, optional): slot to disconnect. Defaults to None, which disconnects all slots.
+        """
+        with self._lock:
+            if slot is None:
+                self._slots.clear()
+                self._coalesced_slots.clear()
+            elif slot in self._slots:
+                self._slots.remove(slot)
+            elif slot in self._coalesced_slots:
+                self._coalesced_slots.remove(slot)
+
+    def emit(self, *args):
+        if self._slots:
+            _DISPATCHER(self._deliver, args)
+        if self._coalesced_slots:
+            _DISPATCHER(self._deliver_coalesced, args, True)
+
+    def _deliver(self, *args):
+        with self._lock:
+            slots = list(self._slots)
+        for slot in slots:
+            slot(*args)
+
+    def _deliver_coalesced(self, *args):
+        with self._lock:
+            slots = list(self._coalesced_slots)
+        for slot in slots:
+            slot(*args)
+
+    def __repr__(self):
+        slots_count = len(self._slots) + len(self._coalesced_slots)
+        return f"<BoundSignal '{self.name}', {slots_count} slot(s)>"
@@ -0,0 +1,214 @@
+# -*- coding: UTF-8 -*-
+__author__ = "Jaime Rivera <jaime.rvq@gmail.com>"
+__copyright__ = "Copyright 2022, Jaime Rivera"
+__credits__ = []
+__license__ = "MIT License"
+
+
+import atexit
+import os
+import pickle
+import shutil
+import sys
+import tempfile
+import threading
+import uuid
+import weakref
+
+from all_nodes import constants
+from all_nodes import utils
+
+
+LOGGER = utils.get_logger(__name__)
+
+# Formats values are spilled as
+PARQUET = "parquet"  # polars DataFrame / Series
+NPY = "npy"  # NumPy array
+RAW_IMAGE = "raw_image"  # PIL image, raw pixel buffer
+PICKLE = "pickle"  # Anything else
+
+RAW_IMAGE_MODES = {"1", "L", "LA", "I", "F", "RGB", "RGBA", "RGBX", "CMYK", "YCbCr"}
+
+
+# -------------------------------- SIZE ESTIMATION -------------------------------- #
+def estimate_size(value) -> int:
+    """
+    Estimate the memory used by a value, without serializing it.
+
+    Args:
+        value (object)
+
+    Returns:
+        int: size in bytes (approximate for containers, only their own size is counted)
+    """
+    numpy = sys.modules.get("numpy")
+    if numpy is not None and isinstance(value, numpy.ndarray):
+        return value.nbytes
+    polars = sys.modules.get("polars")
+    if polars is not None and isinstance(value, (polars.DataFrame, polars.Series)):
+        return value.estimated_size()
+    pil_image = sys.modules.get("PIL.Image")
+    if pil_image is not None and isinstance(value, pil_image.Image):
+        return value.width * value.height * len(value.getbands())
+
+    return sys.getsizeof(value)
+
+
+# -------------------------------- HANDLE -------------------------------- #
+def _remove_file(filepath: str):
+    try:
+        os.remove(filepath)
+    except OSError:  # Already gone, or still memory-mapped on some platforms
+        pass
+
+
+class SpilledValue:
+    """
+    Lightweight handle to a value that was spilled to disk.
+
+    The file is removed once no attribute references this handle anymore.
+    """
+
+    def __init__(self, filepath: str, spill_format: str, type_name: str, size: int):
+        self.filepath = filepath
+        self.spill_format = spill_format
+        self.type_name = type_name
+        self.size = size
+        self.metadata = dict()
+
+        weakref.finalize(self, _remove_file, filepath)
+
+    def load(self):
+        """
+        Load the value back, memory-mapped where possible.
+
+        Returns:
+            object: the value that was spilled
+        """
+        if self.spill_format == PARQUET:
+            import polars as pl
+
+            frame = pl.read_parquet(self.filepath, memory_map=True)
+            if self.metadata.get("is_series"):
+                return frame.to_series()
+            return frame
+
+        elif self.spill_format == NPY:
+            import numpy as np
+
+            return np.load(self.filepath, mmap_mode="r")
+
+        elif self.spill_format == RAW_IMAGE:
+            import mmap
+
+            import PIL.Image
+
+            with open(self.filepath, "rb") as stream:
+                buffer = mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ)
+            mode = self.metadata["mode"]
+            return PIL.Image.frombuffer(
+                mode, self.metadata["image_size"], buffer, "raw", mode, 0, 1
+            )
+
+        with open(self.filepath, "rb") as stream:
+            return pickle.load(stream)
+
+    def __repr__(self):
+        return "<SpilledValue {} ({:.1f} MB, {}) at {}>".format(
+            self.type_name, self.size / 2**20, self.spill_format, self.filepath
+        )
+
+
+# -------------------------------- STORE -------------------------------- #
+class SpillStore:
+    """
+    Local temporary store where oversized values are spilled to.
+
+    Disabled unless a threshold is set, either with the ALL_NODES_SPILL_THRESHOLD_MB env variable or with
+    set_threshold_mb. The folder can be chosen with the ALL_NODES_SPILL_DIR env variable.
+    """
+
+    def __init__(self):
+        self.threshold_bytes = int(constants.SPILL_THRESHOLD_MB * 2**20)
+        self.root_dir = constants.SPILL_DIR
+        self._store_dir = None
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.threshold_bytes > 0
+
+    def set_threshold_mb(self, threshold_mb: float):
+        """
+        Args:
+            threshold_mb (float): values bigger than this get spilled. 0 disables spilling.
+        """
+        self.threshold_bytes = int(threshold_mb * 2**20)
+
+    def get_store_dir(self) -> str:
+        with self._lock:
+            if self._store_dir is None:
+                self._store_dir = tempfile.mkdtemp(
+                    prefix="all_nodes_spill_", dir=self.root_dir
+                )
+                atexit.register(shutil.rmtree, self._store_dir, ignore_errors=True)
+                LOGGER.debug("Spilling oversized values to %s", self._store_dir)
+        return self._store_dir
+
+    def needs_spilling(self, value) -> bool:
+        if not self.enabled or value is None or isinstance(value, SpilledValue):
+            return False
+        return estimate_size(value) > self.threshold_bytes
+
+    def spill(self, value) -> SpilledValue:
+        """
+        Write a value to the store.
+
+        Args:
+            value (object): value to spill
+
+        Returns:
+            SpilledValue: handle to load the value back
+        """
+        size = estimate_size(value)
+        type_name = type(value).__name__
+        filepath = os.path.join(self.get_store_dir(), uuid.uuid4().hex)
+
+        numpy = sys.modules.get("numpy")
+        polars = sys.modules.get("polars")
+        pil_image = sys.modules.get("PIL.Image")
+
+        if polars is not None and isinstance(value, (polars.DataFrame, polars.Series)):
+            is_series = isinstance(value, polars.Series)
+            frame = value.to_frame() if is_series else value
+            frame.write_parquet(filepath + ".parquet")
+            handle = SpilledValue(filepath + ".parquet", PARQUET, type_name, size)
+            handle.metadata["is_series"] = is_series
+
+        elif (
+            numpy is not None and type(value) is numpy.ndarray and value.dtype != object
+        ):
+            numpy.save(filepath + ".npy", value, allow_pickle=False)
+            handle = SpilledValue(filepath + ".npy", NPY, type_name, size)
+
+        elif (
+            pil_image is not None
+            and isinstance(value, pil_image.Image)
+            and value.mode in RAW_IMAGE_MODES
+        ):
+            with open(filepath + ".raw", "wb") as stream:
+                stream.write(value.tobytes())
+            handle = SpilledValue(filepath + ".raw", RAW_IMAGE, type_name, size)
+            handle.metadata["mode"] = value.mode
+            handle.metadata["image_size"] = value.size
+
+        else:
+            with open(filepath + ".pkl", "wb") as stream:
+                pickle.dump(value, stream, protocol=pickle.HIGHEST_PROTOCOL)
+            handle = SpilledValue(filepath + ".pkl", PICKLE, type_name, size)
+
+        LOGGER.info("Spilled %s to disk", handle)
+        return handle
+
+
+SPILL_STORE = SpillStore()  # Singleton to use
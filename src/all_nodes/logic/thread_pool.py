@@ -0,0 +1,53 @@
+# -*- coding: UTF-8 -*-
+__author__ = "Jaime Rivera <jaime.rvq@gmail.com>"
+__copyright__ = "Copyright 2022, Jaime Rivera"
+__credits__ = []
+__license__ = "MIT License"
+
+
+import concurrent.futures
+import os
+
+from all_nodes import utils
+
+
+LOGGER = utils.get_logger(__name__)
+
+
+class ThreadPool:
+    """
+    Pool of threads to run workers in, without depending on Qt.
+
+    A worker is any object with a run() method, so the same workers can be started from the GUI or from batch mode.
+    """
+
+    def __init__(self, max_threads: int = None):
+        self.max_threads = max_threads or os.cpu_count() or 1
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.max_threads, thread_name_prefix="all_nodes"
+        )
+
+    def start(self, worker) -> concurrent.futures.Future:
+        """
+        Start running a worker in one of the threads of the pool.
+
+        Args:
+            worker (object): object with a run() method
+
+        Returns:
+            concurrent.futures.Future: future for the run() call of the worker
+        """
+        future = self._executor.submit(worker.run)
+        future.add_done_callback(self._log_exception)
+        return future
+
+    @staticmethod
+    def _log_exception(future: concurrent.futures.Future):
+        if not future.cancelled() and future.exception() is not None:
+            LOGGER.error(
+                "Worker finished with an exception",
+                exc_info=future.exception(),
+            )
+
+
+THREAD_POOL = ThreadPool()  # Singleton to use
@@ -9,12 +9,17 @@ import argparse
 import os
 import sys
 
-from PySide2.QtWidgets import QApplication
-
 from all_nodes.analytics import analytics
-from all_nodes.graphic.widgets.main_window import AllNodesWindow
+from all_nodes.analytics.local_store import LOCAL_ANALYTICS
+from all_nodes import constants
 from all_nodes.logic.class_registry import CLASS_REGISTRY as CR
 from all_nodes.logic.logic_scene import LogicScene
+from all_nodes.logic.metrics import MetricsServer
+from all_nodes.logic.profiler import CodeProfiler, ExecutionProfiler
+from all_nodes.logic import resources
+from all_nodes.logic.resources import RESOURCE_MANAGER as RM
+from all_nodes.logic.results_writer import ResultsWriter
+from all_nodes.logic.spill_store import SPILL_STORE
 from all_nodes import utils
 
 
@@ -26,6 +31,15 @@ def launch_gui():
     """
     Just launch the tool, with GUI to create/edit scenes.
     """
+    # Qt is only imported when launching the GUI, so batch mode does not pay for it
+    from PySide2.QtWidgets import QApplication
+
+    from all_nodes.graphic.graphic_utils import install_qt_dispatcher
+    from all_nodes.graphic.widgets.main_window import AllNodesWindow
+
+    # Logic signals are delivered in the GUI thread
+    install_qt_dispatcher()
+
     # Start classes scannig first thing
     CR.scan_for_classes_GUI()
 
@@ -37,17 +51,52 @@ def launch_gui():
     app.exec_()
 
 
-def launch_batch(scene_file: str, set_parameters: list):
+def launch_batch(
+    scene_file: str,
+    set_parameters: list,
+    conserve_memory=False,
+    profile_file=None,
+    profile_code_dir=None,
+    profile_classes=None,
+    profile_engine="cprofile",
+    results_file=None,
+    results_outputs=None,
+    timeout=None,
+    node_timeout=None,
+) -> bool:
     """
     Run a scene in batch mode, no GUI.
 
     Args:
         scene_file (str): Filepath or alias of the scene to run
         scene_file (list): List eith parameters and values to be set
+        conserve_memory (bool, optional): Release values as soon as they are consumed. Defaults to False.
+        profile_file (str, optional): Profile every node run and export the timeline to this JSON file.
+            Defaults to None.
+        profile_code_dir (str, optional): Profile the run() of nodes and write one file per node to this folder.
+            Defaults to None.
+        profile_classes (list, optional): Only profile the code of nodes of these classes. Defaults to None, all.
+        profile_engine (str, optional): "cprofile" (.pstats files) or "pyinstrument" (.html flame graphs).
+            Defaults to "cprofile".
+        results_file (str, optional): Write a record of every node run to this .json, .jsonl or .parquet file.
+            Defaults to None.
+        results_outputs (list, optional): Dot names of attributes whose values are included in the results.
+            Defaults to None.
+        timeout (float, optional): Seconds the whole scene can run for. Defaults to None, no limit.
+        node_timeout (float, optional): Seconds each node can run for, unless it has its own limit.
+            Defaults to None, no limit.
+
+    Returns:
+        bool: False if any node FAILED, ERRORED or TIMED OUT
     """
     # Start classes scannig first thing
     CR.scan_for_classes()
 
+    # Fail before loading anything if the profiling engine is missing
+    code_profiler = None
+    if profile_code_dir:
+        code_profiler = CodeProfiler(profile_code_dir, profile_classes, profile_engine)
+
     # Scene
     scene = LogicScene()
     scene.load_from_file(scene_file)
@@ -60,18 +109,111 @@ def launch_batch(scene_file: str, set_parameters: list):
             node = scene.to_node(node_name)
             if node:
                 node.set_attribute_from_str(attr_name, attr_str_value)
+    if node_timeout:
+        scene.set_nodes_timeout(node_timeout)
 
     # Run!
-    scene.run_all_nodes(spawn_thread=False)
+    results_writer = None
+    if results_file:
+        results_writer = ResultsWriter(results_file, results_outputs)
+        results_writer.attach(scene)
+    profiler = ExecutionProfiler() if profile_file else None
+    try:
+        scene.run_all_nodes(
+            spawn_thread=False,
+            conserve_memory=conserve_memory,
+            profiler=profiler,
+            code_profiler=code_profiler,
+            timeout=timeout,
+        )
+    finally:
+        if results_writer:
+            results_writer.close()
+
+    # Profiling results
+    if profiler:
+        profiler.export_chrome_trace(profile_file)
+        utils.print_separator("Slowest nodes")
+        LOGGER.info("\n" + profiler.get_summary())
+
+    return not any(
+        node.success in [constants.FAILED, constants.ERROR, constants.TIMEOUT]
+        for node in scene.all_logic_nodes
+    )
+
+
+def launch_service(port: int = None, host: str = "127.0.0.1", workers: int = None):
+    """
+    Keep running scenes as requested, without paying the startup for each of them.
+
+    Args:
+        port (int, optional): Local port to listen to requests at. Defaults to None, reading them from stdin.
+        host (str, optional): Address to listen to requests at. Defaults to "127.0.0.1".
+        workers (int, optional): Scenes to run at the same time. Defaults to None, as many as CPUs.
+    """
+    from all_nodes.logic.batch_service import BatchService
+
+    service = BatchService(workers)
+    try:
+        if port is None:
+            service.serve_stdin(sys.stdin, sys.stdout)
+        else:
+            service.serve_socket(host, port)
+    finally:
+        service.shutdown()
+
+
+def launch_sweep(
+    scene_file: str,
+    parameters_file: str,
+    output_file: str,
+    workers: int = None,
+    set_parameters: list = None,
+    conserve_memory=False,
+    timeout=None,
+    node_timeout=None,
+):
+    """
+    Run a scene once per parameter set, in parallel processes.
+
+    Args:
+        scene_file (str): Filepath or alias of the scene to run
+        parameters_file (str): File with the parameter sets (.csv, .jsonl, or .json/.yml grid)
+        output_file (str): Parquet file to write the results to
+        workers (int, optional): Amount of processes. Defaults to None, as many as CPUs.
+        set_parameters (list, optional): Parameters and values set in every run, before the ones of each set.
+            Defaults to None.
+        conserve_memory (bool, optional): Release values as soon as they are consumed. Defaults to False.
+        timeout (float, optional): Seconds each run can take. Defaults to None, no limit.
+        node_timeout (float, optional): Seconds each node can run for, unless it has its own limit.
+            Defaults to None, no limit.
+    """
+    from all_nodes.logic import parameter_sweep
+
+    base_request = {
+        "parameters": dict(zip(set_parameters[::2], set_parameters[1::2]))
+        if set_parameters
+        else {},
+        "conserve_memory": conserve_memory,
+        "timeout": timeout,
+        "node_timeout": node_timeout,
+    }
+    parameter_sets = parameter_sweep.read_parameter_sets(parameters_file)
+    parameter_sweep.run_sweep(
+        scene_file, parameter_sets, output_file, workers, base_request
+    )
 
 
 # MAIN ---------------------------------------------------
 def main():
-    # Startup logging
-    LOGGER.info("STARTED all_nodes")
-
     # Arguments ----------------------
     parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "command",
+        nargs="?",
+        choices=["serve"],
+        help="serve: keep running, executing the scenes requested as JSON lines through stdin or a local socket",
+    )
     parser.add_argument(
         "-f", "--scene_file", type=str, help="file .yml to run in non-GUI mode"
     )
@@ -82,29 +224,191 @@ def main():
         type=str,
         nargs="+",
     )
+    parser.add_argument(
+        "-q",
+        "--quiet",
+        help="Only log warnings and errors, for faster batch executions",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--conserve_memory",
+        help="Release values as soon as all the nodes using them have run",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--spill_threshold_mb",
+        help="Spill to disk the node outputs bigger than this size (in MB)",
+        type=float,
+    )
+    parser.add_argument(
+        "--timeout",
+        help="Stop the execution after this many seconds, marking the nodes still running as TIMEOUT",
+        type=float,
+    )
+    parser.add_argument(
+        "--node_timeout",
+        help="Cancel any node running for longer than this many seconds (unless it sets its own limit)",
+        type=float,
+    )
+    parser.add_argument(
+        "--resource_limits",
+        help="Resources the nodes running at once can take, as NAME=AMOUNT (e.g. subprocess=4 memory_mb=8000)",
+        type=str,
+        nargs="+",
+    )
+    parser.add_argument(
+        "--results",
+        help="Write a record of every node run to a file (.json, .jsonl or .parquet)",
+        type=str,
+        metavar="OUT_FILE",
+    )
+    parser.add_argument(
+        "--results_outputs",
+        help="Attributes (as Node.attribute) whose values are included in the results",
+        type=str,
+        nargs="+",
+    )
+    parser.add_argument(
+        "--profile",
+        help="Profile the execution and export it to a JSON file (Chrome trace / Perfetto format)",
+        type=str,
+        metavar="OUT_JSON",
+    )
+    parser.add_argument(
+        "--profile_code",
+        help="Profile the code run by each node and write the profiles to this folder",
+        type=str,
+        metavar="OUT_DIR",
+    )
+    parser.add_argument(
+        "--profile_classes",
+        help="Only profile the code of nodes of these classes",
+        type=str,
+        nargs="+",
+    )
+    parser.add_argument(
+        "--profile_engine",
+        help="Profiler used with --profile_code",
+        choices=["cprofile", "pyinstrument"],
+        default="cprofile",
+    )
+    parser.add_argument(
+        "--sweep",
+        help="Run the scene once per parameter set of this file (.csv, .jsonl, or .json/.yml grid)",
+        type=str,
+        metavar="PARAMS_FILE",
+    )
+    parser.add_argument(
+        "--sweep_output",
+        help="Parquet file to write the results of the sweep to",
+        type=str,
+        default="sweep_results.parquet",
+    )
+    parser.add_argument(
+        "--port",
+        help="In serve mode, listen to requests on this local port instead of stdin",
+        type=int,
+    )
+    parser.add_argument(
+        "--host",
+        help="In serve mode, address to listen to requests at. Also the address metrics are served at",
+        type=str,
+        default="127.0.0.1",
+    )
+    parser.add_argument(
+        "--workers",
+        help="In serve and sweep modes, amount of scenes to run at the same time",
+        type=int,
+    )
     parser.add_argument(
         "-a",
         "--analytics",
-        help="Perform analytics and generate graphs",
+        help="Perform analytics and generate graphs, from the local analytics folder if one is set",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--metrics_port",
+        help="Serve live metrics of the execution at this local port (/metrics, /metrics.json), 0 for any free one",
+        type=int,
+        default=int(constants.METRICS_PORT) if constants.METRICS_PORT else None,
+    )
+    parser.add_argument(
+        "--rebuild_rollups",
+        help="With --analytics, compute the daily rollups the graphs are made from again, from all the records",
         action="store_true",
     )
     args = parser.parse_args()
 
+    if args.command == "serve" and args.port is None:
+        utils.set_logging_stream(sys.stderr)  # stdout is left for the results
+
+    # Startup logging
+    LOGGER.info("STARTED all_nodes")
+
+    if args.quiet:
+        utils.set_quiet_mode()
+    if args.spill_threshold_mb is not None:
+        SPILL_STORE.set_threshold_mb(args.spill_threshold_mb)
+    if args.resource_limits:
+        RM.set_limits(resources.parse_limits(" ".join(args.resource_limits)))
+
     if not os.getenv("IN_DEV"):
         LOGGER.info("For launching in DEBUG mode, set env variable 'IN_DEV'")
 
     # Analytics ----------------------
     if args.analytics:
-        analytics.process_analytics()
+        if LOCAL_ANALYTICS.enabled:
+            if args.rebuild_rollups:
+                LOCAL_ANALYTICS.rebuild_rollups()
+            analytics.process_analytics(LOCAL_ANALYTICS)
+        else:
+            if args.rebuild_rollups:
+                analytics.rebuild_rollups()
+            analytics.process_analytics()
         sys.exit(0)
 
+    # Metrics ----------------------
+    if args.metrics_port is not None:
+        MetricsServer().start(args.metrics_port, args.host)
+
+    # Service mode ----------------------
+    if args.command == "serve":
+        launch_service(args.port, args.host, args.workers)
+
     # GUI mode ----------------------
-    if not args.scene_file:
+    elif not args.scene_file:
         launch_gui()
 
+    # Parameter sweep mode ----------------------
+    elif args.sweep:
+        launch_sweep(
+            args.scene_file,
+            args.sweep,
+            args.sweep_output,
+            args.workers,
+            args.set_parameters,
+            args.conserve_memory,
+            args.timeout,
+            args.node_timeout,
+        )
+
     # Non-GUI batch mode ----------------------
     else:
-        launch_batch(args.scene_file, args.set_parameters)
+        success = launch_batch(
+            args.scene_file,
+            args.set_parameters,
+            args.conserve_memory,
+            args.profile,
+            args.profile_code,
+            args.profile_classes,
+            args.profile_engine,
+            args.results,
+            args.results_outputs,
+            args.timeout,
+            args.node_timeout,
+        )
+        if not success:
+            sys.exit(1)
 
 
 if __name__ == "__main__":
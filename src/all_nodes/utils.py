@@ -5,35 +5,125 @@ __credits__ = []
 __license__ = "MIT License"
 
 
+import contextlib
+import copy
 import logging
+import os
 import re
+import reprlib
 import sys
+import tempfile
 
 from colorama import Fore, Style
-from PySide2 import QtGui
 
 from all_nodes import constants
 
 
 # -------------------------------- LOGGING -------------------------------- #
+LOGGERS = dict()  # All loggers created through get_logger, by name
+_logging_level = constants.LOGGING_LEVEL
+_logging_stream = None  # None means sys.stdout
+
+
 def get_logger(logger_name: str) -> logging.Logger:
     """Get a logger with a specific formatting
 
+    The console handler is only attached the first time a logger is requested, so getting the same logger again
+    does not duplicate its output.
+
     Args:
         logger_name (str)
 
     Returns:
         logging.Logger
     """
+    if logger_name in LOGGERS:
+        return LOGGERS[logger_name]
+
     logger = logging.getLogger(logger_name)
-    logger.setLevel(constants.LOGGING_LEVEL)
-    console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setLevel(constants.LOGGING_LEVEL)
+    logger.setLevel(_logging_level)
+    console_handler = logging.StreamHandler(_logging_stream or sys.stdout)
+    console_handler.setLevel(_logging_level)
     console_handler.setFormatter(constants.CONSOLE_LOG_FORMATTER)
     logger.addHandler(console_handler)
+    LOGGERS[logger_name] = logger
     return logger
 
 
+def set_logging_level(level: int):
+    """Set the level of all loggers, including the ones created from now on
+
+    Args:
+        level (int): such as logging.WARNING
+    """
+    global _logging_level
+    _logging_level = level
+    for logger in LOGGERS.values():
+        logger.setLevel(level)
+        for handler in logger.handlers:
+            handler.setLevel(level)
+
+
+def set_logging_stream(stream):
+    """Send the output of all loggers to a stream, including the ones created from now on
+
+    Args:
+        stream (io.TextIOBase): such as sys.stderr
+    """
+    global _logging_stream
+    _logging_stream = stream
+    for logger in LOGGERS.values():
+        for handler in logger.handlers:
+            handler.setStream(stream)
+
+
+def set_quiet_mode(quiet: bool = True):
+    """Only log warnings and errors, for high-throughput batch runs
+
+    Args:
+        quiet (bool, optional): Defaults to True. If False, restores the default logging level
+    """
+    set_logging_level(
+        constants.QUIET_LOGGING_LEVEL if quiet else constants.LOGGING_LEVEL
+    )
+
+
+_SHORT_REPR = reprlib.Repr()
+_SHORT_REPR.maxstring = constants.LOG_REPR_MAX_LENGTH
+_SHORT_REPR.maxother = constants.LOG_REPR_MAX_LENGTH
+
+
+def short_repr(value) -> str:
+    """Get a representation of a value that is safe to log, no matter how big the value is
+
+    Args:
+        value (object)
+
+    Returns:
+        str: representation, truncated to constants.LOG_REPR_MAX_LENGTH characters
+    """
+    text = _SHORT_REPR.repr(value)
+    if len(text) > constants.LOG_REPR_MAX_LENGTH:
+        text = text[: constants.LOG_REPR_MAX_LENGTH - 3] + "..."
+    return text
+
+
+class LazyRepr:
+    """Wrapper to pass values as logging arguments, they are only represented if the message is actually emitted
+
+    Example:
+        LOGGER.debug("New value: %s", LazyRepr(value))
+    """
+
+    __slots__ = ("value",)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __str__(self):
+        return short_repr(self.value)
+
+
 LOGGER = get_logger(__name__)
 
 
@@ -69,18 +159,86 @@ def parse_datatype(datatype_str):
     return re.search("'(.+)'", datatype_str).group(1)
 
 
-# -------------------------------- GUI UTILITY -------------------------------- #
-def get_bright_color(color_name):
-    """Given a color name, get a fully saturated and bright version of it
+# -------------------------------- VALUE UTILITY -------------------------------- #
+IMMUTABLE_TYPES = (type(None), bool, int, float, complex, str, bytes, range, frozenset)
+
+
+def copy_value(value):
+    """Get a copy of a value that can be modified without affecting the original
+
+    The cheapest copy that is safe is used:
+        - Immutable values are returned as they are
+        - NumPy arrays, polars frames/series and PIL images use their own copy methods (a single buffer copy, or
+          a shallow clone in the case of polars, which never modifies its buffers in place)
+        - Lists, dicts, sets and tuples of immutable values get a shallow copy
+        - Anything else is deep-copied
 
     Args:
-        color_name (str): name of the color to saurate
+        value (object)
 
     Returns:
-        str: name of the saturated color
+        object: the copy
     """
-    base_color = QtGui.QColor(color_name)
-    h = base_color.hue()
+    if isinstance(value, IMMUTABLE_TYPES):
+        return value
+
+    # Only check types of modules that are already imported, these are never imported just for this
+    numpy = sys.modules.get("numpy")
+    if numpy is not None and isinstance(value, numpy.ndarray):
+        return value.copy()
+    polars = sys.modules.get("polars")
+    if polars is not None and isinstance(value, (polars.DataFrame, polars.Series)):
+        return value.clone()
+    pil_image = sys.modules.get("PIL.Image")
+    if pil_image is not None and isinstance(value, pil_image.Image):
+        return value.copy()
+
+    if isinstance(value, (list, set, tuple)):
+        if all(isinstance(item, IMMUTABLE_TYPES) for item in value):
+            return value if isinstance(value, tuple) else value.copy()
+    elif isinstance(value, dict):
+        if all(isinstance(item, IMMUTABLE_TYPES) for item in value.values()):
+            return value.copy()
+
+    return copy.deepcopy(value)
+
+
+# -------------------------------- FILE UTILITY -------------------------------- #
+# Read once, as it can only be read by setting it, and it is process-wide
+UMASK = os.umask(0)
+os.umask(UMASK)
 
-    bright_color = QtGui.QColor.fromHsv(h, 255, 255)
-    return bright_color.name()
+
+@contextlib.contextmanager
+def atomic_write(filepath: str, mode: str = "w"):
+    """Open a temporary file next to the given filepath, and only move it over that filepath
+    once it has been completely written. A crash while writing never leaves a half-written file.
+
+    Args:
+        filepath (str): final path of the file
+        mode (str, optional): mode to open the temporary file with. Defaults to "w".
+
+    Yields:
+        file object to write to
+    """
+    directory = os.path.dirname(os.path.abspath(filepath))
+    fd, temp_path = tempfile.mkstemp(
+        dir=directory, prefix="." + os.path.basename(filepath) + ".", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(fd, mode) as file:
+            yield file
+            file.flush()
+            os.fsync(file.fileno())
+
+        # Keep the permissions of the file being replaced (mkstemp creates it as 0600)
+        if os.path.exists(filepath):
+            os.chmod(temp_path, os.stat(filepath).st_mode)
+        else:
+            os.chmod(temp_path, 0o666 & ~UMASK)
+
+        os.replace(temp_path, filepath)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
@@ -4,11 +4,24 @@ __credits__ = []
 __license__ = "MIT License"
 
 
+import os
+import tempfile
+import time
 import unittest
 
 import pymongo
 
+try:
+    import mongomock
+except ImportError:
+    mongomock = None
+
+from all_nodes import constants
 from all_nodes.analytics import analytics
+from all_nodes.analytics.local_store import LocalAnalyticsStore
+from all_nodes.analytics.records import AnalyticsRecorder
+from all_nodes.analytics import rollups
+from all_nodes.analytics.spool import AnalyticsSpool
 from all_nodes.logic.logic_scene import LogicScene
 from all_nodes import utils
 
@@ -56,3 +69,323 @@ class StatisticsTesting(unittest.TestCase):
         n_1.run_single()
 
         analytics.submit_bulk_analytics([n_1.get_node_full_dict()])
+
+    def test_connection_backoff(self):
+        """
+        Once the DB cannot be reached, do not try again until the backoff has passed
+        """
+        utils.print_test_header("test_connection_backoff")
+
+        created_clients = []
+
+        def client_factory(*args, **kwargs):
+            kwargs["serverSelectionTimeoutMS"] = 100
+            created_clients.append(pymongo.MongoClient(*args, **kwargs))
+            return created_clients[-1]
+
+        connection = analytics.MongoConnection(
+            "mongodb://127.0.0.1:1", client_factory=client_factory
+        )
+        self.assertIsNone(connection.get_client())
+        self.assertIsNone(connection.get_client())
+        self.assertEqual(len(created_clients), 1)
+
+    @unittest.skipUnless(mongomock, "mongomock is not installed")
+    def test_shared_client(self):
+        """
+        Submission and queries reuse the same client
+        """
+        utils.print_test_header("test_shared_client")
+
+        connection = analytics.MongoConnection(
+            "mongodb://localhost", client_factory=mongomock.MongoClient
+        )
+        client = connection.get_client()
+        self.assertIs(connection.get_client(), client)
+
+        table = client[analytics.ALL_NODES_DB][analytics.ALL_NODES_TABLE]
+        table.insert_many([{"class_name": "EmptyNode"}])
+        self.assertEqual(len(list(table.find({"class_name": "EmptyNode"}))), 1)
+
+    @unittest.skipUnless(mongomock, "mongomock is not installed")
+    def test_query_without_rollups(self):
+        """
+        Reports are made from the records while there are no rollups
+        """
+        utils.print_test_header("test_query_without_rollups")
+
+        mongo = analytics.MONGO
+        analytics.MONGO = analytics.MongoConnection(
+            "mongodb://localhost", client_factory=mongomock.MongoClient
+        )
+        try:
+            records = [
+                {
+                    "class_name": class_name,
+                    "success": success,
+                    "run_date": rollups.get_latency_cutoff(),
+                    "execution_time": execution_time,
+                    "IS_CONTEXT": False,
+                }
+                for class_name, success, execution_time in [
+                    ("EmptyNode", constants.SUCCESSFUL, 0.0005),
+                    ("EmptyNode", constants.SUCCESSFUL, 0.003),
+                    ("FailNode", constants.FAILED, 0.02),
+                ]
+            ]
+            analytics.get_collection().insert_many(records)
+
+            self.assertEqual(analytics.query_recent_usage()["count"].to_list(), [3])
+            most_used = analytics.query_most_used()
+            self.assertEqual(
+                most_used["class_name"].to_list(), ["EmptyNode", "FailNode"]
+            )
+            failed = analytics.query_last_with_status(constants.FAILED)
+            self.assertEqual(failed["class_name"].to_list(), ["FailNode"])
+            latencies = analytics.query_latencies()
+            self.assertEqual(latencies["count"].to_list(), [2, 1])
+            self.assertEqual(latencies["p99"].to_list(), [0.004, 0.032])
+        finally:
+            analytics.MONGO = mongo
+
+    @unittest.skipUnless(mongomock, "mongomock is not installed")
+    def test_insert_records_retried(self):
+        """
+        Records are counted once in the rollups, even if their insert is retried after the rollups failed
+        """
+        utils.print_test_header("test_insert_records_retried")
+
+        mongo = analytics.MONGO
+        update_rollups = analytics.update_rollups
+        analytics.MONGO = analytics.MongoConnection(
+            "mongodb://localhost", client_factory=mongomock.MongoClient
+        )
+        try:
+            records = [
+                {
+                    "_id": f"record_{i}",
+                    "class_name": "EmptyNode",
+                    "success": constants.SUCCESSFUL,
+                    "run_date": rollups.get_latency_cutoff(),
+                    "execution_time": 0.003,
+                    "IS_CONTEXT": False,
+                }
+                for i in range(3)
+            ]
+
+            def fail_update_rollups(*args):
+                raise pymongo.errors.PyMongoError("Rollups unavailable")
+
+            analytics.update_rollups = fail_update_rollups
+            self.assertFalse(analytics.insert_records(records))
+            analytics.update_rollups = update_rollups
+            self.assertTrue(analytics.insert_records(records))
+            self.assertTrue(analytics.insert_records(records))
+
+            rollups_table = analytics.get_collection(analytics.ALL_NODES_ROLLUPS_TABLE)
+            # A single daily rollup
+            self.assertEqual([doc["count"] for doc in rollups_table.find()], [3])
+            self.assertEqual(analytics.query_recent_usage()["count"].to_list(), [3])
+
+            # A claim that was added already is not added again
+            analytics.update_rollups(records, rollups_table, "claim")
+            analytics.update_rollups(records, rollups_table, "claim")
+            self.assertEqual([doc["count"] for doc in rollups_table.find()], [6])
+        finally:
+            analytics.update_rollups = update_rollups
+            analytics.MONGO = mongo
+
+    def test_spool_offline(self):
+        """
+        Records submitted while offline are kept in the spool and uploaded once online
+        """
+        utils.print_test_header("test_spool_offline")
+
+        uploaded = []
+        online = False
+
+        def upload(records):
+            if online:
+                uploaded.extend(records)
+            return online
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            spool_file = os.path.join(temp_dir, "spool.sqlite")
+
+            spool = AnalyticsSpool(spool_file, upload=upload)
+            spool.FLUSH_INTERVAL = 0.05
+            spool.submit([{"class_name": "EmptyNode", "run": i} for i in range(3)])
+            self.assertTrue(spool.flush(5))
+            spool.close()
+            self.assertEqual(spool.count_spooled(), 3)
+            self.assertEqual(uploaded, [])
+
+            # Back online, in a new session
+            online = True
+            spool = AnalyticsSpool(spool_file, upload=upload)
+            spool.FLUSH_INTERVAL = 0.05
+            spool.submit([{"class_name": "EmptyNode", "run": 3}])
+            for _ in range(100):
+                if len(uploaded) == 4:
+                    break
+                time.sleep(0.05)
+            spool.close()
+
+            self.assertEqual(spool.count_spooled(), 0)
+        self.assertEqual(sorted(r["run"] for r in uploaded), [0, 1, 2, 3])
+        self.assertEqual(len({r["_id"] for r in uploaded}), 4)
+
+    def test_record_nested_contexts(self):
+        """
+        Nodes are recorded as they finish, including the nodes inside contexts, with compact values
+        """
+        utils.print_test_header("test_record_nested_contexts")
+
+        submitted = []
+
+        logic_scene = LogicScene()
+        n_1 = logic_scene.add_node_by_name("EnvironToYmlCtx")
+        n_2 = logic_scene.add_node_by_name("StrInput")
+        n_2.set_attribute_value("internal_str", "x" * 1000)
+
+        recorder = AnalyticsRecorder(submitted.extend)
+        recorder.attach(logic_scene)
+        logic_scene.run_all_nodes_batch()
+        recorder.close()
+
+        expected_nodes = list(AnalyticsRecorder.walk_nodes(logic_scene))
+        self.assertGreater(len(expected_nodes), 2)
+        self.assertEqual(
+            sorted(r["uuid"] for r in submitted),
+            sorted(n.uuid for n in expected_nodes),
+        )
+        internal_records = [r for r in submitted if r["context"] == n_1.full_name]
+        self.assertEqual(len(internal_records), n_1.internal_scene.node_count())
+        self.assertTrue(all(r["success"] == constants.SUCCESSFUL for r in submitted))
+
+        str_record = next(r for r in submitted if r["uuid"] == n_2.uuid)
+        out_str = str_record["attributes"][n_2["out_str"].dot_name]
+        self.assertEqual(out_str["size"], 1000)
+        self.assertLess(len(out_str["value"]), 1000)
+        self.assertIn("hash", out_str)
+
+    def test_record_loop_iterations(self):
+        """
+        Nodes inside loops get one record per iteration, reported by the nodes themselves and not by their signals
+        """
+        utils.print_test_header("test_record_loop_iterations")
+
+        submitted = []
+
+        logic_scene = LogicScene()
+        logic_scene.load_from_file("loop_example")
+        recorder = AnalyticsRecorder(submitted.extend)
+        recorder.attach(logic_scene)
+        logic_scene.run_all_nodes_batch()
+        recorder.close()
+
+        self.assertEqual(
+            len([r for r in submitted if r["node_name"] == "PrintToConsole_1"]), 3
+        )
+        self.assertTrue(
+            all(not n.analytics_recorders for n in recorder.walk_nodes(logic_scene))
+        )
+
+    def test_local_store(self):
+        """
+        Store the records of a run locally, and query them without the DB
+        """
+        utils.print_test_header("test_local_store")
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            store = LocalAnalyticsStore(temp_dir)
+
+            logic_scene = LogicScene()
+            logic_scene.add_node_by_name("EmptyNode")
+            logic_scene.add_node_by_name("EmptyNode")
+            logic_scene.add_node_by_name("FailNode")
+            logic_scene.add_node_by_name("StrInput")
+
+            recorder = AnalyticsRecorder(store.submit, flush=store.flush)
+            recorder.attach(logic_scene)
+            logic_scene.run_all_nodes_batch()
+            recorder.close()
+
+            recent_usage = store.query_recent_usage()
+            self.assertEqual(recent_usage["count"].sum(), 4)
+
+            most_used = store.query_most_used()
+            self.assertEqual(
+                most_used["class_name"].to_list(), ["EmptyNode", "FailNode"]
+            )
+            self.assertEqual(most_used["count"].to_list(), [2, 1])
+
+            failed = store.query_last_with_status(constants.FAILED)
+            self.assertEqual(failed["class_name"].to_list(), ["FailNode"])
+            errored = store.query_last_with_status(constants.ERROR)
+            self.assertEqual(errored["class_name"].to_list(), ["StrInput"])  # No value
+
+            # Rollups are the same when computed again from the records
+            latencies = store.query_latencies()
+            store.rebuild_rollups()
+            self.assertTrue(store.query_latencies().equals(latencies))
+            self.assertEqual(store.query_most_used()["count"].to_list(), [2, 1])
+
+    def test_local_store_writer(self):
+        """
+        Records submitted to the local store are written in the background, once enough of them are waiting
+        """
+        utils.print_test_header("test_local_store_writer")
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            store = LocalAnalyticsStore(temp_dir)
+            store.BATCH_SIZE = 3
+            records = [
+                {
+                    "class_name": "EmptyNode",
+                    "success": constants.SUCCESSFUL,
+                    "run_date": "2024-01-01",
+                    "execution_time": 0.1,
+                }
+            ] * 4
+            try:
+                store.submit(records[:2])
+                time.sleep(0.2)
+                self.assertIsNone(store.scan())  # Waiting for more records
+
+                store.submit(records[2:])
+                deadline = time.time() + 10
+                while store.scan() is None and time.time() < deadline:
+                    time.sleep(0.05)
+            finally:
+                store.close()
+
+            self.assertEqual(store.scan().collect().height, 4)
+            self.assertEqual(store.query_recent_usage()["count"].sum(), 4)
+
+    def test_rollup_percentiles(self):
+        """
+        Estimate percentiles of execution times from the daily rollups
+        """
+        utils.print_test_header("test_rollup_percentiles")
+
+        records = [
+            {
+                "run_date": "2024-01-01",
+                "class_name": "EmptyNode",
+                "success": constants.SUCCESSFUL,
+                "execution_time": 0.001 * i,
+            }
+            for i in range(1, 101)
+        ]
+        increments = rollups.build_increments(records)
+        self.assertEqual(len(increments), 1)
+        increment = list(increments.values())[0]
+        self.assertEqual(increment["count"], 100)
+
+        latencies = rollups.summarize_latencies(
+            [("EmptyNode", increment["count"], increment["buckets"])]
+        )
+        p50, p90, p99 = latencies.row(0)[2:]
+        self.assertTrue(0.05 <= p50 < 0.1)
+        self.assertTrue(0.09 <= p90 <= p99 <= 0.2)
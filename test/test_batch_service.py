@@ -0,0 +1,128 @@
+__author__ = "Jaime Rivera <jaime.rvq@gmail.com>"
+__copyright__ = "Copyright 2022, Jaime Rivera"
+__credits__ = []
+__license__ = "MIT License"
+
+
+import json
+import os
+import tempfile
+import unittest
+
+from all_nodes import constants
+from all_nodes.logic import batch_service
+from all_nodes.logic import parameter_sweep
+from all_nodes.logic.batch_service import BatchService
+from all_nodes import utils
+
+
+# -------------------------------- TESTS -------------------------------- #
+class BatchServiceTesting(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.service = BatchService(max_workers=4)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.service.shutdown()
+
+    def test_run_request(self):
+        """
+        Run a scene twice from the same template, with different parameters.
+        """
+        utils.print_test_header("test_run_request")
+
+        for element in ["A", "B"]:
+            result = self.service.run_request(
+                {
+                    "id": element,
+                    "scene": "loop_example",
+                    "parameters": {"StrInput_1.internal_str": element},
+                }
+            )
+            self.assertEqual(result["id"], element)
+            self.assertEqual(result["status"], constants.SUCCESSFUL)
+            self.assertEqual(result["nodes"]["PrintToConsole_1"], constants.SUCCESSFUL)
+
+    def test_serve_lines(self):
+        """
+        Serve several requests at once, including broken ones.
+        """
+        utils.print_test_header("test_serve_lines")
+
+        lines = [json.dumps({"id": i, "scene": "loop_example"}) for i in range(6)] + [
+            "not json",
+            json.dumps({"id": "missing", "scene": "fake_scene"}),
+        ]
+        sent = []
+        self.service.serve_lines(lines, sent.append)
+
+        results = [json.loads(line) for line in sent]
+        finished = {
+            r["id"]: r["status"]
+            for r in results
+            if r.get("status") != constants.EXECUTING and "id" in r
+        }
+        self.assertEqual([finished[i] for i in range(6)], [constants.SUCCESSFUL] * 6)
+        self.assertEqual(finished["missing"], constants.ERROR)
+        self.assertEqual(len([r for r in results if "id" not in r]), 1)
+
+    def test_serve_lines_broken_writer(self):
+        """
+        Stop serving requests once the results cannot be sent back.
+        """
+        utils.print_test_header("test_serve_lines_broken_writer")
+
+        read_lines = []
+
+        def lines():
+            for i in range(100):
+                read_lines.append(i)
+                yield json.dumps({"id": i, "scene": "loop_example"})
+
+        def write_line(line):
+            raise BrokenPipeError("Client disconnected")
+
+        with self.assertLogs(batch_service.LOGGER, "ERROR") as logs:
+            self.service.serve_lines(lines(), write_line)
+
+        self.assertLess(len(read_lines), 100)
+        self.assertIn("Client disconnected", logs.output[0])
+
+    def test_parameter_sweep(self):
+        """
+        Sweep a scene over a grid of parameters, in several processes.
+        """
+        utils.print_test_header("test_parameter_sweep")
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            grid_file = os.path.join(temp_dir, "grid.json")
+            with open(grid_file, "w") as file:
+                json.dump(
+                    {
+                        "StrInput_1.internal_str": ["A", "B"],
+                        "ListInput_1.internal_list": ["[1]", "[1, 2]"],
+                    },
+                    file,
+                )
+            parameter_sets = parameter_sweep.read_parameter_sets(grid_file)
+            self.assertEqual(len(parameter_sets), 4)
+
+            output_file = os.path.join(temp_dir, "results.parquet")
+            results = parameter_sweep.run_sweep(
+                "loop_example",
+                parameter_sets,
+                output_file,
+                workers=2,
+                base_request={
+                    "parameters": {"StrInput_1.internal_str": "Base"},
+                    "timeout": 60,
+                },
+            )
+            self.assertTrue(os.path.isfile(output_file))
+
+        self.assertEqual(results["set_index"].to_list(), [0, 1, 2, 3])
+        self.assertEqual(
+            results["StrInput_1.internal_str"].to_list(), ["A", "A", "B", "B"]
+        )
+        self.assertEqual(results["status"].to_list(), [constants.SUCCESSFUL] * 4)
@@ -4,11 +4,15 @@ __credits__ = []
 __license__ = "MIT License"
 
 
+import json
+import os
+import tempfile
 import unittest
 
 from all_nodes import constants
 from all_nodes.logic.logic_scene import LogicScene
 from all_nodes.logic.logic_scene import LogicSceneError
+from all_nodes.logic.results_writer import ResultsWriter
 from all_nodes import utils
 
 
@@ -59,3 +63,48 @@ class ContextTesting(unittest.TestCase):
         n_1["COMPLETED"].connect_to_other(n_2["START"])
 
         n_1.run_chain()
+
+    def test_context_nodes_timeout(self):
+        """
+        Set a time limit to the nodes inside a context, but not to the context itself.
+        """
+        utils.print_test_header("test_context_nodes_timeout")
+
+        logic_scene = LogicScene()
+        n_1 = logic_scene.add_node_by_name("EnvironToYmlCtx")
+        n_2 = logic_scene.add_node_by_name("EmptyNode")
+        logic_scene.set_nodes_timeout(10)
+
+        self.assertIsNone(n_1.timeout)
+        self.assertEqual(n_2.timeout, 10)
+        internal_nodes = n_1.internal_scene.all_logic_nodes
+        self.assertTrue(internal_nodes)
+        self.assertTrue(all(n.timeout == 10 for n in internal_nodes))
+
+    def test_context_write_results(self):
+        """
+        Write the results of the nodes inside a context too.
+        """
+        utils.print_test_header("test_context_write_results")
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            results_file = os.path.join(temp_dir, "results.jsonl")
+
+            logic_scene = LogicScene()
+            n_1 = logic_scene.add_node_by_name("EnvironToYmlCtx")
+            results_writer = ResultsWriter(results_file)
+            results_writer.attach(logic_scene)
+            logic_scene.run_all_nodes_batch()
+            results_writer.close()
+
+            with open(results_file) as file:
+                records = [json.loads(line) for line in file]
+
+        internal_nodes = n_1.internal_scene.all_logic_nodes
+        self.assertEqual(
+            sorted(r["node_name"] for r in records),
+            sorted([n_1.full_name] + [n.full_name for n in internal_nodes]),
+        )
+        self.assertTrue(
+            all(r["status"] == constants.SUCCESSFUL for r in records), records
+        )
@@ -4,13 +4,28 @@ __credits__ = []
 __license__ = "MIT License"
 
 
+import importlib.util
+import json
 import os
+import pstats
+import subprocess
+import sys
+import threading
+import time
 import unittest
 import tempfile
+import urllib.request
 
 from all_nodes import constants
+from all_nodes.logic.global_signaler import GLOBAL_SIGNALER as GS
 from all_nodes.logic.logic_scene import LogicScene
 from all_nodes.logic.logic_scene import LogicSceneError
+from all_nodes.logic.metrics import ENGINE_METRICS as EM
+from all_nodes.logic.metrics import MetricsServer
+from all_nodes.logic.profiler import CodeProfiler, ExecutionProfiler
+from all_nodes.logic.resources import RESOURCE_MANAGER as RM
+from all_nodes.logic.results_writer import ResultsWriter
+from all_nodes.logic.spill_store import SPILL_STORE, SpilledValue
 from all_nodes import utils
 
 
@@ -37,6 +52,14 @@ class LogicSceneTesting(unittest.TestCase):
         logic_scene.add_node_by_name("FailNode")
         self.assertEqual(logic_scene.node_count(), 4)
 
+    def test_logic_scene_global_slots(self):
+        utils.print_test_header("test_logic_scene_global_slots")
+
+        slots_count = len(GS.signals.execution_finished._slots)
+        for _ in range(10):
+            LogicScene()
+        self.assertEqual(len(GS.signals.execution_finished._slots), slots_count)
+
     def test_create_toml_nodes(self):
         """Create nodes registered in toml files"""
         utils.print_test_header("test_create_toml_nodes")
@@ -101,6 +124,108 @@ class LogicSceneTesting(unittest.TestCase):
         self.assertEqual(n_1.success, constants.SUCCESSFUL)
         self.assertEqual(n_2.success, constants.SUCCESSFUL)
 
+    def test_run_scene_in_thread(self):
+        utils.print_test_header("test_run_scene_in_thread")
+
+        logic_scene = LogicScene()
+        n_1 = logic_scene.add_node_by_name("GetEnvVariable")
+        n_1["env_variable_name"].set_value("DUMMY_VAR")
+        n_1["fallback_value"].set_value("NO_DUMMY_VAR_FOUND")
+
+        finished = threading.Event()
+        GS.signals.execution_finished.connect(finished.set)
+        try:
+            logic_scene.run_list_of_nodes([n_1])
+            self.assertTrue(finished.wait(10))
+        finally:
+            GS.signals.execution_finished.disconnect(finished.set)
+
+        self.assertEqual(n_1["env_variable_value"].get_value(), "NO_DUMMY_VAR_FOUND")
+        self.assertEqual(n_1.success, constants.SUCCESSFUL)
+
+    def test_import_without_qt(self):
+        """
+        The logic layer must be usable without importing Qt
+        """
+        utils.print_test_header("test_import_without_qt")
+
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+        out = subprocess.check_output(
+            [
+                sys.executable,
+                "-c",
+                "import sys; from all_nodes.logic.logic_scene import LogicScene; "
+                "print('PySide2' in sys.modules)",
+            ],
+            env=env,
+            text=True,
+        )
+        self.assertEqual(out.strip(), "False")
+
+    @unittest.skipUnless(
+        importlib.util.find_spec("PySide2"), "PySide2 is not installed"
+    )
+    def test_run_scene_with_qt_dispatcher(self):
+        """
+        With the GUI dispatcher, signals from worker threads keep every emission in order, only slots that ask for it
+        get repeated emissions merged
+        """
+        utils.print_test_header("test_run_scene_with_qt_dispatcher")
+
+        from PySide2 import QtCore
+
+        from all_nodes.graphic.graphic_utils import QtDispatcher
+        from all_nodes.logic import signals
+
+        def run_loop_scene():
+            logic_scene = LogicScene()
+            logic_scene.load_from_file("loop_example")
+            finished, latest = [], []
+            for node in logic_scene.all_logic_nodes:
+                node.signaler.finished.connect(
+                    lambda node=node: finished.append(node.node_name)
+                )
+                node.signaler.finished.connect(
+                    lambda node=node: latest.append(node.node_name), coalesce=True
+                )
+            thread = threading.Thread(target=logic_scene.run_all_nodes_batch)
+            thread.start()
+            thread.join()
+            return finished, latest
+
+        direct_finished, _ = run_loop_scene()
+
+        app = QtCore.QCoreApplication.instance() or QtCore.QCoreApplication([])
+        dispatcher = QtDispatcher()
+        signals.set_dispatcher(dispatcher.dispatch)
+        feedback = []
+
+        def add_feedback(*args):
+            feedback.append(args)
+
+        GS.signals.main_screen_feedback.connect(add_feedback)
+        try:
+            finished, latest = run_loop_scene()
+            thread = threading.Thread(
+                target=lambda: [
+                    GS.signals.main_screen_feedback.emit(message, 0)
+                    for message in ["A", "B", "A"]
+                ]
+            )
+            thread.start()
+            thread.join()
+            self.assertFalse(finished)  # Waiting for the GUI thread
+            dispatcher.flush()
+            app.processEvents()
+        finally:
+            signals.set_dispatcher()
+            GS.signals.main_screen_feedback.disconnect(add_feedback)
+
+        self.assertEqual(finished, direct_finished)
+        self.assertEqual(finished.count("PrintToConsole_1"), 3)
+        self.assertEqual(latest.count("PrintToConsole_1"), 1)
+        self.assertEqual(feedback, [("A", 0), ("B", 0), ("A", 0)])
+
     def test_run_scene_with_notification(self):
         utils.print_test_header("run_scene_with_notification")
 
@@ -157,6 +282,62 @@ class LogicSceneTesting(unittest.TestCase):
         self.assertTrue(os.path.isfile(temp.name))
         self.assertTrue(n_1.success, constants.SUCCESSFUL)
 
+    def test_write_scene_to_file_after_spilling(self):
+        utils.print_test_header("test_write_scene_to_file_after_spilling")
+
+        logic_scene = LogicScene()
+        n = logic_scene.add_node_by_name("StrInput")
+        n.set_attribute_value("internal_str", "TEST" * 100)
+        SPILL_STORE.set_threshold_mb(0.0001)
+        try:
+            logic_scene.run_all_nodes_batch()
+        finally:
+            SPILL_STORE.set_threshold_mb(0)
+        self.assertIsInstance(n["out_str"].value, SpilledValue)
+
+        temp = tempfile.NamedTemporaryFile(suffix=".yaml", delete=False)
+        temp.close()
+        logic_scene.save_to_file(temp.name)
+
+        reloaded_scene = LogicScene()
+        reloaded_scene.load_from_file(temp.name)
+        reloaded_node = reloaded_scene.to_node(n.node_name)
+        self.assertEqual(reloaded_node["internal_str"].value, "TEST" * 100)
+        self.assertIsNone(reloaded_node["out_str"].value)
+
+    def test_write_scene_to_file_incremental(self):
+        utils.print_test_header("test_write_scene_to_file_incremental")
+
+        logic_scene = LogicScene()
+        logic_scene.load_from_file("loop_example")
+
+        temp_dir = tempfile.mkdtemp()
+        full_save = os.path.join(temp_dir, "full.yml")
+        incremental_save = os.path.join(temp_dir, "incremental.yml")
+        logic_scene.save_to_file(incremental_save)
+
+        n = logic_scene.to_node("StrInput_1")
+        revision = n.revision
+        n.set_attribute_value("internal_str", "CHANGED")
+        self.assertGreater(n.revision, revision)
+
+        logic_scene.save_to_file(incremental_save, incremental=True)
+        logic_scene.save_to_file(full_save)
+        with open(full_save) as f_1, open(incremental_save) as f_2:
+            self.assertEqual(
+                f_1.read().splitlines()[2:-2], f_2.read().splitlines()[2:-2]
+            )
+
+        # Only the final files remain, no temporary files
+        self.assertEqual(sorted(os.listdir(temp_dir)), ["full.yml", "incremental.yml"])
+
+        reloaded_scene = LogicScene()
+        reloaded_scene.load_from_file(incremental_save)
+        self.assertEqual(
+            reloaded_scene.to_node("StrInput_1").get_attribute_value("internal_str"),
+            "CHANGED",
+        )
+
     def test_load_scene_from_file(self):
         utils.print_test_header("test_load_scene_from_file")
 
@@ -186,6 +367,55 @@ class LogicSceneTesting(unittest.TestCase):
             )
         print(e.exception)
 
+    def test_load_scene_from_file_with_progress(self):
+        utils.print_test_header("test_load_scene_from_file_with_progress")
+
+        progress = []
+        logic_scene = LogicScene()
+        logic_scene.load_from_file(
+            os.path.join(self.FIXTURES_FOLDER, "environ_to_yaml_and_json.yml"),
+            chunk_size=4,
+            progress_callback=lambda *args: progress.append(args),
+        )
+        self.assertEqual(logic_scene.node_count(), 9)
+        self.assertEqual(
+            progress,
+            [
+                ("nodes", 4, 9),
+                ("nodes", 8, 9),
+                ("nodes", 9, 9),
+                ("connections", 4, 12),
+                ("connections", 8, 12),
+                ("connections", 12, 12),
+            ],
+        )
+
+        n = logic_scene.to_node("DictToJson_2")
+        self.assertEqual(len(n.get_out_connections()), 2)
+
+    def test_load_scene_from_file_cyclic(self):
+        utils.print_test_header("test_load_scene_from_file_cyclic")
+
+        logic_scene = LogicScene()
+        with self.assertRaises(LogicSceneError) as e:
+            logic_scene.load_from_file(
+                os.path.join(self.FIXTURES_FOLDER, "cyclic_scene.yml")
+            )
+        print(e.exception)
+
+    def test_load_scene_from_file_cyclic_leaves_scene_untouched(self):
+        utils.print_test_header(
+            "test_load_scene_from_file_cyclic_leaves_scene_untouched"
+        )
+
+        logic_scene = LogicScene()
+        logic_scene.add_node_by_name("EmptyNode")
+        with self.assertRaises(LogicSceneError):
+            logic_scene.load_from_file(
+                os.path.join(self.FIXTURES_FOLDER, "cyclic_scene.yml")
+            )
+        self.assertEqual(logic_scene.node_count(), 1)
+
     def test_load_scene_from_alias(self):
         utils.print_test_header("test_load_scene_from_alias")
 
@@ -277,3 +507,250 @@ class LogicSceneTesting(unittest.TestCase):
 
         empty_node_2 = logic_scene.to_node("EmptyNode_2")
         assert empty_node_2.execution_counter == 1
+
+    def test_scene_with_loop_conserve_memory(self):
+        utils.print_test_header("test_scene_with_loop_conserve_memory")
+
+        logic_scene = LogicScene()
+        logic_scene.load_from_file("loop_example")
+        logic_scene.run_all_nodes_batch(conserve_memory=True)
+
+        print_1 = logic_scene.to_node("PrintToConsole_1")
+        assert print_1.execution_counter == 3
+
+        foreach_end = logic_scene.to_node("ForEachEnd_1")
+        assert foreach_end.success == constants.SUCCESSFUL
+
+    def test_profile_scene(self):
+        utils.print_test_header("test_profile_scene")
+
+        logic_scene = LogicScene()
+        logic_scene.load_from_file("loop_example")
+        profiler = ExecutionProfiler()
+        logic_scene.run_all_nodes_batch(profiler=profiler)
+
+        # One record per run, nodes in the loop aggregated
+        nodes_stats = {s["node_name"]: s for s in profiler.get_nodes_stats()}
+        self.assertEqual(nodes_stats["/PrintToConsole_1"]["runs"], 3)
+        self.assertEqual(nodes_stats["/ForEachEnd_1"]["runs"], 1)
+        self.assertEqual(len(profiler.get_summary(top_n=3).splitlines()), 4)
+
+        # Timeline
+        with tempfile.TemporaryDirectory() as temp_dir:
+            trace_file = os.path.join(temp_dir, "profile.json")
+            profiler.export_chrome_trace(trace_file)
+            with open(trace_file) as file:
+                trace = json.load(file)
+        run_events = [e for e in trace["traceEvents"] if e["ph"] == "X"]
+        self.assertEqual(len(run_events), len(profiler.records))
+        self.assertTrue(all(e["dur"] >= 0 for e in run_events))
+
+    def test_profile_nodes_code(self):
+        utils.print_test_header("test_profile_nodes_code")
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            logic_scene = LogicScene()
+            logic_scene.load_from_file("loop_example")
+            code_profiler = CodeProfiler(temp_dir, class_names=["PrintToConsole"])
+            logic_scene.run_all_nodes_batch(code_profiler=code_profiler)
+
+            self.assertEqual(
+                sorted(os.listdir(temp_dir)),
+                ["PrintToConsole_1.pstats", "PrintToConsole_2.pstats"],
+            )
+
+            # The 3 runs inside the loop are aggregated
+            stats = pstats.Stats(os.path.join(temp_dir, "PrintToConsole_1.pstats"))
+            run_calls = [v[0] for k, v in stats.stats.items() if k[2] == "run"]
+            self.assertEqual(run_calls, [3])
+
+    @unittest.skipIf(
+        importlib.util.find_spec("pyinstrument"), "pyinstrument is installed"
+    )
+    def test_profile_nodes_code_missing_engine(self):
+        utils.print_test_header("test_profile_nodes_code_missing_engine")
+
+        with self.assertRaises(ImportError):
+            CodeProfiler(tempfile.gettempdir(), engine="pyinstrument")
+
+    def test_write_results(self):
+        utils.print_test_header("test_write_results")
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            results_file = os.path.join(temp_dir, "results.jsonl")
+
+            logic_scene = LogicScene()
+            logic_scene.load_from_file("fail_scene")
+            results_writer = ResultsWriter(results_file, ["StrInput_1.out_str"])
+            results_writer.attach(logic_scene)
+            logic_scene.run_all_nodes_batch()
+            results_writer.close()
+
+            with open(results_file) as file:
+                records = [json.loads(line) for line in file]
+
+        # One record per node, the ones that did not run included
+        self.assertEqual(
+            sorted(r["node_name"] for r in records),
+            sorted(n.full_name for n in logic_scene.all_logic_nodes),
+        )
+        for record in records:
+            node = logic_scene.to_node(record["node_name"].lstrip("/"))
+            self.assertEqual(record["status"], node.success)
+            self.assertEqual(record["node"]["uuid"], node.uuid)
+            if record["node_name"] == "/StrInput_1":
+                self.assertEqual(
+                    record["outputs"],
+                    {"StrInput_1.out_str": node.get_attribute_value("out_str")},
+                )
+
+    def test_node_timeout(self):
+        utils.print_test_header("test_node_timeout")
+
+        logic_scene = LogicScene()
+        n_1 = logic_scene.add_node_by_name("TimedNode")
+        n_1["sleep_time"].set_value(30.0)
+        n_1.set_timeout(0.2)
+        n_2 = logic_scene.add_node_by_name("LaunchSubprocess")
+        n_2["subprocess_command"].set_value(sys.executable)
+        n_2["subprocess_args"].set_value(["-c", "import time; time.sleep(30)"])
+        n_2.set_timeout(0.2)
+        n_3 = logic_scene.add_node_by_name("EmptyNode")
+        n_1[constants.COMPLETED].connect_to_other(n_3[constants.START])
+
+        t1 = time.time()
+        logic_scene.run_all_nodes_batch()
+        self.assertLess(time.time() - t1, 5)
+
+        self.assertEqual(n_1.success, constants.TIMEOUT)
+        self.assertEqual(n_2.success, constants.TIMEOUT)
+        self.assertEqual(n_3.success, constants.SKIPPED)
+        self.assertEqual(len(logic_scene.gather_errored_nodes_logs()), 2)
+
+    def test_scene_timeout(self):
+        utils.print_test_header("test_scene_timeout")
+
+        logic_scene = LogicScene()
+        n_1 = logic_scene.add_node_by_name("TimedNode")
+        n_1["sleep_time"].set_value(30.0)
+        n_2 = logic_scene.add_node_by_name("TimedNode")
+        n_1[constants.COMPLETED].connect_to_other(n_2[constants.START])
+
+        t1 = time.time()
+        logic_scene.run_all_nodes_batch(timeout=0.2)
+        self.assertLess(time.time() - t1, 5)
+
+        self.assertEqual(n_1.success, constants.TIMEOUT)
+        self.assertEqual(n_2.success, constants.SKIPPED)
+
+    def test_run_single_after_cancel(self):
+        utils.print_test_header("test_run_single_after_cancel")
+
+        logic_scene = LogicScene()
+        n_1 = logic_scene.add_node_by_name("TimedNode")
+        n_1["sleep_time"].set_value(30.0)
+
+        started = threading.Event()
+        n_1.signaler.is_executing.connect(started.set)
+        thread = threading.Thread(target=logic_scene.run_all_nodes_batch)
+        thread.start()
+        self.assertTrue(started.wait(5))
+        logic_scene.cancel()
+        thread.join(5)
+        self.assertNotEqual(n_1.success, constants.SUCCESSFUL)
+        self.assertIsNone(logic_scene.cancel_token)
+
+        n_1.reset()
+        n_1["sleep_time"].set_value(0.01)
+        n_1.run_single()
+        self.assertEqual(n_1.success, constants.SUCCESSFUL)
+
+    def test_resource_limits(self):
+        utils.print_test_header("test_resource_limits")
+
+        RM.set_limits({"test_slot": 2})
+        scenes = []
+        for _ in range(6):
+            logic_scene = LogicScene()
+            n_1 = logic_scene.add_node_by_name("TimedNode")
+            n_1["sleep_time"].set_value(0.3)
+            n_1.RESOURCES = {"test_slot": 1}
+            scenes.append(logic_scene)
+
+        t1 = time.time()
+        threads = [
+            threading.Thread(target=logic_scene.run_all_nodes_batch)
+            for logic_scene in scenes
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        RM.set_limits({"test_slot": None})
+
+        # Only two at once, so three rounds
+        self.assertGreater(time.time() - t1, 0.85)
+        for logic_scene in scenes:
+            for node in logic_scene.all_logic_nodes:
+                self.assertEqual(node.success, constants.SUCCESSFUL)
+
+    def test_run_by_priority(self):
+        utils.print_test_header("test_run_by_priority")
+
+        logic_scene = LogicScene()
+        n_1 = logic_scene.add_node_by_name("EmptyNode")
+        n_2 = logic_scene.add_node_by_name("EmptyNode")
+        n_3 = logic_scene.add_node_by_name("EmptyNode")
+        n_4 = logic_scene.add_node_by_name("EmptyNode")
+        n_1[constants.COMPLETED].connect_to_other(n_2[constants.START])
+        n_2[constants.COMPLETED].connect_to_other(n_3[constants.START])
+
+        started = []
+        for node in logic_scene.all_logic_nodes:
+            node.signaler.is_executing.connect(lambda node=node: started.append(node))
+
+        # Longest critical path first
+        logic_scene.run_all_nodes_batch()
+        self.assertGreater(n_1.critical_path, n_4.critical_path)
+        self.assertEqual(started, [n_1, n_2, n_3, n_4])
+
+        # Priority over critical path
+        started.clear()
+        logic_scene.reset_all_nodes()
+        n_4.set_priority(1)
+        logic_scene.run_all_nodes_batch()
+        self.assertEqual(started, [n_4, n_1, n_2, n_3])
+
+    def test_metrics_endpoint(self):
+        utils.print_test_header("test_metrics_endpoint")
+
+        EM.reset()
+        logic_scene = LogicScene()
+        logic_scene.add_node_by_name("EmptyNode")
+        n_2 = logic_scene.add_node_by_name("FailNode")
+        n_3 = logic_scene.add_node_by_name("EmptyNode")
+        n_2[constants.COMPLETED].connect_to_other(n_3[constants.START])
+        logic_scene.run_all_nodes_batch()
+
+        server = MetricsServer()
+        host, port = server.start(0)
+        try:
+            with urllib.request.urlopen(f"http://{host}:{port}/metrics.json") as r:
+                snapshot = json.loads(r.read())
+            with urllib.request.urlopen(f"http://{host}:{port}/metrics") as r:
+                text = r.read().decode("utf-8")
+        finally:
+            server.stop()
+
+        self.assertEqual(snapshot["nodes_running"], 0)
+        self.assertEqual(snapshot["queue_depth"], 0)
+        self.assertEqual(
+            snapshot["nodes_finished"],
+            {constants.SUCCESSFUL: 1, constants.FAILED: 1, constants.SKIPPED: 1},
+        )
+        self.assertEqual(snapshot["latencies"]["EmptyNode"]["count"], 1)
+        self.assertGreater(snapshot["throughput"], 0)
+        self.assertIn('all_nodes_nodes_finished_total{status="FAILED"} 1', text)
+        self.assertIn(
+            'all_nodes_node_duration_seconds_count{class_name="FailNode"} 1', text
+        )
@@ -6,6 +6,7 @@ __license__ = "MIT License"
 
 import os
 import tempfile
+import tracemalloc
 import unittest
 
 from all_nodes import constants
@@ -15,9 +16,22 @@ from all_nodes.lib.base_node_lib.nodes_general_library import file_writing
 from all_nodes.lib.base_node_lib.nodes_general_library import folder_management
 from all_nodes.lib.base_node_lib.nodes_general_library import dict_manipulation
 from all_nodes.lib.base_node_lib.nodes_general_library import general_input
+from all_nodes.logic.logic_node import GeneralLogicNode
+from all_nodes.logic.spill_store import SPILL_STORE, SpilledValue
 from all_nodes import utils
 
 
+# -------------------------------- HELPERS -------------------------------- #
+class BigTransformNode(GeneralLogicNode):
+    SIZE = 1024 * 1024
+
+    INPUTS_DICT = {"in_data": {"type": bytearray, "optional": True}}
+    OUTPUTS_DICT = {"out_data": {"type": bytearray}}
+
+    def run(self):
+        self.set_output("out_data", bytearray(self.SIZE))
+
+
 # -------------------------------- TESTS -------------------------------- #
 class NodeTesting(unittest.TestCase):
     DICT_EXAMPLE = {
@@ -201,3 +215,113 @@ class NodeTesting(unittest.TestCase):
         n_empty.add_attribute("some_attr", constants.OUTPUT, str)
         self.assertIsNone(n_empty["some_attr"].get_value())
         self.assertEqual(len(n_empty.get_output_attrs()), 2)
+
+    def test_logging_large_value(self):
+        """
+        Check large values are truncated when logged, and loggers are not duplicated
+        """
+        utils.print_test_header("test_logging_large_value")
+
+        logger = utils.get_logger("test_logging_large_value")
+        self.assertIs(utils.get_logger("test_logging_large_value"), logger)
+        self.assertEqual(len(logger.handlers), 1)
+
+        large_value = list(range(100000))
+        with self.assertLogs(logger, level="DEBUG") as logs:
+            logger.debug("Value: %s", utils.LazyRepr(large_value))
+        self.assertLessEqual(
+            len(logs.records[0].getMessage()), constants.LOG_REPR_MAX_LENGTH + 10
+        )
+
+    def test_mutable_input_copy_on_write(self):
+        """
+        Check values are shared with read-only inputs, and copied only for inputs declared as mutable
+        """
+        utils.print_test_header("test_mutable_input_copy_on_write")
+
+        n_source = dict_manipulation.GetDictKey()
+        n_source.set_attribute_value("in_dict", {"inner": {"a": 1}})
+        n_source.set_attribute_value("key", "inner")
+
+        n_reader = dict_manipulation.GetDictKey()
+        n_reader.set_attribute_value("key", "a")
+        n_source.connect_attribute("out", n_reader, "in_dict")
+
+        n_writer = dict_manipulation.SetDictKey()
+        n_writer.set_attribute_value("key", "b")
+        n_writer.set_attribute_value("new_value", 2)
+        n_source.connect_attribute("out", n_writer, "in_dict")
+
+        n_source.run_chain()
+        self.assertEqual(n_writer.success, constants.SUCCESSFUL)
+        self.assertEqual(n_writer["out_dict"].get_value(), {"a": 1, "b": 2})
+        self.assertEqual(n_source["out"].get_value(), {"a": 1})
+        self.assertIs(n_reader["in_dict"].get_value(), n_source["out"].get_value())
+
+    def test_copy_value(self):
+        """
+        Check values are copied with the cheapest safe method
+        """
+        utils.print_test_header("test_copy_value")
+
+        import numpy as np
+
+        self.assertIs(utils.copy_value("text"), "text")
+
+        array = np.zeros((10, 10))
+        array_copy = utils.copy_value(array)
+        array_copy[0, 0] = 1
+        self.assertEqual(array[0, 0], 0)
+
+        nested = {"a": [1, 2]}
+        nested_copy = utils.copy_value(nested)
+        nested_copy["a"].append(3)
+        self.assertEqual(nested, {"a": [1, 2]})
+
+    def test_conserve_memory(self):
+        """
+        Check intermediate values are released as soon as they are consumed, so only a couple are held at a time
+        """
+        utils.print_test_header("test_conserve_memory")
+
+        chain = [BigTransformNode() for _ in range(30)]
+        for node, next_node in zip(chain, chain[1:]):
+            node.connect_attribute("out_data", next_node, "in_data")
+        for node in chain:
+            node.conserve_memory = True
+
+        tracemalloc.start()
+        chain[0].run_chain()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        self.assertTrue(all(node.success == constants.SUCCESSFUL for node in chain))
+        self.assertLess(peak, 3 * BigTransformNode.SIZE)
+        self.assertIsNone(chain[10]["out_data"].get_value())
+        self.assertIsNotNone(
+            chain[-1]["out_data"].get_value()
+        )  # Final result, no consumers
+
+    def test_spill_to_disk(self):
+        """
+        Check oversized outputs are spilled to disk and transparently loaded back by the nodes downstream
+        """
+        utils.print_test_header("test_spill_to_disk")
+
+        SPILL_STORE.set_threshold_mb(0.5)
+        try:
+            node_1 = BigTransformNode()
+            node_2 = BigTransformNode()
+            node_1.connect_attribute("out_data", node_2, "in_data")
+            node_1.run_chain()
+        finally:
+            SPILL_STORE.set_threshold_mb(0)
+
+        self.assertEqual(node_2.success, constants.SUCCESSFUL)
+        handle = node_1["out_data"].value
+        self.assertIsInstance(handle, SpilledValue)
+        self.assertTrue(os.path.isfile(handle.filepath))
+        self.assertIsInstance(node_2["in_data"].value, SpilledValue)
+        self.assertEqual(
+            node_2.get_attribute_value("in_data"), bytearray(BigTransformNode.SIZE)
+        )